@@ -48,11 +48,18 @@ class CustomUserSerializer(serializers.ModelSerializer):
     block_id = serializers.SerializerMethodField(read_only=True)
     follow_id = serializers.SerializerMethodField(read_only=True)
     is_current_user = serializers.SerializerMethodField(read_only=True)
+    followers_count = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = CustomUser
         fields = ['id', 'username', 'image', 'post_karma', 'comment_karma', 'created_at', 'is_current_user', 'block_id', 'follow_id', 'followers_count', 'bio']
 
+    def _get_viewer_state(self, obj):
+        viewer_state = self.context.get('user_viewer_state')
+        if viewer_state and viewer_state.covers(obj.id):
+            return viewer_state
+        return None
+
     def get_is_current_user(self, obj):
         request = self.context.get('request')
         if request:
@@ -63,14 +70,26 @@ class CustomUserSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request:
             return None
+        viewer_state = self._get_viewer_state(obj)
+        if viewer_state:
+            return viewer_state.get_follow_id(obj.id)
         return obj.get_follow_id(request.user)
 
     def get_block_id(self, obj):
         request = self.context.get('request')
         if not request:
             return None
+        viewer_state = self._get_viewer_state(obj)
+        if viewer_state:
+            return viewer_state.get_block_id(obj.id)
         return obj.get_block_id(request.user)
 
+    def get_followers_count(self, obj):
+        viewer_state = self._get_viewer_state(obj)
+        if viewer_state:
+            return viewer_state.get_followers_count(obj.id)
+        return obj.followers_count
+
 class FollowSerializer(serializers.ModelSerializer):
     follower = serializers.PrimaryKeyRelatedField(default=serializers.CurrentUserDefault(), queryset=CustomUser.objects.all())
     followed = serializers.PrimaryKeyRelatedField(queryset=CustomUser.objects.all())
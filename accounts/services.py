@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from .models import Follow, Block
-from django.db.models import Q
+from django.db.models import Q, Count
+from api.memo import request_memoized
+from api.visibility import VisibilityService
 
 User = get_user_model()
 
@@ -8,21 +10,15 @@ class UserService:
     @classmethod
     def get_users(cls, user):
         users = User.objects.all()
-        users = cls._exclude_blocked(users, user)
+        users = VisibilityService.exclude_blocked(users, user, user_field='id')
         return cls._optimize_users_queryset(users)
     
     @classmethod
     def get_user(cls, user_id, user):
         users = User.objects.filter(id=user_id)
-        users = cls._exclude_blocked(users, user)
+        users = VisibilityService.exclude_blocked(users, user, user_field='id')
         return cls._optimize_users_queryset(users).first()
     
-    @classmethod
-    def _exclude_blocked(cls, users, user):
-        if user.is_authenticated:
-            users = users.exclude(blocked_by__blocked_by=user).exclude(blocks__blocked_user=user)
-        return users
-
     @classmethod
     def _optimize_users_queryset(cls, users):
         return users.prefetch_related('blocks', 'blocked_by', 'followers', 'following', 'saved_posts')
@@ -35,7 +31,7 @@ class UserService:
     @classmethod
     def get_followed_users(cls, user):
         followed_users = User.objects.filter(followers__follower=user)
-        followed_users = cls._exclude_blocked(followed_users, user)
+        followed_users = VisibilityService.exclude_blocked(followed_users, user, user_field='id')
         return cls._optimize_users_queryset(followed_users)
 
 class BlockService:
@@ -54,10 +50,47 @@ class BlockService:
         Block.objects.create(blocked_by=user, blocked_user=blocked_user)
 
     @staticmethod
+    @request_memoized('is_blocked')
     def is_blocked(user, blocked_user):
         return Block.objects.filter(Q(blocked_by=user, blocked_user=blocked_user) | Q(blocked_by=blocked_user, blocked_user=user)).exists()
 
 class FollowService:
     @staticmethod
     def get_follows(user):
-        return Follow.objects.filter(follower=user)
\ No newline at end of file
+        return Follow.objects.filter(follower=user)
+
+class UserViewerState:
+    def __init__(self, user_ids=(), follow_ids=None, block_ids=None, followers_counts=None):
+        self.user_ids = set(user_ids)
+        self.follow_ids = follow_ids or {}
+        self.block_ids = block_ids or {}
+        self.followers_counts = followers_counts or {}
+
+    def covers(self, user_id):
+        return user_id in self.user_ids
+
+    def get_follow_id(self, user_id):
+        return self.follow_ids.get(user_id)
+
+    def get_block_id(self, user_id):
+        return self.block_ids.get(user_id)
+
+    def get_followers_count(self, user_id):
+        return self.followers_counts.get(user_id, 0)
+
+class UserViewerStateService:
+    @staticmethod
+    def get_viewer_state(user, user_ids):
+        user_ids = set(user_ids)
+        if not user_ids:
+            return UserViewerState(user_ids)
+        followers = Follow.objects.filter(followed_id__in=user_ids).values('followed').annotate(count=Count('id'))
+        followers_counts = {follow['followed']: follow['count'] for follow in followers}
+        if not user.is_authenticated:
+            return UserViewerState(user_ids, followers_counts=followers_counts)
+        return UserViewerState(
+            user_ids,
+            follow_ids=dict(Follow.objects.filter(follower=user, followed_id__in=user_ids).values_list('followed_id', 'id')),
+            block_ids=dict(Block.objects.filter(blocked_by=user, blocked_user_id__in=user_ids).values_list('blocked_user_id', 'id')),
+            followers_counts=followers_counts,
+        )
@@ -1,10 +1,12 @@
+from django.db import transaction
 from django.dispatch import receiver
 from django.db.models.signals import post_save, post_delete
 from django.contrib.contenttypes.models import ContentType
-from notifications.models import Notification
+from notifications.tasks import create_notification_task
 from .models import Follow, Block
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
+from api.cache import TaggedCacheService
+from api.visibility import VisibilityService
 
 User = get_user_model()
 
@@ -13,12 +15,15 @@ def send_follow_notification(sender, instance, created, **kwargs):
     if not created:
         return
     content_type = ContentType.objects.get_for_model(instance)
-    Notification.objects.create(
-        user=instance.followed, 
-        content_type=content_type,
-        object_id=instance.id, 
-        message=f"u/{instance.follower.username} followed you."
-    )
+    transaction.on_commit(lambda: create_notification_task.delay(
+        'follow',
+        instance.followed_id,
+        content_type.id,
+        instance.id,
+        instance.followed_id,
+        instance.follower_id,
+        instance.follower.username
+    ))
     # channel_layer = get_channel_layer()
     # notification = Notification.objects.create(user=instance.followed, message=f"u/{instance.user.username} followed you.")
     # serializer = NotificationSerializer(notification)
@@ -32,15 +37,13 @@ def send_follow_notification(sender, instance, created, **kwargs):
 
 @receiver([post_save, post_delete], sender=User)
 def invalidate_user_cache(sender, instance, **kwargs):
-    cache.delete_pattern("*user_list*")
-    cache.delete(f"user_{instance.id}")
+    TaggedCacheService.invalidate('users', f"user:{instance.id}")
 
 @receiver([post_save, post_delete], sender=Follow)
 def invalidate_follow_cache(sender, instance, **kwargs):
-    cache.delete_pattern("*user_list*")
-    cache.delete(f"user_{instance.followed.id}")
+    TaggedCacheService.invalidate('users', f"user:{instance.follower_id}", f"user:{instance.followed_id}")
 
 @receiver([post_save, post_delete], sender=Block)
 def invalidate_block_cache(sender, instance, **kwargs):    
-    cache.delete_pattern("*user_list*")
-    cache.delete_many([f"user_{instance.blocked_user.id}", f"user_{instance.blocked_by.id}"])
+    TaggedCacheService.invalidate('users', f"user:{instance.blocked_by_id}", f"user:{instance.blocked_user_id}")
+    VisibilityService.invalidate_blocked(instance.blocked_by_id, instance.blocked_user_id)
@@ -1,13 +1,9 @@
-from rest_framework import generics, status
-from rest_framework.response import Response
+from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django.views.decorators.vary import vary_on_headers
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
 from .serializers import CustomUserSerializer, BlockSerializer, FollowSerializer
 from api.pagination import CustomPagination
+from api.cache import cache_response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter, SearchFilter
 from allauth.socialaccount.providers.github.views import GitHubOAuth2Adapter
@@ -25,8 +21,7 @@ class UserListView(generics.ListAPIView):
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     search_fields = ['username', 'bio']
 
-    @method_decorator(vary_on_headers('Authorization'))
-    @method_decorator(cache_page(60 * 15, key_prefix="user_list"))
+    @cache_response(60 * 15, key_prefix="user_list", tags=['users'])
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -36,15 +31,9 @@ class UserListView(generics.ListAPIView):
 class UserDetailView(generics.RetrieveAPIView):
     serializer_class = CustomUserSerializer
 
+    @cache_response(60 * 15, key_prefix="user_detail", tags=['user:{pk}'])
     def retrieve(self, request, *args, **kwargs):
-        pk = self.kwargs.get('pk')
-        cache_key = f"user_{pk}"
-        cached_user = cache.get(cache_key)
-        if cached_user:
-            return Response(cached_user, status=status.HTTP_200_OK)
-        response = super().retrieve(request, *args, **kwargs)
-        cache.set(cache_key, response.data, timeout=60 * 15)
-        return response
+        return super().retrieve(request, *args, **kwargs)
 
     def get_queryset(self):
         return UserService.get_users(self.request.user)
@@ -80,8 +69,7 @@ class FollowedUsersListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPagination
 
-    @method_decorator(cache_page(60 * 15, key_prefix="followed_user_list"))
-    @method_decorator(vary_on_headers('Authorization'))
+    @cache_response(60 * 15, key_prefix="followed_user_list", tags=['users'])
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -110,8 +98,7 @@ class BlockedUsersListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPagination
 
-    @method_decorator(cache_page(60 * 15, key_prefix="blocked_user_list"))
-    @method_decorator(vary_on_headers('Authorization'))
+    @cache_response(60 * 15, key_prefix="blocked_user_list", tags=['users'])
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
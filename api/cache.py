@@ -0,0 +1,177 @@
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from hashlib import md5
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from rest_framework import serializers, status
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+from rest_framework.response import Response
+
+class TaggedCacheService:
+
+    @classmethod
+    def set(cls, key, value, timeout, tags):
+        cache.set(key, value, timeout)
+        pipeline = get_redis_connection('default').pipeline()
+        for tag in set(tags):
+            tag_key = cls._get_tag_key(tag)
+            pipeline.sadd(tag_key, key)
+            pipeline.expire(tag_key, timeout, nx=True)
+            pipeline.expire(tag_key, timeout, gt=True)
+        pipeline.execute()
+
+    @classmethod
+    def invalidate(cls, *tags):
+        tag_keys = [cls._get_tag_key(tag) for tag in set(tags)]
+        if not tag_keys:
+            return
+        pipeline = get_redis_connection('default').pipeline(transaction=True)
+        for tag_key in tag_keys:
+            pipeline.smembers(tag_key)
+        pipeline.delete(*tag_keys)
+        *members, _ = pipeline.execute()
+        keys = {key.decode() for tag_members in members for key in tag_members}
+        if keys:
+            cache.delete_many(keys)
+
+    @staticmethod
+    def get_user_tag(user_id):
+        return f"user:{user_id}"
+
+    @staticmethod
+    def _get_tag_key(tag):
+        return f"cache_tag:{tag}"
+
+def cache_response(timeout, key_prefix, tags=()):
+    def get_key(request):
+        user_id = request.user.id if request.user.is_authenticated else None
+        path_hash = md5(request.get_full_path().encode()).hexdigest()
+        return f"{key_prefix}:{user_id or 'anonymous'}:{path_hash}"
+
+    def get_tags(request, kwargs):
+        response_tags = [tag.format(**kwargs) for tag in tags]
+        if request.user.is_authenticated:
+            response_tags.append(TaggedCacheService.get_user_tag(request.user.id))
+        return response_tags
+
+    def decorator(method):
+        if iscoroutinefunction(method):
+            @wraps(method)
+            async def async_wrapper(view, request, *args, **kwargs):
+                key = get_key(request)
+                data = await cache.aget(key)
+                if data is not None:
+                    return Response(data)
+                response = await method(view, request, *args, **kwargs)
+                if response.status_code == status.HTTP_200_OK:
+                    await sync_to_async(TaggedCacheService.set)(key, response.data, timeout, get_tags(request, kwargs))
+                return response
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            key = get_key(request)
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            response = method(view, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                TaggedCacheService.set(key, response.data, timeout, get_tags(request, kwargs))
+            return response
+        return wrapper
+    return decorator
+
+class CachedBodyMixin:
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['body_cache'] = True
+        return context
+
+class CachedBodySerializerMixin:
+    VIEWER_CONTEXT_KEYS = ('request', 'viewer_state', 'comment_viewer_state', 'representation_memo')
+    body_cache_prefix = None
+    viewer_fields = ()
+    nested_viewer_fields = {}
+    memoize_representation = False
+
+    def to_representation(self, instance):
+        if not self.context.get('body_cache'):
+            return super().to_representation(instance)
+        if not self.memoize_representation:
+            return self._get_representation(instance)
+        memo = self.context.setdefault('representation_memo', {})
+        key = self.get_body_tag(instance.pk)
+        if key not in memo:
+            memo[key] = self._get_representation(instance)
+        return memo[key]
+
+    def _get_representation(self, instance):
+        body = self._get_body(instance)
+        data = {}
+        for field in self._readable_fields:
+            if field.field_name in body:
+                value = body[field.field_name]
+                if value is not None and field.field_name in self.nested_viewer_fields:
+                    value = {**value, **self._get_nested_viewer_fields(field, instance)}
+                data[field.field_name] = value
+                continue
+            try:
+                data[field.field_name] = self._get_field_representation(field, instance)
+            except SkipField:
+                continue
+        return data
+
+    def get_body_tags(self, instance):
+        tags = [self.get_body_tag(instance.pk)]
+        if instance.user_id:
+            tags.append(TaggedCacheService.get_user_tag(instance.user_id))
+        return tags
+
+    @classmethod
+    def get_body_tag(cls, pk):
+        return f"{cls.body_cache_prefix}:{pk}"
+
+    def _get_body(self, instance):
+        key = self.get_body_tag(instance.pk)
+        prefetched_bodies = self.context.get('prefetched_bodies', {})
+        body = prefetched_bodies[key] if key in prefetched_bodies else cache.get(key)
+        if body is not None:
+            return body
+        context = {name: value for name, value in self.context.items() if name not in self.VIEWER_CONTEXT_KEYS}
+        serializer = type(self)(context=context)
+        body = {}
+        for field in serializer._readable_fields:
+            if not self._is_body_field(field):
+                continue
+            try:
+                body[field.field_name] = self._get_field_representation(field, instance)
+            except SkipField:
+                continue
+        TaggedCacheService.set(key, body, settings.BODY_CACHE_TTL, self.get_body_tags(instance))
+        return body
+
+    def _is_body_field(self, field):
+        if field.field_name in self.viewer_fields:
+            return False
+        if isinstance(getattr(field, 'child', field), CachedBodySerializerMixin):
+            return False
+        return isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField))
+
+    def _get_nested_viewer_fields(self, field, instance):
+        nested_instance = field.get_attribute(instance)
+        if nested_instance is None:
+            return {}
+        return {
+            name: field.fields[name].to_representation(nested_instance)
+            for name in self.nested_viewer_fields[field.field_name]
+        }
+
+    @staticmethod
+    def _get_field_representation(field, instance):
+        attribute = field.get_attribute(instance)
+        check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+        if check_for_none is None:
+            return None
+        return field.to_representation(attribute)
@@ -0,0 +1,56 @@
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+
+_current_memo = ContextVar('request_memo', default=None)
+
+class RequestMemo:
+    def __init__(self):
+        self.values = {}
+        self.hits = Counter()
+        self.misses = Counter()
+
+    @classmethod
+    def start(cls):
+        return _current_memo.set(cls())
+
+    @staticmethod
+    def finish(token):
+        _current_memo.reset(token)
+
+    @staticmethod
+    def current():
+        return _current_memo.get()
+
+    @classmethod
+    def clear(cls, namespace):
+        memo = cls.current()
+        if memo is None:
+            return
+        memo.values = {key: value for key, value in memo.values.items() if key[0] != namespace}
+
+    def get_or_compute(self, namespace, key, compute):
+        key = (namespace, key)
+        if key in self.values:
+            self.hits[namespace] += 1
+            return self.values[key]
+        self.misses[namespace] += 1
+        value = self.values[key] = compute()
+        return value
+
+    def get_stats(self):
+        return {
+            namespace: {'hits': self.hits[namespace], 'misses': self.misses[namespace]}
+            for namespace in self.hits.keys() | self.misses.keys()
+        }
+
+def request_memoized(namespace):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            memo = RequestMemo.current()
+            if memo is None:
+                return func(*args)
+            return memo.get_or_compute(namespace, args, lambda: func(*args))
+        return wrapper
+    return decorator
@@ -0,0 +1,45 @@
+import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from .memo import RequestMemo
+
+logger = logging.getLogger(__name__)
+
+class RequestMemoMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = RequestMemo.start()
+        try:
+            response = self.get_response(request)
+            stats = RequestMemo.current().get_stats()
+        finally:
+            RequestMemo.finish(token)
+        return self._add_stats(request, response, stats)
+
+    async def __acall__(self, request):
+        token = RequestMemo.start()
+        try:
+            response = await self.get_response(request)
+            stats = RequestMemo.current().get_stats()
+        finally:
+            RequestMemo.finish(token)
+        return self._add_stats(request, response, stats)
+
+    def _add_stats(self, request, response, stats):
+        if stats:
+            logger.debug(f"Request memo stats for {request.path}: {stats}")
+            if settings.DEBUG:
+                response['X-Request-Memo'] = '; '.join(
+                    f"{namespace} hits={counts['hits']} misses={counts['misses']}"
+                    for namespace, counts in sorted(stats.items())
+                )
+        return response
@@ -0,0 +1,75 @@
+from asyncio import iscoroutine
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import Http404
+from rest_framework.response import Response
+from .cache import CachedBodySerializerMixin
+
+class AsyncReadMixin:
+    http_method_names = ['get', 'options']
+    iterator_chunk_size = 100
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await sync_to_async(lambda: self.filter_queryset(self.get_queryset()))()
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(await self.aserialize(page, many=True))
+        objects = [obj async for obj in queryset.aiterator(chunk_size=self.iterator_chunk_size)]
+        return Response(await self.aserialize(objects, many=True))
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        if hasattr(self.paginator, 'apaginate_queryset'):
+            return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+        return await sync_to_async(self.paginator.paginate_queryset)(queryset, self.request, view=self)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(await self.aserialize(instance))
+
+    async def aget_object(self):
+        queryset = await sync_to_async(lambda: self.filter_queryset(self.get_queryset()))()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        instance = await queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).afirst()
+        if instance is None:
+            raise Http404
+        await sync_to_async(self.check_object_permissions)(self.request, instance)
+        return instance
+
+    async def aserialize(self, instance, many=False):
+        self.prefetched_bodies = await self.aget_prefetched_bodies(instance if many else [instance])
+        return await sync_to_async(lambda: self.get_serializer(instance, many=many).data)()
+
+    async def aget_prefetched_bodies(self, instances):
+        serializer_class = self.get_serializer_class()
+        if not instances or not issubclass(serializer_class, CachedBodySerializerMixin):
+            return {}
+        keys = [serializer_class.get_body_tag(instance.pk) for instance in instances]
+        bodies = await cache.aget_many(keys)
+        return {key: bodies.get(key) for key in keys}
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['prefetched_bodies'] = getattr(self, 'prefetched_bodies', {})
+        return context
@@ -1,4 +1,259 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from asgiref.sync import sync_to_async
+from datetime import date, datetime
+from base64 import b64decode, b64encode, urlsafe_b64decode, urlsafe_b64encode
+from hashlib import md5
+from binascii import Error as BinasciiError
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 class CustomPagination(PageNumberPagination):
-    page_size_query_param = 'per_page'
\ No newline at end of file
+    page_size_query_param = 'per_page'
+
+class FeedPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size = settings.FEED_PAGE_SIZE
+    page_size_query_param = 'per_page'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_feed(self, request, get_feed_page):
+        seed, offset, page_size = self._start_page(request)
+        items, self.seed, has_next = get_feed_page(seed=seed, offset=offset, page_size=page_size)
+        self._end_page(seed, offset, page_size, has_next)
+        return items
+
+    async def apaginate_feed(self, request, aget_feed_page):
+        seed, offset, page_size = self._start_page(request)
+        items, self.seed, has_next = await aget_feed_page(seed=seed, offset=offset, page_size=page_size)
+        self._end_page(seed, offset, page_size, has_next)
+        return items
+
+    def _start_page(self, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        seed, offset = self.decode_cursor(request)
+        return seed, offset, self.get_page_size(request)
+
+    def _end_page(self, seed, offset, page_size, has_next):
+        if seed != self.seed:
+            offset = 0
+        self.next_offset = offset + page_size if has_next else None
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, 0
+        try:
+            seed, offset = b64decode(encoded.encode('ascii')).decode('ascii').split(':')
+            offset = int(offset)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if offset < 0:
+            raise NotFound(self.invalid_cursor_message)
+        return seed, offset
+
+    def encode_cursor(self, seed, offset):
+        encoded = b64encode(f"{seed}:{offset}".encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if self.next_offset is None:
+            return None
+        return self.encode_cursor(self.seed, self.next_offset)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_size = settings.KEYSET_PAGE_SIZE
+    page_size_query_param = 'per_page'
+    max_page_size = 100
+    default_ordering = ('-created_at',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self._start_page(queryset, request)
+        self.count = self.get_estimated_count(queryset) if self.count_requested(request) else None
+        return self._end_page(list(page_queryset[:self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_queryset = self._start_page(queryset, request)
+        self.count = await sync_to_async(self.get_estimated_count)(queryset) if self.count_requested(request) else None
+        return self._end_page([instance async for instance in page_queryset[:self.page_size + 1]])
+
+    def _start_page(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+        if cursor is not None:
+            if len(cursor) != len(self.ordering):
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(self.get_keyset_filter(self.get_cursor_values(queryset, cursor)))
+        return queryset
+
+    def _end_page(self, page):
+        self.has_next = len(page) > self.page_size
+        page = page[:self.page_size]
+        self.next_position = self.get_position(page[-1]) if self.has_next else None
+        return page
+
+    def count_requested(self, request):
+        return request.query_params.get(self.count_query_param) == 'estimate'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        ordering = [field for field in queryset.query.order_by if isinstance(field, str)]
+        ordering = ordering or list(self.default_ordering)
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+        return ordering
+
+    def get_cursor_values(self, queryset, cursor):
+        values = []
+        for field, value in zip(self.ordering, cursor):
+            model_field = self.get_ordering_field(queryset, field.lstrip('-'))
+            try:
+                values.append(model_field.to_python(value) if model_field is not None else value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if values[-1] is None or isinstance(values[-1], (list, dict)):
+                raise NotFound(self.invalid_cursor_message)
+        return values
+
+    @staticmethod
+    def get_ordering_field(queryset, name):
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        model = queryset.model
+        *relations, name = name.split('__')
+        try:
+            for relation in relations:
+                model = model._meta.get_field(relation).related_model
+            return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        except (FieldDoesNotExist, AttributeError):
+            return None
+
+    def get_keyset_filter(self, cursor):
+        keyset_filter = Q()
+        equal_fields = {}
+        for field, value in zip(self.ordering, cursor):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            field = field.lstrip('-')
+            keyset_filter |= Q(**equal_fields, **{f"{field}__{lookup}": value})
+            equal_fields[field] = value
+        return keyset_filter
+
+    def get_position(self, instance):
+        position = []
+        for field in self.ordering:
+            value = instance
+            for attr in field.lstrip('-').split('__'):
+                value = getattr(value, attr)
+            position.append(value)
+        return position
+
+    def get_estimated_count(self, queryset):
+        queryset = queryset.order_by()
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return plan[0]['Plan']['Plan Rows']
+        key = f"keyset_count:{md5(str(queryset.query).encode()).hexdigest()}"
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, settings.KEYSET_COUNT_CACHE_TTL)
+        return count
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+        except (BinasciiError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(cursor, list):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, position):
+        encoded = urlsafe_b64encode(json.dumps(position, default=self.encode_value).encode()).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def encode_value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return str(value)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_paginated_response(self, data):
+        response = {'next': self.get_next_link(), 'results': data}
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'example': 123},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from accounts.models import Block
+from communities.models import Ban
+from .memo import RequestMemo
+
+class VisibilityService:
+
+    @classmethod
+    def get_blocked_user_ids(cls, user):
+        if not user.is_authenticated:
+            return []
+        key = cls._get_blocked_key(user.id)
+        blocked_user_ids = cache.get(key)
+        if blocked_user_ids is None:
+            blocks = Block.objects.filter(Q(blocked_by=user) | Q(blocked_user=user)).values_list('blocked_by', 'blocked_user')
+            blocked_user_ids = sorted({user_id for block in blocks for user_id in block if user_id != user.id})
+            cache.set(key, blocked_user_ids, settings.VISIBILITY_CACHE_TTL)
+        return blocked_user_ids
+
+    @classmethod
+    def get_banned_community_ids(cls, user):
+        if not user.is_authenticated:
+            return []
+        key = cls._get_banned_key(user.id)
+        banned_community_ids = cache.get(key)
+        if banned_community_ids is None:
+            now = timezone.now()
+            bans = Ban.objects.filter(Q(is_permanent=True) | Q(expires_at__gte=now), user=user).values_list('community', 'expires_at')
+            banned_community_ids = sorted({community_id for community_id, _ in bans})
+            timeout = settings.VISIBILITY_CACHE_TTL
+            expirations = [expires_at for _, expires_at in bans if expires_at]
+            if expirations:
+                timeout = max(min(timeout, int((min(expirations) - now).total_seconds()) + 1), 1)
+            cache.set(key, banned_community_ids, timeout)
+        return banned_community_ids
+
+    @classmethod
+    def exclude_blocked(cls, queryset, user, user_field='user'):
+        blocked_user_ids = cls.get_blocked_user_ids(user)
+        if not blocked_user_ids:
+            return queryset
+        return queryset.exclude(**{f"{user_field}__in": blocked_user_ids})
+
+    @classmethod
+    def exclude_banned(cls, queryset, user, community_field='community', user_field=None):
+        banned_community_ids = cls.get_banned_community_ids(user)
+        if not banned_community_ids:
+            return queryset
+        query = Q(**{f"{community_field}__in": banned_community_ids})
+        if user_field:
+            query &= ~Q(**{user_field: user})
+        return queryset.exclude(query)
+
+    @classmethod
+    def invalidate_blocked(cls, *user_ids):
+        cache.delete_many([cls._get_blocked_key(user_id) for user_id in user_ids])
+        RequestMemo.clear('is_blocked')
+
+    @classmethod
+    def invalidate_banned(cls, user_id):
+        cache.delete(cls._get_banned_key(user_id))
+        RequestMemo.clear('is_banned')
+
+    @staticmethod
+    def _get_blocked_key(user_id):
+        return f"visibility_blocked_{user_id}"
+
+    @staticmethod
+    def _get_banned_key(user_id):
+        return f"visibility_banned_{user_id}"
@@ -0,0 +1,161 @@
+from collections import defaultdict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.transaction import atomic
+from django_redis import get_redis_connection
+from redis.exceptions import ResponseError
+from .cache import TaggedCacheService
+
+User = get_user_model()
+
+class VoteBufferService:
+    REMOVED = 'removed'
+    kind = None
+    object_model = None
+    interaction_model = None
+    object_field = None
+    karma_field = None
+
+    @staticmethod
+    def is_enabled():
+        return settings.VOTE_BUFFER_ENABLED
+
+    @classmethod
+    def record_vote(cls, user_id, object_id, interaction_type=None):
+        redis = get_redis_connection('default')
+        redis.hset(cls._get_pending_key(), f"{user_id}:{object_id}", interaction_type or cls.REMOVED)
+        TaggedCacheService.invalidate(TaggedCacheService.get_user_tag(user_id), cls._get_object_tag(object_id))
+
+    @classmethod
+    def get_pending_votes(cls, user_id, object_ids):
+        object_ids = list(object_ids)
+        if not object_ids:
+            return {}
+        fields = [f"{user_id}:{object_id}" for object_id in object_ids]
+        pipeline = get_redis_connection('default').pipeline()
+        pipeline.hmget(cls._get_flushing_key(), fields)
+        pipeline.hmget(cls._get_pending_key(), fields)
+        flushing, pending = pipeline.execute()
+        votes = {}
+        for object_id, flushing_vote, pending_vote in zip(object_ids, flushing, pending):
+            vote = pending_vote or flushing_vote
+            if vote:
+                vote = vote.decode()
+                votes[object_id] = None if vote == cls.REMOVED else vote
+        return votes
+
+    @classmethod
+    def flush(cls):
+        lock_key = cls._get_lock_key()
+        if not cache.add(lock_key, 1, settings.VOTE_BUFFER_FLUSH_LOCK_TIMEOUT):
+            return 0
+        try:
+            return cls._flush()
+        finally:
+            cache.delete(lock_key)
+
+    @classmethod
+    def _flush(cls):
+        redis = get_redis_connection('default')
+        flushing_key = cls._get_flushing_key()
+        if not redis.exists(flushing_key):
+            try:
+                redis.renamenx(cls._get_pending_key(), flushing_key)
+            except ResponseError:
+                return 0
+        votes = {}
+        for field, vote in redis.hgetall(flushing_key).items():
+            user_id, object_id = field.decode().split(':')
+            vote = vote.decode()
+            votes[(int(user_id), int(object_id))] = None if vote == cls.REMOVED else vote
+        if votes:
+            tags = cls._apply_votes(votes)
+            TaggedCacheService.invalidate(*tags)
+        redis.delete(flushing_key)
+        return len(votes)
+
+    @classmethod
+    @atomic
+    def _apply_votes(cls, votes):
+        object_id_field = f"{cls.object_field}_id"
+        user_ids = {user_id for user_id, _ in votes}
+        object_ids = {object_id for _, object_id in votes}
+        interactions = cls.interaction_model.objects.select_for_update().filter(
+            user_id__in=user_ids,
+            **{f"{object_id_field}__in": object_ids}
+        )
+        existing = {
+            (interaction.user_id, getattr(interaction, object_id_field)): interaction.interaction_type
+            for interaction in interactions
+        }
+        authors = dict(cls.object_model.objects.filter(id__in=object_ids).values_list('id', 'user_id'))
+        user_ids = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True))
+        upserts = []
+        deletes = Q()
+        counters = defaultdict(lambda: [0, 0])
+        karma = defaultdict(int)
+        for (user_id, object_id), interaction_type in votes.items():
+            if object_id not in authors or user_id not in user_ids:
+                continue
+            previous_type = existing.get((user_id, object_id))
+            if previous_type == interaction_type:
+                continue
+            if interaction_type:
+                upserts.append(cls.interaction_model(user_id=user_id, interaction_type=interaction_type, **{object_id_field: object_id}))
+            else:
+                deletes |= Q(user_id=user_id, **{object_id_field: object_id})
+            upvotes = (interaction_type == 'upvote') - (previous_type == 'upvote')
+            downvotes = (interaction_type == 'downvote') - (previous_type == 'downvote')
+            counters[object_id][0] += upvotes
+            counters[object_id][1] += downvotes
+            karma[authors[object_id]] += upvotes - downvotes
+        if upserts:
+            cls.interaction_model.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=['user', cls.object_field],
+                update_fields=['interaction_type'],
+            )
+        if deletes:
+            cls.interaction_model.objects.filter(deletes).delete()
+        if counters:
+            cls.object_model.objects.filter(id__in=counters).update(
+                upvotes=F('upvotes') + cls._get_deltas({object_id: delta[0] for object_id, delta in counters.items()}),
+                downvotes=F('downvotes') + cls._get_deltas({object_id: delta[1] for object_id, delta in counters.items()}),
+                score=F('score') + cls._get_deltas({object_id: delta[0] - delta[1] for object_id, delta in counters.items()}),
+            )
+        karma = {user_id: amount for user_id, amount in karma.items() if amount}
+        if karma:
+            User.objects.filter(id__in=karma).update(**{cls.karma_field: F(cls.karma_field) + cls._get_deltas(karma)})
+        tags = {TaggedCacheService.get_user_tag(user_id) for user_id, _ in votes}
+        tags.update(cls._get_object_tag(object_id) for object_id in counters)
+        tags.update(TaggedCacheService.get_user_tag(user_id) for user_id in karma)
+        if karma:
+            tags.add('users')
+        return tags
+
+    @staticmethod
+    def _get_deltas(deltas):
+        return Case(
+            *[When(id=object_id, then=Value(delta)) for object_id, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+
+    @classmethod
+    def _get_object_tag(cls, object_id):
+        return f"{cls.kind}:{object_id}"
+
+    @classmethod
+    def _get_lock_key(cls):
+        return f"votes:{cls.kind}:flush_lock"
+
+    @classmethod
+    def _get_pending_key(cls):
+        return f"votes:{cls.kind}:pending"
+
+    @classmethod
+    def _get_flushing_key(cls):
+        return f"votes:{cls.kind}:flushing"
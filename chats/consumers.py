@@ -1,8 +1,10 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import sync_to_async
-from .models import Chat
+from channels.db import sync_to_async, database_sync_to_async
+from .models import Chat, Message
 from django.db.models import Q
 from accounts.services import BlockService
+from .serializers import MessageFrameSerializer
+from .services import MessageService
 import json
 from urllib.parse import parse_qs
 
@@ -52,6 +54,48 @@ class MessagesConsumer(AsyncWebsocketConsumer):
         if hasattr(self, 'group_name'):
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            frame = json.loads(text_data or '')
+        except ValueError:
+            await self.send_error('Invalid frame')
+            return
+        serializer = MessageFrameSerializer(data=frame if isinstance(frame, dict) else {})
+        if not serializer.is_valid():
+            await self.send_error(serializer.errors)
+            return
+        frame = serializer.validated_data
+        handler = getattr(self, f"receive_{frame['type']}")
+        await handler(frame)
+
+    async def receive_send_message(self, frame):
+        if await database_sync_to_async(BlockService.is_blocked)(self.participant, self.user):
+            await self.send_error('You cannot send messages in this chat')
+            return
+        await database_sync_to_async(MessageService.create_message)(self.chat, self.user, frame['content'])
+
+    async def receive_edit_message(self, frame):
+        message = await database_sync_to_async(MessageService.update_message)(frame['message'], self.chat, self.user, frame['content'])
+        if message is None:
+            await self.send_error('Message not found')
+
+    async def receive_delete_message(self, frame):
+        if not await database_sync_to_async(MessageService.delete_message)(frame['message'], self.chat, self.user):
+            await self.send_error('Message not found')
+
+    async def receive_mark_as_read(self, frame):
+        message_id = frame.get('message')
+        if message_id is not None and not await Message.objects.filter(id=message_id, chat=self.chat).aexists():
+            await self.send_error('Message not found')
+            return
+        await database_sync_to_async(MessageService.mark_as_read)(self.chat.id, self.user, message_id)
+
+    async def receive_typing(self, frame):
+        await self.channel_layer.group_send(self.group_name, {'type': 'typing', 'user': self.user.id})
+
+    async def send_error(self, errors):
+        await self.send(text_data=json.dumps({'type': 'error', 'errors': errors}))
+
     async def send_message(self, event):
         message = event['message']
         await self.send(text_data=json.dumps({'type': 'send_message', 'message': message}))
@@ -66,4 +110,9 @@ class MessagesConsumer(AsyncWebsocketConsumer):
 
     async def mark_as_read(self, event):
         messages_ids = event['messages_ids']
-        await self.send(text_data=json.dumps({'type': 'mark_as_read', 'messages_ids': messages_ids}))
\ No newline at end of file
+        await self.send(text_data=json.dumps({'type': 'mark_as_read', 'messages_ids': messages_ids}))
+
+    async def typing(self, event):
+        if event['user'] == self.user.id:
+            return
+        await self.send(text_data=json.dumps({'type': 'typing', 'user': event['user']}))
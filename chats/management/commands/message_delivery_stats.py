@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from chats.services import MessageDeliveryService
+
+class Command(BaseCommand):
+    help = 'Prints the message delivery latency histogram of the direct and celery delivery modes'
+
+    def handle(self, *args, **options):
+        for mode in [MessageDeliveryService.DIRECT, MessageDeliveryService.CELERY]:
+            histogram = MessageDeliveryService.get_latency_histogram(mode)
+            self.stdout.write(f"{mode} ({sum(histogram.values())} messages)")
+            for bucket, count in histogram.items():
+                self.stdout.write(f"  <= {bucket} ms: {count}")
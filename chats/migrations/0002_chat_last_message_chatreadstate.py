@@ -0,0 +1,61 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_chat_state(apps, schema_editor):
+    Chat = apps.get_model('chats', 'Chat')
+    Message = apps.get_model('chats', 'Message')
+    ChatReadState = apps.get_model('chats', 'ChatReadState')
+    last_message = Message.objects.filter(chat=OuterRef('pk')).order_by('-created_at', '-id')
+    Chat.objects.update(
+        last_message=Subquery(last_message.values('id')[:1]),
+        last_message_at=Subquery(last_message.values('created_at')[:1])
+    )
+    Participant = Chat._meta.get_field('participants').remote_field.through
+    participants = Participant.objects.values_list('chat_id', 'customuser_id')
+    ChatReadState.objects.bulk_create(
+        [ChatReadState(chat_id=chat_id, user_id=user_id) for chat_id, user_id in participants],
+        ignore_conflicts=True
+    )
+    unread_messages = Message.objects.filter(~Q(user=OuterRef('user')) | Q(user__isnull=True), chat=OuterRef('chat'), is_read=False)
+    unread_count = Subquery(unread_messages.values('chat').annotate(count=Count('pk')).values('count'))
+    ChatReadState.objects.update(unread_count=Coalesce(unread_count, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chat',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chats.message'),
+        ),
+        migrations.AddField(
+            model_name='chat',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ChatReadState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('chat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_states', to='chats.chat')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_read_states', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('chat', 'user')},
+            },
+        ),
+        migrations.RunPython(backfill_chat_state, migrations.RunPython.noop),
+    ]
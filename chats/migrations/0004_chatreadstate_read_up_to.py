@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:54
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_read_up_to(apps, schema_editor):
+    Message = apps.get_model('chats', 'Message')
+    ChatReadState = apps.get_model('chats', 'ChatReadState')
+    read_messages = Message.objects.filter(~Q(user=OuterRef('user')) | Q(user__isnull=True), chat=OuterRef('chat'), is_read=True)
+    read_up_to = Subquery(read_messages.values('chat').annotate(max_id=Max('id')).values('max_id'))
+    ChatReadState.objects.update(read_up_to=Coalesce(read_up_to, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0003_message_chat_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatreadstate',
+            name='read_up_to',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_read_up_to, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='message',
+            name='is_read',
+        ),
+    ]
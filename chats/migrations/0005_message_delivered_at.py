@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:35
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_delivered_at(apps, schema_editor):
+    Message = apps.get_model('chats', 'Message')
+    Message.objects.update(delivered_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0004_chatreadstate_read_up_to'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_delivered_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('delivered_at__isnull', True)), fields=['created_at'], name='message_undelivered_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from accounts.services import UserViewerStateService
+from .services import ChatService
+
+class ChatViewerStateMixin:
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and args:
+            chats = list(args[0])
+            args = (chats, *args[1:])
+            user_ids = {participant.id for chat in chats for participant in chat.participants.all()}
+            user_ids.update(chat.last_message.user_id for chat in chats if chat.last_message and chat.last_message.user_id)
+            context = kwargs.setdefault('context', self.get_serializer_context())
+            context['user_viewer_state'] = UserViewerStateService.get_viewer_state(self.request.user, user_ids)
+            context['read_states'] = ChatService.get_read_states([chat.id for chat in chats])
+        return super().get_serializer(*args, **kwargs)
+
+class MessageViewerStateMixin:
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and args:
+            messages = list(args[0])
+            args = (messages, *args[1:])
+            user_ids = {message.user_id for message in messages if message.user_id}
+            context = kwargs.setdefault('context', self.get_serializer_context())
+            context['user_viewer_state'] = UserViewerStateService.get_viewer_state(self.request.user, user_ids)
+            context['read_states'] = ChatService.get_read_states({message.chat_id for message in messages})
+        return super().get_serializer(*args, **kwargs)
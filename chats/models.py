@@ -6,13 +6,14 @@ User = get_user_model()
 class Chat(models.Model):
     participants = models.ManyToManyField(User, related_name='chats')
     created_at = models.DateTimeField(auto_now_add=True)
+    last_message = models.ForeignKey('Message', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_message_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
-    @property
-    def last_message(self):        
-        return self.messages.order_by('-created_at').first()
-    
     def get_unread_messages_count(self, user):
-        return self.messages.exclude(user=user).filter(is_read=False).count()
+        for read_state in self.read_states.all():
+            if read_state.user_id == user.id:
+                return read_state.unread_count
+        return 0
     
     def get_other_participant(self, user):
         return self.participants.exclude(id=user.id).exclude(blocked_by__blocked_by=user).exclude(blocks__blocked_user=user).first()
@@ -25,7 +26,25 @@ class Message(models.Model):
     chat = models.ForeignKey(Chat, on_delete=models.CASCADE, related_name='messages')
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
-    is_read = models.BooleanField(default=False)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['chat', 'created_at', 'id']),
+            models.Index(fields=['created_at'], condition=models.Q(delivered_at__isnull=True), name='message_undelivered_idx'),
+        ]
+
+    def __str__(self):
+        return self.content
+
+class ChatReadState(models.Model):
+    chat = models.ForeignKey(Chat, on_delete=models.CASCADE, related_name='read_states')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chat_read_states')
+    unread_count = models.PositiveIntegerField(default=0)
+    read_up_to = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('chat', 'user')
 
     def __str__(self):
-        return self.content
\ No newline at end of file
+        return f'ChatReadState {self.chat_id} {self.user_id}'
\ No newline at end of file
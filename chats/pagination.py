@@ -0,0 +1,30 @@
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from api.pagination import KeysetPagination
+
+class MessageHistoryPagination(KeysetPagination):
+    before_query_param = 'before'
+    page_size = settings.MESSAGES_PAGE_SIZE
+    default_ordering = ('-created_at', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.before_position = self.get_before_position(queryset, request)
+        return super().paginate_queryset(queryset, request, view)
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None:
+            return self.before_position
+        return cursor
+
+    def get_before_position(self, queryset, request):
+        before = request.query_params.get(self.before_query_param)
+        if before is None:
+            return None
+        try:
+            message = queryset.filter(id=int(before)).values('created_at', 'id').first()
+        except ValueError:
+            message = None
+        if message is None:
+            raise NotFound(self.invalid_cursor_message)
+        return [message['created_at'], message['id']]
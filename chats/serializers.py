@@ -4,7 +4,8 @@ from django.db.models import Q, Count
 from rest_framework import serializers
 from accounts.serializers import CustomUserSerializer
 from accounts.services import UserService
-from .services import ChatService
+from api.visibility import VisibilityService
+from .services import ChatService, MessageService
 
 User = get_user_model()
 
@@ -17,12 +18,44 @@ class MessageWriteSerializer(serializers.ModelSerializer):
 
 class MessageReadSerializer(serializers.ModelSerializer):
     user = CustomUserSerializer()
+    is_read = serializers.SerializerMethodField()
     class Meta:
         model = Message
-        fields = '__all__'
+        exclude = ['delivered_at']
+
+    def get_is_read(self, obj):
+        read_states = self.context.get('read_states', {}).get(obj.chat_id)
+        if read_states is None:
+            read_states = ChatService.get_read_states([obj.chat_id])[obj.chat_id]
+        return MessageService.is_read(obj, read_states)
 
 class MarkAsReadSerializer(serializers.Serializer):
     chat = serializers.PrimaryKeyRelatedField(queryset=Chat.objects.all())
+    message = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        message_id = attrs.get('message')
+        if message_id is not None and not Message.objects.filter(id=message_id, chat=attrs['chat']).exists():
+            raise serializers.ValidationError({'message': 'Message does not belong to this chat'})
+        return attrs
+
+class MessageFrameSerializer(serializers.Serializer):
+    REQUIRED_FIELDS = {
+        'send_message': ['content'],
+        'edit_message': ['message', 'content'],
+        'delete_message': ['message'],
+        'mark_as_read': [],
+        'typing': [],
+    }
+    type = serializers.ChoiceField(choices=list(REQUIRED_FIELDS))
+    message = serializers.IntegerField(required=False, min_value=1)
+    content = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        missing_fields = [field for field in self.REQUIRED_FIELDS[attrs['type']] if field not in attrs]
+        if missing_fields:
+            raise serializers.ValidationError({field: 'This field is required.' for field in missing_fields})
+        return attrs
 
 class ChatReadSerializer(serializers.ModelSerializer):
     participants = CustomUserSerializer(many=True)
@@ -42,8 +75,11 @@ class ChatReadSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         if not request:
             return None
-        other_participant = obj.get_other_participant(request.user)
-        return CustomUserSerializer(other_participant).data if other_participant is not None else None
+        blocked_user_ids = set(VisibilityService.get_blocked_user_ids(request.user))
+        for participant in obj.participants.all():
+            if participant.id != request.user.id and participant.id not in blocked_user_ids:
+                return CustomUserSerializer(participant, context={'user_viewer_state': self.context.get('user_viewer_state')}).data
+        return None
 
 class ChatWriteSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,32 +1,121 @@
 import copy
-from .models import Message, Chat
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from .models import Message, Chat, ChatReadState
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 from django.db.models.query import Q
 from django.db import transaction
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 
+logger = logging.getLogger(__name__)
+
 class ChatService:
     @classmethod
     def get_chats(cls, user):
-        chats = Chat.objects.filter(participants=user)
-        return cls._optimize_chat_queryset(chats)
+        chats = Chat.objects.filter(participants=user).order_by(F('last_message_at').desc(nulls_last=True), '-created_at')
+        return cls._optimize_chat_queryset(chats, user)
     
     @classmethod
-    def _optimize_chat_queryset(cls, chats):
-        return chats.prefetch_related('messages', 'participants')
+    def _optimize_chat_queryset(cls, chats, user):
+        return chats.select_related('last_message__user').prefetch_related(
+            'participants',
+            Prefetch('read_states', queryset=ChatReadState.objects.filter(user=user))
+        )
+
+    @staticmethod
+    def get_participant_chat(chat_id, user):
+        return Chat.objects.filter(id=chat_id, participants=user).first()
+
+    @staticmethod
+    def create_read_states(chat_id, user_ids):
+        ChatReadState.objects.bulk_create(
+            [ChatReadState(chat_id=chat_id, user_id=user_id) for user_id in user_ids],
+            ignore_conflicts=True
+        )
+
+    @staticmethod
+    def record_message(message):
+        Chat.objects.filter(id=message.chat_id).update(last_message=message, last_message_at=message.created_at)
+        ChatReadState.objects.filter(chat_id=message.chat_id).exclude(user_id=message.user_id).update(unread_count=F('unread_count') + 1)
+        if Message.chat.is_cached(message):
+            message.chat.last_message = message
+            message.chat.last_message_at = message.created_at
+
+    @staticmethod
+    def refresh_last_message(chat_id):
+        last_message = Message.objects.filter(chat=OuterRef('pk')).order_by('-created_at', '-id')
+        Chat.objects.filter(id=chat_id).update(
+            last_message=Subquery(last_message.values('id')[:1]),
+            last_message_at=Subquery(last_message.values('created_at')[:1])
+        )
+
+    @staticmethod
+    def rebuild_unread_counts(chat_id):
+        unread_messages = Message.objects.filter(~Q(user=OuterRef('user')) | Q(user__isnull=True), chat=OuterRef('chat'), id__gt=OuterRef('read_up_to'))
+        unread_count = Subquery(unread_messages.values('chat').annotate(count=Count('pk')).values('count'))
+        ChatReadState.objects.filter(chat_id=chat_id).update(unread_count=Coalesce(unread_count, 0))
+
+    @staticmethod
+    def get_read_states(chat_ids):
+        read_states = {chat_id: {} for chat_id in chat_ids}
+        for chat_id, user_id, read_up_to in ChatReadState.objects.filter(chat_id__in=chat_ids).values_list('chat_id', 'user_id', 'read_up_to'):
+            read_states[chat_id][user_id] = read_up_to
+        return read_states
 
 class MessageService:
     @classmethod
     def get_messages(cls, user):
         return Message.objects.filter(chat__participants=user)
+
+    @staticmethod
+    def get_chat_messages(chat):
+        return Message.objects.filter(chat=chat).select_related('user').order_by('-created_at', '-id')
     
     @staticmethod
-    def mark_as_read(chat_id, user):
-        Message.objects.filter(~Q(user=user), chat__id=chat_id, is_read=False).update(is_read=True)
+    def create_message(chat, user, content):
+        return Message.objects.create(chat=chat, user=user, content=content)
+
+    @staticmethod
+    def update_message(message_id, chat, user, content):
+        message = Message.objects.filter(id=message_id, chat=chat, user=user).first()
+        if message is None:
+            return None
+        message.content = content
+        message.save(update_fields=['content'])
+        return message
+
+    @staticmethod
+    def delete_message(message_id, chat, user):
+        deleted, _ = Message.objects.filter(id=message_id, chat=chat, user=user).delete()
+        return deleted > 0
 
     @staticmethod
-    def notify_read_messages(chat_id, user):
-        messages_ids = list(Message.objects.filter(~Q(user=user), chat__id=chat_id, is_read=False).values_list("id", flat=True))
+    def mark_as_read(chat_id, user, message_id=None):
+        with transaction.atomic():
+            read_state = ChatReadState.objects.select_for_update().filter(chat_id=chat_id, user=user).first()
+            if message_id is None:
+                message_id = Chat.objects.filter(id=chat_id).values_list('last_message_id', flat=True).first()
+            if read_state is None or not message_id or message_id <= read_state.read_up_to:
+                return []
+            messages = Message.objects.filter(chat_id=chat_id).exclude(user=user)
+            messages_ids = list(messages.filter(id__gt=read_state.read_up_to, id__lte=message_id).values_list('id', flat=True))
+            read_state.read_up_to = message_id
+            read_state.unread_count = messages.filter(id__gt=message_id).count()
+            read_state.save(update_fields=['read_up_to', 'unread_count'])
+            transaction.on_commit(lambda: MessageService.publish_read_messages(chat_id, messages_ids))
+        return messages_ids
+
+    @staticmethod
+    def is_read(message, read_states):
+        return any(read_up_to >= message.id for user_id, read_up_to in read_states.items() if user_id != message.user_id)
+
+    @staticmethod
+    def publish_read_messages(chat_id, messages_ids):
         channel_layer = get_channel_layer()
         async_to_sync(channel_layer.group_send)(
             f"chat_{chat_id}",
@@ -35,3 +124,72 @@ class MessageService:
                 "messages_ids": messages_ids
             }
         )
+
+class MessageDeliveryService:
+    DIRECT = 'direct'
+    CELERY = 'celery'
+
+    @classmethod
+    def deliver(cls, message):
+        from .serializers import MessageReadSerializer
+        from .tasks import send_message_task
+        if settings.MESSAGE_DELIVERY_MODE != cls.DIRECT:
+            send_message_task.delay(message.id, cls.CELERY)
+            return
+        try:
+            cls.publish(message.chat_id, MessageReadSerializer(message).data)
+        except Exception:
+            logger.exception(f"Direct delivery of message {message.id} failed, falling back to celery")
+            send_message_task.delay(message.id, cls.DIRECT)
+            return
+        cls.mark_delivered(message, cls.DIRECT)
+
+    @classmethod
+    def mark_delivered(cls, message, mode):
+        Message.objects.filter(id=message.id, delivered_at__isnull=True).update(delivered_at=timezone.now())
+        cls.record_latency(mode, message.created_at)
+
+    @staticmethod
+    def redeliver_pending():
+        from .tasks import send_message_task
+        cutoff = timezone.now() - timedelta(seconds=settings.MESSAGE_REDELIVERY_DELAY)
+        messages = Message.objects.filter(delivered_at__isnull=True, created_at__lt=cutoff).order_by('created_at')
+        message_ids = list(messages.values_list('id', flat=True)[:settings.MESSAGE_REDELIVERY_BATCH_SIZE])
+        for message_id in message_ids:
+            send_message_task.delay(message_id, settings.MESSAGE_DELIVERY_MODE)
+        return len(message_ids)
+
+    @staticmethod
+    def deliver_update(message):
+        from .serializers import MessageReadSerializer
+        MessageDeliveryService.publish(message.chat_id, MessageReadSerializer(message).data, event_type='update_message')
+
+    @staticmethod
+    def publish(chat_id, message_data, event_type='send_message'):
+        channel_layer = get_channel_layer()
+        async_to_sync(channel_layer.group_send)(
+            f"chat_{chat_id}",
+            {
+                "type": event_type,
+                "message": message_data
+            }
+        )
+
+    @classmethod
+    def record_latency(cls, mode, created_at):
+        latency = (timezone.now() - created_at).total_seconds() * 1000
+        bucket = next((bucket for bucket in settings.MESSAGE_DELIVERY_LATENCY_BUCKETS if latency <= bucket), 'inf')
+        key = cls._get_latency_key(mode, bucket)
+        cache.add(key, 0, settings.MESSAGE_DELIVERY_STATS_TTL)
+        cache.incr(key)
+
+    @classmethod
+    def get_latency_histogram(cls, mode):
+        buckets = [*settings.MESSAGE_DELIVERY_LATENCY_BUCKETS, 'inf']
+        keys = {bucket: cls._get_latency_key(mode, bucket) for bucket in buckets}
+        counts = cache.get_many(keys.values())
+        return {str(bucket): counts.get(key, 0) for bucket, key in keys.items()}
+
+    @staticmethod
+    def _get_latency_key(mode, bucket):
+        return f"message_delivery:{mode}:{bucket}"
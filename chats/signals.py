@@ -1,7 +1,8 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Message
-from .tasks import send_message_task, delete_message_task
+from .models import Chat, Message
+from .services import ChatService, MessageDeliveryService
+from .tasks import delete_message_task
 from django.db import transaction
 # @receiver(post_save, sender=Message)
 # def send_message(sender, instance, created, **kwargs):
@@ -38,8 +39,10 @@ def send_message(sender, instance, created, **kwargs):
     # channel_layer = get_channel_layer()
     # print(instance)
     if created:
-        transaction.on_commit(lambda: send_message_task.delay(instance.id))
+        transaction.on_commit(lambda: MessageDeliveryService.deliver(instance), robust=True)
         # send_message_task.delay(instance)
+    else:
+        transaction.on_commit(lambda: MessageDeliveryService.deliver_update(instance), robust=True)
     # if created:
     #     async_to_sync(channel_layer.group_send)(
     #         f"chat_{instance.chat.id}",
@@ -66,7 +69,27 @@ def send_message(sender, instance, created, **kwargs):
 
 @receiver(post_delete, sender=Message)
 def delete_message(sender, instance, **kwargs):
-    transaction.on_commit(lambda: delete_message_task.delay(instance.id, instance.chat.id))
+    transaction.on_commit(lambda: delete_message_task.delay(instance.id, instance.chat_id))
+
+@receiver(post_save, sender=Message)
+def update_chat_state(sender, instance, created, **kwargs):
+    if created:
+        ChatService.record_message(instance)
+
+@receiver(post_delete, sender=Message)
+def refresh_chat_state(sender, instance, **kwargs):
+    ChatService.refresh_last_message(instance.chat_id)
+    ChatService.rebuild_unread_counts(instance.chat_id)
+
+@receiver(m2m_changed, sender=Chat.participants.through)
+def create_chat_read_states(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        for chat_id in pk_set:
+            ChatService.create_read_states(chat_id, [instance.id])
+    else:
+        ChatService.create_read_states(instance.id, pk_set)
 
 
 # def message_save(sender, instance, **kwargs):
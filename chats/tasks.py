@@ -5,20 +5,16 @@ from asgiref.sync import async_to_sync
 
 from .models import Chat, Message
 from .serializers import MessageReadSerializer
+from .services import MessageDeliveryService
 
 
-@shared_task
-def send_message_task(message_id):
-    message = Message.objects.get(id=message_id)
-    message_data = MessageReadSerializer(message).data
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        f"chat_{message_data['chat']}",
-        {
-            "type": "send_message",
-            "message": message_data
-        }
-    )
+@shared_task(autoretry_for=(Exception,), retry_backoff=True, max_retries=5)
+def send_message_task(message_id, mode=MessageDeliveryService.CELERY):
+    message = Message.objects.select_related('user').filter(id=message_id, delivered_at__isnull=True).first()
+    if message is None:
+        return
+    MessageDeliveryService.publish(message.chat_id, MessageReadSerializer(message).data)
+    MessageDeliveryService.mark_delivered(message, mode)
     # async_to_sync(channel_layer.group_send)(
     #     f"user_chats_{message_data['user']['id']}",
     #     {
@@ -34,6 +30,10 @@ def send_message_task(message_id):
     #     }
     # )
 
+@shared_task
+def redeliver_messages_task():
+    return MessageDeliveryService.redeliver_pending()
+
 @shared_task
 def delete_message_task(message_id, chat_id):
     channel_layer = get_channel_layer()
@@ -0,0 +1,71 @@
+import pytest
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from .factories import UserFactory, ChatFactory, MessageFactory, BlockFactory
+from chats.consumers import MessagesConsumer
+from chats.models import Message
+
+@pytest.fixture(autouse=True)
+def disable_cache():
+    cache.clear()
+
+def run_frames(user, participant, frames, receive_count):
+    async def run():
+        communicator = WebsocketCommunicator(MessagesConsumer.as_asgi(), f"/ws/messages?participant={participant.id}")
+        communicator.scope['user'] = user
+        connected, _ = await communicator.connect()
+        assert connected
+        for frame in frames:
+            await communicator.send_json_to(frame)
+        responses = [await communicator.receive_json_from(timeout=5) for _ in range(receive_count)]
+        await communicator.disconnect()
+        return responses
+    return async_to_sync(run)()
+
+@pytest.mark.django_db(transaction=True)
+class TestMessagesConsumer:
+    def test_send_message(self):
+        user = UserFactory()
+        user2 = UserFactory()
+        chat = ChatFactory(participants=[user, user2])
+        responses = run_frames(user, user2, [{'type': 'send_message', 'content': 'test_content'}], 1)
+        assert responses[0]['type'] == 'send_message'
+        assert responses[0]['message']['content'] == 'test_content'
+        assert Message.objects.get(chat=chat).user == user
+
+    def test_edit_message_with_not_sender(self):
+        user = UserFactory()
+        user2 = UserFactory()
+        chat = ChatFactory(participants=[user, user2])
+        message = MessageFactory(chat=chat, user=user2, content='test_content')
+        responses = run_frames(user, user2, [{'type': 'edit_message', 'message': message.id, 'content': 'updated'}], 1)
+        assert responses[0] == {'type': 'error', 'errors': 'Message not found'}
+        message.refresh_from_db()
+        assert message.content == 'test_content'
+
+    def test_send_message_with_blocked_user(self):
+        user = UserFactory()
+        user2 = UserFactory()
+        ChatFactory(participants=[user, user2])
+        async def run():
+            communicator = WebsocketCommunicator(MessagesConsumer.as_asgi(), f"/ws/messages?participant={user2.id}")
+            communicator.scope['user'] = user
+            await communicator.connect()
+            await database_sync_to_async(BlockFactory)(blocked_by=user2, blocked_user=user)
+            await communicator.send_json_to({'type': 'send_message', 'content': 'test_content'})
+            response = await communicator.receive_json_from(timeout=5)
+            await communicator.disconnect()
+            return response
+        response = async_to_sync(run)()
+        assert response['type'] == 'error'
+        assert not Message.objects.exists()
+
+    def test_invalid_frame(self):
+        user = UserFactory()
+        user2 = UserFactory()
+        ChatFactory(participants=[user, user2])
+        responses = run_frames(user, user2, [{'type': 'edit_message', 'content': 'updated'}], 1)
+        assert responses[0]['type'] == 'error'
+        assert 'message' in responses[0]['errors']
@@ -1,5 +1,6 @@
 # from django.contrib.auth import get_user_model
 import pytest
+from chats.services import MessageService
 from .factories import (
     UserFactory,
     ChatFactory,
@@ -28,6 +29,18 @@ class TestChatModel:
         chat = ChatFactory(participants=[user, user2])
         message = MessageFactory(chat=chat, user=user)
         assert chat.last_message == message
+
+    def test_last_message_after_delete(self):
+        user = UserFactory()
+        user2 = UserFactory()
+        chat = ChatFactory(participants=[user, user2])
+        message = MessageFactory(chat=chat, user=user)
+        MessageFactory(chat=chat, user=user2).delete()
+        chat.refresh_from_db()
+        assert chat.last_message == message
+        assert chat.last_message_at == message.created_at
+        assert chat.get_unread_messages_count(user) == 0
+        assert chat.get_unread_messages_count(user2) == 1
     
     def test_unread_messages_count(self):
         user = UserFactory()
@@ -36,8 +49,7 @@ class TestChatModel:
         message = MessageFactory(chat=chat, user=user)
         assert chat.get_unread_messages_count(user) == 0
         assert chat.get_unread_messages_count(user2) == 1
-        message.is_read = True
-        message.save()
+        MessageService.mark_as_read(chat.id, user2)
         assert chat.get_unread_messages_count(user2) == 0
 
     def test_get_other_participant_with_blocked_user(self):
@@ -66,7 +78,6 @@ class TestMessageModel:
         assert message.chat == chat
         assert message.content == 'test_content'
         assert message.created_at is not None
-        assert message.is_read == False
     
     def test_string_representation(self):
         user = UserFactory()
@@ -114,6 +114,7 @@ class TestMessageReadSerializer:
         assert serializer.data['content'] == message.content
         assert serializer.data['chat'] == chat.id
         assert serializer.data['created_at'] is not None
+        assert serializer.data['is_read'] is False
 
 @pytest.mark.django_db
 class TestMessageWriteSerializer:
@@ -132,7 +133,6 @@ class TestMessageWriteSerializer:
         assert message.chat == chat
         assert message.content == "test_content"
         assert message.created_at is not None
-        assert message.is_read == False
         assert message.user == user2
 
     def test_message_non_existing_chat(self, serializer_context):        
@@ -0,0 +1,93 @@
+import pytest
+from datetime import timedelta
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.utils import timezone
+from .factories import UserFactory, ChatFactory, MessageFactory
+from chats import tasks
+from chats.models import Message
+from chats.services import MessageDeliveryService, MessageService
+
+@pytest.fixture(autouse=True)
+def disable_cache():
+    cache.clear()
+
+@pytest.mark.django_db
+class TestMessageDeliveryService:
+    def test_deliver_publishes_message(self, settings):
+        settings.MESSAGE_DELIVERY_MODE = MessageDeliveryService.DIRECT
+        user = UserFactory()
+        chat = ChatFactory(participants=[user, UserFactory()])
+        channel_layer = get_channel_layer()
+        channel_name = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(f"chat_{chat.id}", channel_name)
+        message = MessageFactory(chat=chat, user=user)
+        MessageDeliveryService.deliver(message)
+        event = async_to_sync(channel_layer.receive)(channel_name)
+        assert event['message']['id'] == message.id
+        message.refresh_from_db()
+        assert message.delivered_at is not None
+        assert sum(MessageDeliveryService.get_latency_histogram(MessageDeliveryService.DIRECT).values()) == 1
+
+    def test_deliver_falls_back_to_celery(self, settings, monkeypatch):
+        settings.MESSAGE_DELIVERY_MODE = MessageDeliveryService.DIRECT
+        delayed = []
+        def publish(chat_id, message_data):
+            raise ConnectionError
+        monkeypatch.setattr(MessageDeliveryService, 'publish', publish)
+        monkeypatch.setattr(tasks.send_message_task, 'delay', lambda *args: delayed.append(args))
+        message = MessageFactory()
+        MessageDeliveryService.deliver(message)
+        assert delayed == [(message.id, MessageDeliveryService.DIRECT)]
+        assert sum(MessageDeliveryService.get_latency_histogram(MessageDeliveryService.DIRECT).values()) == 0
+
+    def test_deliver_with_celery_mode(self, settings, monkeypatch):
+        settings.MESSAGE_DELIVERY_MODE = MessageDeliveryService.CELERY
+        delayed = []
+        monkeypatch.setattr(tasks.send_message_task, 'delay', lambda *args: delayed.append(args))
+        message = MessageFactory()
+        MessageDeliveryService.deliver(message)
+        assert delayed == [(message.id, MessageDeliveryService.CELERY)]
+
+    def test_send_message_task_records_latency_for_mode(self):
+        message = MessageFactory()
+        tasks.send_message_task(message.id, MessageDeliveryService.DIRECT)
+        message.refresh_from_db()
+        assert message.delivered_at is not None
+        assert sum(MessageDeliveryService.get_latency_histogram(MessageDeliveryService.DIRECT).values()) == 1
+        assert sum(MessageDeliveryService.get_latency_histogram(MessageDeliveryService.CELERY).values()) == 0
+
+    def test_send_message_task_skips_delivered_message(self, monkeypatch):
+        published = []
+        monkeypatch.setattr(MessageDeliveryService, 'publish', lambda chat_id, message_data: published.append(chat_id))
+        message = MessageFactory()
+        Message.objects.filter(id=message.id).update(delivered_at=timezone.now())
+        tasks.send_message_task(message.id)
+        assert published == []
+
+    def test_redeliver_pending_queues_stale_undelivered_messages(self, settings, monkeypatch):
+        settings.MESSAGE_DELIVERY_MODE = MessageDeliveryService.DIRECT
+        delayed = []
+        monkeypatch.setattr(tasks.send_message_task, 'delay', lambda *args: delayed.append(args))
+        stale = MessageFactory()
+        delivered = MessageFactory()
+        MessageFactory()
+        stale_at = timezone.now() - timedelta(seconds=settings.MESSAGE_REDELIVERY_DELAY + 1)
+        Message.objects.filter(id__in=[stale.id, delivered.id]).update(created_at=stale_at)
+        Message.objects.filter(id=delivered.id).update(delivered_at=timezone.now())
+        assert MessageDeliveryService.redeliver_pending() == 1
+        assert delayed == [(stale.id, MessageDeliveryService.DIRECT)]
+
+@pytest.mark.django_db
+class TestMessageService:
+    def test_mark_as_read_returns_newly_read_messages(self):
+        user = UserFactory()
+        user2 = UserFactory()
+        chat = ChatFactory(participants=[user, user2])
+        first_message = MessageFactory(chat=chat, user=user2)
+        MessageFactory(chat=chat, user=user)
+        assert MessageService.mark_as_read(chat.id, user) == [first_message.id]
+        assert MessageService.mark_as_read(chat.id, user) == []
+        last_message = MessageFactory(chat=chat, user=user2)
+        assert MessageService.mark_as_read(chat.id, user) == [last_message.id]
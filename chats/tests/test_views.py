@@ -1,4 +1,5 @@
 from django.urls import reverse
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -10,6 +11,10 @@ from .factories import (
     BlockFactory
 )
 
+@pytest.fixture(autouse=True)
+def disable_cache():
+    cache.clear()
+
 @pytest.fixture
 def user():
     return UserFactory()
@@ -32,6 +37,28 @@ class TestChatListCreateView:
         assert response.data[0]['participants'][0]['id'] == user.id
         assert response.data[0]['participants'][1]['id'] == user2.id
 
+    def test_get_chats_ordered_by_last_message(self, client, user):
+        chats = [ChatFactory(participants=[user, UserFactory()]) for _ in range(3)]
+        for chat in [chats[1], chats[0]]:
+            MessageFactory(chat=chat, user=chat.participants.exclude(id=user.id).first())
+        url = reverse('chat-list-create')
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert [chat['id'] for chat in response.data] == [chats[0].id, chats[1].id, chats[2].id]
+        assert response.data[0]['unread_messages_count'] == 1
+        assert response.data[2]['last_message'] is None
+
+    def test_get_chats_query_count(self, client, user, django_assert_max_num_queries):
+        for _ in range(5):
+            user2 = UserFactory()
+            chat = ChatFactory(participants=[user, user2])
+            MessageFactory(chat=chat, user=user2)
+        url = reverse('chat-list-create')
+        with django_assert_max_num_queries(10):
+            response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 5
+
     def test_create_valid_chat(self, client, user):
         user2 = UserFactory()
         url = reverse('chat-list-create')
@@ -178,6 +205,44 @@ class TestMessageListCreateView:
         response = client.post(url, data)
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
+@pytest.mark.django_db
+class TestChatMessageListView:
+    def test_get_chat_messages(self, client, user):
+        user2 = UserFactory()
+        chat = ChatFactory(participants=[user, user2])
+        messages = [MessageFactory(chat=chat, user=user2) for _ in range(3)]
+        MessageFactory()
+        url = reverse('chat-message-list', args=[chat.id])
+        response = client.get(url, {'per_page': 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert [message['id'] for message in response.data['results']] == [messages[2].id, messages[1].id]
+        response = client.get(response.data['next'])
+        assert [message['id'] for message in response.data['results']] == [messages[0].id]
+        assert response.data['next'] is None
+
+    def test_get_chat_messages_before(self, client, user):
+        user2 = UserFactory()
+        chat = ChatFactory(participants=[user, user2])
+        messages = [MessageFactory(chat=chat, user=user2) for _ in range(3)]
+        url = reverse('chat-message-list', args=[chat.id])
+        response = client.get(url, {'before': messages[2].id})
+        assert response.status_code == status.HTTP_200_OK
+        assert [message['id'] for message in response.data['results']] == [messages[1].id, messages[0].id]
+
+    def test_get_chat_messages_before_other_chat_message(self, client, user):
+        chat = ChatFactory(participants=[user, UserFactory()])
+        message = MessageFactory()
+        url = reverse('chat-message-list', args=[chat.id])
+        response = client.get(url, {'before': message.id})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_get_chat_messages_with_current_user_non_participant(self, client):
+        chat = ChatFactory()
+        MessageFactory(chat=chat)
+        url = reverse('chat-message-list', args=[chat.id])
+        response = client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
 @pytest.mark.django_db
 class TestMessageDetailView:
     def test_get_message(self, client, user):
@@ -259,6 +324,27 @@ class TestMarkAsReadView:
         url = reverse('message-detail', args=[message.id])
         response = client.get(url)
         assert response.data['is_read'] is False
+
+    def test_mark_as_read_up_to_message(self, client, user, django_capture_on_commit_callbacks):
+        user2 = UserFactory()
+        chat = ChatFactory(participants=[user.id, user2.id])
+        messages = [MessageFactory(user=user2, chat=chat) for _ in range(3)]
+        url = reverse('mark-as-read')
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = client.post(url, {'chat': chat.id, 'message': messages[1].id})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(callbacks) == 1
+        assert chat.get_unread_messages_count(user) == 1
+        url = reverse('chat-message-list', args=[chat.id])
+        response = client.get(url)
+        assert [message['is_read'] for message in response.data['results']] == [False, True, True]
+
+    def test_mark_as_read_with_other_chat_message(self, client, user):
+        chat = ChatFactory(participants=[user.id, UserFactory().id])
+        message = MessageFactory()
+        url = reverse('mark-as-read')
+        response = client.post(url, {'chat': chat.id, 'message': message.id})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
     
     def test_mark_as_read_with_blocked_user(self, client, user):
         user2 = UserFactory()
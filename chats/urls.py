@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('chats/', views.ChatListCreateView.as_view(), name='chat-list-create'),
     path('chats/<int:pk>/', views.ChatDetailView.as_view(), name='chat-detail'),
+    path('chats/<int:pk>/messages/', views.ChatMessageListView.as_view(), name='chat-message-list'),
     path('messages/', views.MessageListCreateView.as_view(), name='message-list-create'),
     path('messages/<int:pk>/', views.MessageDetailView.as_view(), name='message-detail'),
     path('mark-as-read/', views.MarkAsReadView.as_view(), name='mark-as-read')
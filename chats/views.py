@@ -1,14 +1,17 @@
+from django.http import Http404
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from .serializers import ChatReadSerializer, MessageWriteSerializer, MessageReadSerializer, ChatWriteSerializer, MarkAsReadSerializer
 from django_filters.rest_framework import DjangoFilterBackend
-from api.pagination import CustomPagination
+from api.pagination import KeysetPagination
 from .services import ChatService, MessageService
 from .permissions import CanSendMessage, CanStartChat, IsSender
+from .mixins import ChatViewerStateMixin, MessageViewerStateMixin
+from .pagination import MessageHistoryPagination
 
-class ChatListCreateView(generics.ListCreateAPIView):
+class ChatListCreateView(ChatViewerStateMixin, generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated, CanStartChat]
 
     def get_queryset(self):
@@ -36,10 +39,10 @@ class ChatDetailView(generics.RetrieveUpdateAPIView):
             return ChatReadSerializer
         return ChatWriteSerializer
 
-class MessageListCreateView(generics.ListCreateAPIView):
+class MessageListCreateView(MessageViewerStateMixin, generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated, CanSendMessage]
     filter_backends = [DjangoFilterBackend]
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     filterset_fields = ['chat']
 
     def get_queryset(self):
@@ -59,6 +62,17 @@ class MessageListCreateView(generics.ListCreateAPIView):
             return MessageReadSerializer
         return MessageWriteSerializer
 
+class ChatMessageListView(MessageViewerStateMixin, generics.ListAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = MessageReadSerializer
+    pagination_class = MessageHistoryPagination
+
+    def get_queryset(self):
+        chat = ChatService.get_participant_chat(self.kwargs['pk'], self.request.user)
+        if chat is None:
+            raise Http404
+        return MessageService.get_chat_messages(chat)
+
 class MessageDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated, IsSender]
 
@@ -93,6 +107,5 @@ class MarkAsReadView(APIView):
         serializer = MarkAsReadSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         chat = serializer.validated_data.get('chat')
-        MessageService.notify_read_messages(chat.id, request.user)
-        MessageService.mark_as_read(chat.id, request.user)
+        MessageService.mark_as_read(chat.id, request.user, serializer.validated_data.get('message'))
         return Response({"message": "Messages marked as read"}, status=status.HTTP_200_OK)
\ No newline at end of file
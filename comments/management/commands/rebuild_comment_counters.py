@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from comments.services import CommentInteractionService
+
+class Command(BaseCommand):
+    help = 'Rebuilds the denormalized vote counters of comments'
+
+    def handle(self, *args, **options):
+        updated = CommentInteractionService.rebuild_vote_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {updated} comments"))
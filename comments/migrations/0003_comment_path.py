@@ -0,0 +1,53 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_comment_paths(apps, schema_editor):
+    Comment = apps.get_model('comments', 'Comment')
+    paths = {}
+    batch = []
+    for comment in Comment.objects.order_by('id').only('id', 'parent_id').iterator(chunk_size=1000):
+        segment = f"{comment.id:010d}"
+        parent = paths.get(comment.parent_id)
+        comment.path, comment.depth = (f"{parent[0]}/{segment}", parent[1] + 1) if parent else (segment, 0)
+        paths[comment.id] = (comment.path, comment.depth)
+        batch.append(comment)
+        if len(batch) >= 1000:
+            Comment.objects.bulk_update(batch, ['path', 'depth'])
+            batch = []
+    if batch:
+        Comment.objects.bulk_update(batch, ['path', 'depth'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0002_commentreport_status_commentreport_violated_rule_and_more'),
+        ('posts', '0008_post_rankings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, default='', max_length=1024),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_comment_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='comments_co_post_id_adad8a_idx'),
+        ),
+    ]
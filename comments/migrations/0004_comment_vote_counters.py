@@ -0,0 +1,43 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:18
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_vote_counters(apps, schema_editor):
+    Comment = apps.get_model('comments', 'Comment')
+    CommentInteraction = apps.get_model('comments', 'CommentInteraction')
+
+    def count_subquery(interaction_type):
+        interactions = CommentInteraction.objects.filter(comment=OuterRef('pk'), interaction_type=interaction_type)
+        return Coalesce(Subquery(interactions.values('comment').annotate(count=Count('pk')).values('count')), 0)
+
+    Comment.objects.update(upvotes=count_subquery('upvote'), downvotes=count_subquery('downvote'))
+    Comment.objects.update(score=F('upvotes') - F('downvotes'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0003_comment_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='downvotes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='score',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='upvotes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_vote_counters, migrations.RunPython.noop),
+    ]
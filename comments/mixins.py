@@ -0,0 +1,31 @@
+from posts.serializers import PostReadSerializer
+from posts.services import PostService
+from .services import CommentViewerStateService
+
+class CompactCommentMixin:
+    def is_compact(self):
+        return self.request.query_params.get('compact') == 'true'
+
+    def include_post(self):
+        return self.request.query_params.get('include_post') == 'true'
+
+    def get_post_header(self, post=None, post_id=None):
+        if post is None and post_id:
+            post = PostService.get_post(post_id, self.request.user)
+        if post is None:
+            return None
+        return PostReadSerializer(post, context=self.get_serializer_context()).data
+
+    def add_post_header(self, response, post):
+        if isinstance(response.data, dict):
+            response.data['post'] = post
+        else:
+            response.data = {'post': post, 'results': response.data}
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and args:
+            comments = list(args[0])
+            args = (comments, *args[1:])
+            context = kwargs.setdefault('context', self.get_serializer_context())
+            context.setdefault('comment_viewer_state', CommentViewerStateService.get_viewer_state(self.request.user, [comment.id for comment in comments]))
+        return super().get_serializer(*args, **kwargs)
@@ -17,6 +17,16 @@ class Comment(models.Model):
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, default=None, related_name='replies', db_index=True)
     status = models.CharField(max_length=255, choices=COMMENT_STATUS, default='accepted')
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    path = models.CharField(max_length=1024, blank=True, default='')
+    depth = models.PositiveIntegerField(default=0)
+    upvotes = models.IntegerField(default=0)
+    downvotes = models.IntegerField(default=0)
+    score = models.IntegerField(default=0, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', 'path']),
+        ]
 
     def get_interaction(self, user):
         if user.is_authenticated:
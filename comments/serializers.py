@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from api.cache import CachedBodySerializerMixin
 from posts.models import Post
 from communities.models import Rule
 from communities.services import MemberService
@@ -48,7 +49,7 @@ class CommentUpdateSerializer(CommentWriteSerializer):
                 raise serializers.ValidationError("Only moderators can change comment status")
         return attrs
 
-class CommentReadSerializer(serializers.ModelSerializer):
+class CommentReadSerializer(CachedBodySerializerMixin, serializers.ModelSerializer):
     post = PostReadSerializer()
     user = CustomUserSerializer()
     interaction_diff = serializers.IntegerField(read_only=True)
@@ -61,6 +62,10 @@ class CommentReadSerializer(serializers.ModelSerializer):
         model = Comment
         fields = '__all__'
 
+    body_cache_prefix = 'comment_body'
+    viewer_fields = ('replies', 'interaction', 'is_author', 'is_reported')
+    nested_viewer_fields = {'user': ('block_id', 'follow_id', 'is_current_user')}
+
     def get_is_author(self, obj):
         request = self.context.get('request')
         if not request:
@@ -76,12 +81,21 @@ class CommentReadSerializer(serializers.ModelSerializer):
             return []
         return CommentReadSerializer(replies, many=True, context=self.context).data
 
+    def _get_viewer_state(self, obj):
+        viewer_state = self.context.get('comment_viewer_state')
+        if viewer_state and viewer_state.covers(obj.id):
+            return viewer_state
+        return None
+
     def get_interaction(self, obj):
         request = self.context.get('request')
         if not request:
             return None
-        user = request.user
-        interaction = obj.get_interaction(user)
+        viewer_state = self._get_viewer_state(obj)
+        if viewer_state:
+            interaction = viewer_state.get_interaction(obj.id)
+        else:
+            interaction = obj.get_interaction(request.user)
         if not interaction: 
             return None
         return CommentInteractionSerializer(interaction).data
@@ -90,8 +104,27 @@ class CommentReadSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request:
             return False
+        viewer_state = self._get_viewer_state(obj)
+        if viewer_state:
+            return viewer_state.get_is_reported(obj.id)
         return obj.get_is_reported(request.user)
 
+class CommentCompactSerializer(CommentReadSerializer):
+    post = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    def get_replies(self, obj):
+        request = self.context.get('request')
+        if not request:
+            return None
+        replies = CommentService.get_annotated_replies(obj.id, request.user)
+        return CommentCompactSerializer(replies, many=True, context=self.context).data
+
+class CommentThreadSerializer(CommentCompactSerializer):
+    more = serializers.CharField(source='thread_more', read_only=True, allow_null=True)
+
+    def get_replies(self, obj):
+        return CommentThreadSerializer(obj.thread_replies, many=True, context=self.context).data
+
 class CommentReportWriteSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), default=serializers.CurrentUserDefault())
     comment = serializers.PrimaryKeyRelatedField(queryset=Comment.objects.all())
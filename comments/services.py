@@ -1,17 +1,21 @@
 from .models import Comment, CommentInteraction
-from django.db.models import Count, F, Q
+from posts.models import Post
+from django.db.models import Count, F, Q, OuterRef, Subquery
 from django.db.models.functions import Coalesce
 from .models import CommentReport
-from django.utils import timezone
+from api.visibility import VisibilityService
+from api.vote_buffer import VoteBufferService
 from django.db.transaction import atomic
+from django.conf import settings
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 
 class CommentService:
 
     @classmethod
     def get_comment(cls, comment_id, user):
         comments = Comment.objects.filter(id=comment_id)
-        comments = cls._exclude_blocked(comments, user)
-        comments = cls._exclude_banned(comments, user)
+        comments = VisibilityService.exclude_blocked(comments, user)
+        comments = VisibilityService.exclude_banned(comments, user, community_field='post__community', user_field='user')
         comments = cls._optimize_comments_queryset(comments)
         comments = cls._annotate_comments(comments)
         return comments.first()
@@ -19,8 +23,8 @@ class CommentService:
     @classmethod
     def get_annotated_comments(cls, user):
         comments = Comment.objects.all()
-        comments = cls._exclude_blocked(comments, user)
-        comments = cls._exclude_banned(comments, user)
+        comments = VisibilityService.exclude_blocked(comments, user)
+        comments = VisibilityService.exclude_banned(comments, user, community_field='post__community', user_field='user')
         comments = cls._optimize_comments_queryset(comments)
         comments = cls._annotate_comments(comments)
         return comments
@@ -28,8 +32,8 @@ class CommentService:
     @classmethod
     def get_annotated_replies(cls, comment_id, user):
         comments = Comment.objects.filter(parent__id=comment_id)
-        comments = cls._exclude_blocked(comments, user)
-        comments = cls._exclude_banned(comments, user)
+        comments = VisibilityService.exclude_blocked(comments, user)
+        comments = VisibilityService.exclude_banned(comments, user, community_field='post__community', user_field='user')
         comments = cls._optimize_comments_queryset(comments)
         comments = cls._annotate_comments(comments)
         return comments
@@ -40,36 +44,51 @@ class CommentService:
             comment_interactions__user=user,
             comment_interactions__interaction_type=interaction_type
         )
-        comments = cls._exclude_blocked(comments, user)
-        comments = cls._exclude_banned(comments, user)
+        comments = VisibilityService.exclude_blocked(comments, user)
+        comments = VisibilityService.exclude_banned(comments, user, community_field='post__community', user_field='user')
         comments = cls._annotate_comments(cls._optimize_comments_queryset(comments))
         return comments
     
     @classmethod
     def get_parent_comments(cls, user):
         comments = Comment.objects.filter(parent__isnull=True)
-        comments = cls._exclude_blocked(comments, user)
-        comments = cls._exclude_banned(comments, user)
+        comments = VisibilityService.exclude_blocked(comments, user)
+        comments = VisibilityService.exclude_banned(comments, user, community_field='post__community', user_field='user')
         comments = cls._optimize_comments_queryset(comments)
         comments = cls._annotate_comments(comments)
         return comments
     
-    @classmethod
-    def _exclude_blocked(cls, comments, user):
-        if not user.is_authenticated:
-            return comments
-        return comments.exclude(user__blocked_by__blocked_by=user).exclude(user__blocks__blocked_user=user)
-    
-    @classmethod
-    def _exclude_banned(cls, comments, user):
-        if not user.is_authenticated:
-            return comments
-        ban_query = Q(post__community__community_bans__is_permanent=True) | Q(post__community__community_bans__expires_at__gte=timezone.now())
-        return comments.exclude(
-            ban_query &
-            ~Q(user=user) &
-            Q(post__community__community_bans__user=user)
-        )
+    @staticmethod
+    def update_comments_count(post_id, amount):
+        Post.objects.filter(pk=post_id).update(comments_count=F('comments_count') + amount)
+
+    @staticmethod
+    @atomic
+    def update_comment(comment, **validated_data):
+        status = validated_data.get('status')
+        if status and status != comment.status:
+            CommentService.update_comments_count(comment.post_id, -1 if status == 'removed' else 1)
+        for attr, value in validated_data.items():
+            setattr(comment, attr, value)
+        comment.save(update_fields=[*validated_data])
+        return comment
+
+    @staticmethod
+    def set_comment_path(comment):
+        segment = f"{comment.id:010d}"
+        if comment.parent:
+            comment.path = f"{comment.parent.path}/{segment}"
+            comment.depth = comment.parent.depth + 1
+        else:
+            comment.path = segment
+            comment.depth = 0
+        Comment.objects.filter(pk=comment.pk).update(path=comment.path, depth=comment.depth)
+
+    @staticmethod
+    def rebuild_comments_counts():
+        comments = Comment.objects.filter(post=OuterRef('pk')).exclude(status='removed')
+        comments_count = Subquery(comments.values('post').annotate(count=Count('pk')).values('count'))
+        return Post.objects.update(comments_count=Coalesce(comments_count, 0))
 
     @classmethod
     def _optimize_comments_queryset(cls, comments):
@@ -77,12 +96,100 @@ class CommentService:
 
     @classmethod
     def _annotate_comments(cls, comments):
-        return comments.annotate(
-            upvotes=Coalesce(Count('comment_interactions', filter=Q(comment_interactions__interaction_type='upvote'), distinct=True), 0),
-            downvotes=Coalesce(Count('comment_interactions', filter=Q(comment_interactions__interaction_type='downvote'), distinct=True), 0),
-            interaction_diff=F('upvotes') - F('downvotes'),
+        return comments.annotate(interaction_diff=F('score'))
+
+class CommentThreadService:
+
+    @classmethod
+    def get_thread(cls, post_id, user, parent_id=None, offset=0, depth=None, breadth=None):
+        depth = depth or settings.COMMENT_THREAD_DEPTH
+        breadth = breadth or settings.COMMENT_THREAD_BREADTH
+        comments = Comment.objects.filter(post__id=post_id)
+        base_depth = 0
+        if parent_id:
+            parent = comments.filter(id=parent_id).values('path', 'depth').first()
+            if not parent:
+                return [], None
+            comments = comments.filter(path__startswith=f"{parent['path']}/")
+            base_depth = parent['depth'] + 1
+        comments = comments.filter(depth__lte=base_depth + depth)
+        comments = VisibilityService.exclude_blocked(comments, user)
+        comments = VisibilityService.exclude_banned(comments, user, community_field='post__community', user_field='user')
+        comments = CommentService._annotate_comments(comments.select_related('user'))
+        children = {}
+        for comment in comments.order_by('path'):
+            children.setdefault(comment.parent_id, []).append(comment)
+        return cls._build_thread(children, parent_id, offset, depth, breadth)
+
+    @classmethod
+    def _build_thread(cls, children, parent_id, offset, depth, breadth):
+        siblings = children.get(parent_id, [])
+        comments = siblings[offset:offset + breadth]
+        for comment in comments:
+            if depth > 1:
+                comment.thread_replies, comment.thread_more = cls._build_thread(children, comment.id, 0, depth - 1, breadth)
+            else:
+                comment.thread_replies = []
+                comment.thread_more = cls.encode_token(comment.id, 0) if comment.id in children else None
+        more = cls.encode_token(parent_id, offset + breadth) if len(siblings) > offset + breadth else None
+        return comments, more
+
+    @staticmethod
+    def encode_token(parent_id, offset):
+        return urlsafe_b64encode(f"{parent_id or 0}:{offset}".encode('ascii')).decode('ascii')
+
+    @staticmethod
+    def decode_token(token):
+        parent_id, offset = urlsafe_b64decode(token.encode('ascii')).decode('ascii').split(':')
+        parent_id, offset = int(parent_id), int(offset)
+        if parent_id < 0 or offset < 0:
+            raise ValueError(token)
+        return parent_id or None, offset
+
+class CommentViewerState:
+    def __init__(self, comment_ids=(), interactions=None, reported_comment_ids=None):
+        self.comment_ids = set(comment_ids)
+        self.interactions = interactions or {}
+        self.reported_comment_ids = reported_comment_ids or set()
+
+    def covers(self, comment_id):
+        return comment_id in self.comment_ids
+
+    def get_interaction(self, comment_id):
+        return self.interactions.get(comment_id)
+
+    def get_is_reported(self, comment_id):
+        return comment_id in self.reported_comment_ids
+
+class CommentViewerStateService:
+    @staticmethod
+    def get_viewer_state(user, comment_ids):
+        comment_ids = set(comment_ids)
+        if not user.is_authenticated or not comment_ids:
+            return CommentViewerState(comment_ids)
+        interactions = CommentInteraction.objects.filter(user=user, comment_id__in=comment_ids)
+        interactions = {interaction.comment_id: interaction for interaction in interactions}
+        reports = CommentReport.objects.filter(user=user, comment_id__in=comment_ids, status='pending')
+        if CommentVoteBufferService.is_enabled():
+            for comment_id, interaction_type in CommentVoteBufferService.get_pending_votes(user.id, comment_ids).items():
+                if interaction_type is None:
+                    interactions.pop(comment_id, None)
+                elif comment_id in interactions:
+                    interactions[comment_id].interaction_type = interaction_type
+                else:
+                    interactions[comment_id] = CommentInteraction(user=user, comment_id=comment_id, interaction_type=interaction_type)
+        return CommentViewerState(
+            comment_ids,
+            interactions=interactions,
+            reported_comment_ids=set(reports.values_list('comment_id', flat=True)),
         )
 
+class CommentVoteBufferService(VoteBufferService):
+    kind = 'comment'
+    object_model = Comment
+    interaction_model = CommentInteraction
+    object_field = 'comment'
+    karma_field = 'comment_karma'
 
 class CommentInteractionService:
 
@@ -90,14 +197,25 @@ class CommentInteractionService:
     def get_comment_interactions(user):
         return CommentInteraction.objects.filter(user=user)
 
+    @staticmethod
+    def _update_vote_counts(comment, upvotes=0, downvotes=0):
+        Comment.objects.filter(pk=comment.pk).update(
+            upvotes=F('upvotes') + upvotes,
+            downvotes=F('downvotes') + downvotes,
+            score=F('score') + upvotes - downvotes,
+        )
+        comment.user.update_comment_karma(upvotes - downvotes)
+
     @staticmethod
     @atomic
     def create_comment_interaction(**validated_data):
         comment = validated_data.get('comment')
         interaction_type = validated_data.get('interaction_type')
-        karma_diff = 1 if interaction_type == 'upvote' else -1
         comment_interaction = CommentInteraction.objects.create(**validated_data)
-        comment.user.update_comment_karma(karma_diff)
+        if interaction_type == 'upvote':
+            CommentInteractionService._update_vote_counts(comment, upvotes=1)
+        else:
+            CommentInteractionService._update_vote_counts(comment, downvotes=1)
         return comment_interaction
 
     @staticmethod
@@ -108,9 +226,9 @@ class CommentInteractionService:
             return interaction
         comment = interaction.comment
         if interaction_type == 'upvote':
-            comment.user.update_comment_karma(2)
+            CommentInteractionService._update_vote_counts(comment, upvotes=1, downvotes=-1)
         elif interaction_type == 'downvote':
-            comment.user.update_comment_karma(-2)
+            CommentInteractionService._update_vote_counts(comment, upvotes=-1, downvotes=1)
         interaction.interaction_type = interaction_type
         interaction.save(update_fields=['interaction_type'])
         return interaction
@@ -118,12 +236,27 @@ class CommentInteractionService:
     @staticmethod
     @atomic
     def delete_comment_interaction(interaction):
-        interaction_type = interaction.interaction_type
-        karma_diff = 1 if interaction_type == 'upvote' else -1
         comment = interaction.comment
-        comment.user.update_comment_karma(karma_diff)
+        if interaction.interaction_type == 'upvote':
+            CommentInteractionService._update_vote_counts(comment, upvotes=-1)
+        else:
+            CommentInteractionService._update_vote_counts(comment, downvotes=-1)
         interaction.delete()
 
+    @staticmethod
+    @atomic
+    def rebuild_vote_counts():
+        def count_subquery(interaction_type):
+            interactions = CommentInteraction.objects.filter(comment=OuterRef('pk'), interaction_type=interaction_type)
+            return Coalesce(Subquery(interactions.values('comment').annotate(count=Count('pk')).values('count')), 0)
+
+        updated = Comment.objects.update(
+            upvotes=count_subquery('upvote'),
+            downvotes=count_subquery('downvote'),
+        )
+        Comment.objects.update(score=F('upvotes') - F('downvotes'))
+        return updated
+
 class CommentReportService:
     @classmethod
     def get_comment_reports(cls, user):
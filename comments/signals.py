@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Comment
-from notifications.models import Notification
+from .models import Comment, CommentInteraction, CommentReport
+from .services import CommentService
+from api.cache import TaggedCacheService
+from notifications.tasks import create_notification_task
 from django.contrib.contenttypes.models import ContentType
 
 @receiver(post_save, sender=Comment)
@@ -10,20 +13,41 @@ def send_comment_notification(sender, instance, created, **kwargs):
         return
     content_type = ContentType.objects.get_for_model(instance)
     if instance.parent:
-        if instance.parent.user == instance.user:
+        if instance.parent.user_id == instance.user_id:
             return
-        Notification.objects.create(    
-            message=f"u/{instance.user.username} replied to your comment.", 
-            user=instance.parent.user,
-            object_id=instance.parent.id,
-            content_type=content_type
-        )
+        args = ('comment_reply', instance.parent.user_id, content_type.id, instance.parent_id, instance.parent_id, instance.user_id, instance.user.username)
     else:
-        if instance.post.user == instance.user:
+        if instance.post.user_id == instance.user_id:
             return
-        Notification.objects.create(
-            message=f"u/{instance.user.username} commented on your post.", 
-            user=instance.post.user,
-            object_id=instance.id,
-            content_type=content_type
-        )
\ No newline at end of file
+        args = ('post_comment', instance.post.user_id, content_type.id, instance.id, instance.post_id, instance.user_id, instance.user.username)
+    transaction.on_commit(lambda: create_notification_task.delay(*args))
+
+@receiver(post_save, sender=Comment)
+def set_comment_path(sender, instance, created, **kwargs):
+    if created:
+        CommentService.set_comment_path(instance)
+
+@receiver(post_save, sender=Comment)
+def increment_post_comments_count(sender, instance, created, **kwargs):
+    if created and instance.status != 'removed':
+        CommentService.update_comments_count(instance.post_id, 1)
+
+@receiver(post_delete, sender=Comment)
+def decrement_post_comments_count(sender, instance, **kwargs):
+    if instance.status != 'removed':
+        CommentService.update_comments_count(instance.post_id, -1)
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_comment_cache(sender, instance, **kwargs):
+    tags = ['comments', f"comment:{instance.id}", f"comment_body:{instance.id}", f"post:{instance.post_id}"]
+    if instance.parent_id:
+        tags.append(f"comment:{instance.parent_id}")
+    TaggedCacheService.invalidate(*tags)
+
+@receiver([post_save, post_delete], sender=CommentInteraction)
+def invalidate_comment_interaction_cache(sender, instance, **kwargs):
+    TaggedCacheService.invalidate(f"user:{instance.user_id}", f"comment:{instance.comment_id}")
+
+@receiver([post_save, post_delete], sender=CommentReport)
+def invalidate_comment_report_cache(sender, instance, **kwargs):
+    TaggedCacheService.invalidate('comment_reports', f"user:{instance.user_id}", f"comment:{instance.comment_id}")
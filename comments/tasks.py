@@ -0,0 +1,6 @@
+from celery import shared_task
+from .services import CommentVoteBufferService
+
+@shared_task
+def flush_comment_votes():
+    CommentVoteBufferService.flush()
@@ -23,6 +23,14 @@ class TestCommentModel:
         assert comment.status == 'accepted'
         assert comment.created_at is not None
 
+    def test_comment_path(self):
+        post = PostFactory()
+        parent_comment = CommentFactory(post=post)
+        comment = CommentFactory(parent=parent_comment, post=post)
+        comment.refresh_from_db()
+        assert comment.path == f"{parent_comment.id:010d}/{comment.id:010d}"
+        assert comment.depth == 1
+
     def test_comment_creation_with_invalid_parent(self):
         post = PostFactory()
         parent_comment = CommentFactory(post=post)
@@ -0,0 +1,79 @@
+import pytest
+from django.core.management import call_command
+from .factories import CommentFactory, CommentInteractionFactory, UserFactory
+from django.core.cache import cache
+from comments.models import Comment, CommentInteraction
+from comments.services import CommentService, CommentInteractionService, CommentVoteBufferService
+
+@pytest.mark.django_db
+class TestCommentInteractionService:
+    def test_create_comment_interaction_updates_counters(self):
+        comment = CommentFactory()
+        CommentInteractionService.create_comment_interaction(comment=comment, user=UserFactory(), interaction_type='upvote')
+        CommentInteractionService.create_comment_interaction(comment=comment, user=UserFactory(), interaction_type='downvote')
+        CommentInteractionService.create_comment_interaction(comment=comment, user=UserFactory(), interaction_type='upvote')
+        comment.refresh_from_db()
+        comment.user.refresh_from_db()
+        assert comment.upvotes == 2
+        assert comment.downvotes == 1
+        assert comment.score == 1
+        assert comment.user.comment_karma == 1
+
+    def test_update_comment_interaction_updates_counters(self):
+        comment = CommentFactory()
+        interaction = CommentInteractionService.create_comment_interaction(comment=comment, user=UserFactory(), interaction_type='upvote')
+        CommentInteractionService.update_comment_interaction(interaction, interaction_type='downvote')
+        comment.refresh_from_db()
+        comment.user.refresh_from_db()
+        assert comment.upvotes == 0
+        assert comment.downvotes == 1
+        assert comment.score == -1
+        assert comment.user.comment_karma == -1
+
+    def test_delete_comment_interaction_updates_counters(self):
+        comment = CommentFactory()
+        interaction = CommentInteractionService.create_comment_interaction(comment=comment, user=UserFactory(), interaction_type='upvote')
+        CommentInteractionService.delete_comment_interaction(interaction)
+        comment.refresh_from_db()
+        comment.user.refresh_from_db()
+        assert comment.upvotes == 0
+        assert comment.score == 0
+        assert comment.user.comment_karma == 0
+
+    def test_rebuild_comment_counters_command(self):
+        comment = CommentFactory()
+        CommentInteractionFactory(comment=comment, interaction_type='upvote')
+        CommentInteractionFactory(comment=comment, interaction_type='downvote')
+        CommentInteractionFactory(comment=comment, interaction_type='downvote')
+        call_command('rebuild_comment_counters', stdout=None)
+        comment.refresh_from_db()
+        assert comment.upvotes == 1
+        assert comment.downvotes == 2
+        assert comment.score == -1
+
+@pytest.mark.django_db
+class TestCommentVoteBufferService:
+    def test_flush_applies_buffered_votes(self, settings):
+        cache.clear()
+        settings.VOTE_BUFFER_ENABLED = True
+        comment = CommentFactory()
+        user = UserFactory()
+        CommentVoteBufferService.record_vote(user.id, comment.id, 'downvote')
+        assert CommentVoteBufferService.flush() == 1
+        comment.refresh_from_db()
+        comment.user.refresh_from_db()
+        assert comment.downvotes == 1
+        assert comment.score == -1
+        assert comment.user.comment_karma == -1
+        assert CommentInteraction.objects.filter(comment=comment, user=user, interaction_type='downvote').exists()
+
+@pytest.mark.django_db
+class TestCommentService:
+    def test_update_comment_keeps_concurrent_votes(self):
+        comment = CommentFactory()
+        Comment.objects.filter(id=comment.id).update(upvotes=3, score=3)
+        CommentService.update_comment(comment, content='edited')
+        comment.refresh_from_db()
+        assert comment.content == 'edited'
+        assert comment.upvotes == 3
+        assert comment.score == 3
@@ -15,6 +15,7 @@ from .factories import (
     CommunityFactory,
     MemberFactory
 )
+from comments.services import CommentVoteBufferService
 from posts.serializers import PostReadSerializer
 from accounts.serializers import CustomUserSerializer
 
@@ -39,7 +40,42 @@ class TestCommentListCreateView:
         url = reverse('comment-list')
         response = client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
+        assert len(response.data['results']) == 1
+
+    def test_get_comments_async(self, client):
+        comment = CommentFactory(status='accepted')
+        response = client.get(reverse('comment-list-async'), {'compact': 'true', 'include_post': 'true', 'post': comment.post.id})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['post']['id'] == comment.post.id
+        assert [item['id'] for item in response.data['results']] == [comment.id]
+
+    def test_get_comments_after_new_comment(self, client):
+        CommentFactory()
+        url = reverse('comment-list')
+        response = client.get(url)
+        assert len(response.data['results']) == 1
+        CommentFactory()
+        response = client.get(url)
+        assert len(response.data['results']) == 2
+
+    def test_get_compact_comments(self, client):
+        post = PostFactory(type='text')
+        comment = CommentFactory(post=post)
+        CommentFactory(post=post, parent=comment)
+        url = reverse('comment-list')
+        response = client.get(url, {'compact': 'true'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0]['post'] == post.id
+        assert response.data['results'][0]['replies'][0]['post'] == post.id
+
+    def test_get_compact_comments_with_post_header(self, client):
+        post = PostFactory(type='text')
+        CommentFactory(post=post)
+        url = reverse('comment-list')
+        response = client.get(url, {'compact': 'true', 'include_post': 'true', 'post': post.id})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['post']['id'] == post.id
+        assert response.data['results'][0]['post'] == post.id
     
     def test_get_comments_from_blocked_user(self, client, user):
         user2 = UserFactory()
@@ -48,7 +84,7 @@ class TestCommentListCreateView:
         url = reverse('comment-list')
         response = client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 0
+        assert len(response.data['results']) == 0
     
     def test_get_comments_with_banned_user(self, client, user):
         community = CommunityFactory()
@@ -58,7 +94,7 @@ class TestCommentListCreateView:
         url = reverse('comment-list')
         response = client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 0
+        assert len(response.data['results']) == 0
     
     def test_create_comment(self, client, user):
         post = PostFactory()
@@ -179,6 +215,17 @@ class TestCommentDetailView:
         response = client.patch(url, data)
         assert response.status_code == status.HTTP_200_OK
         assert response.data['status'] == 'removed'
+
+    def test_remove_comment_decrements_post_comments_count(self, client, user):
+        community = CommunityFactory()
+        post = PostFactory(community=community)
+        MemberFactory(user=user, community=community, is_moderator=True)
+        comment = CommentFactory(post=post, status='accepted')
+        url = reverse('comment-detail', args=[comment.id])
+        response = client.patch(url, {'status': 'removed'})
+        assert response.status_code == status.HTTP_200_OK
+        post.refresh_from_db()
+        assert post.comments_count == 0
     
     def test_update_comment_if_moderator_with_invalid_data(self, client, user):
         community = CommunityFactory()
@@ -191,9 +238,87 @@ class TestCommentDetailView:
         response = client.patch(url, data)
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
+@pytest.mark.django_db
+class TestCommentThreadView:
+    def test_get_thread(self, client):
+        post = PostFactory(type='text')
+        comment = CommentFactory(post=post, status='accepted')
+        reply = CommentFactory(post=post, parent=comment, status='accepted')
+        CommentFactory(post=post, parent=reply, status='accepted')
+        url = reverse('comment-thread', args=[post.id])
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 1
+        assert response.data['results'][0]['post'] == post.id
+        assert response.data['results'][0]['replies'][0]['id'] == reply.id
+        assert len(response.data['results'][0]['replies'][0]['replies']) == 1
+
+    def test_get_thread_with_depth_limit(self, client):
+        post = PostFactory(type='text')
+        comment = CommentFactory(post=post, status='accepted')
+        reply = CommentFactory(post=post, parent=comment, status='accepted')
+        nested_reply = CommentFactory(post=post, parent=reply, status='accepted')
+        url = reverse('comment-thread', args=[post.id])
+        response = client.get(url, {'depth': 2})
+        reply_data = response.data['results'][0]['replies'][0]
+        assert reply_data['replies'] == []
+        assert reply_data['more'] is not None
+        response = client.get(url, {'cursor': reply_data['more']})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0]['id'] == nested_reply.id
+
+    def test_get_thread_with_breadth_limit(self, client):
+        post = PostFactory(type='text')
+        comments = CommentFactory.create_batch(3, post=post, status='accepted')
+        url = reverse('comment-thread', args=[post.id])
+        response = client.get(url, {'limit': 2})
+        assert [comment['id'] for comment in response.data['results']] == [comments[0].id, comments[1].id]
+        response = client.get(url, {'limit': 2, 'cursor': response.data['next']})
+        assert [comment['id'] for comment in response.data['results']] == [comments[2].id]
+        assert response.data['next'] is None
+
+    def test_get_thread_with_blocked_user(self, client, user):
+        post = PostFactory(type='text')
+        user2 = UserFactory()
+        BlockFactory(blocked_by=user, blocked_user=user2)
+        CommentFactory(post=post, user=user2, status='accepted')
+        url = reverse('comment-thread', args=[post.id])
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 0
+
+    def test_get_thread_with_post_header(self, client):
+        post = PostFactory(type='text')
+        CommentFactory(post=post, status='accepted')
+        url = reverse('comment-thread', args=[post.id])
+        response = client.get(url, {'include_post': 'true'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['post']['id'] == post.id
+
+    def test_get_thread_with_invalid_cursor(self, client):
+        post = PostFactory(type='text')
+        url = reverse('comment-thread', args=[post.id])
+        response = client.get(url, {'cursor': 'invalid'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
 @pytest.mark.django_db
 class TestCommentInteractionListCreateView:
 
+    def test_create_interaction_with_vote_buffer_invalidates_comments(self, client, user, settings):
+        settings.VOTE_BUFFER_ENABLED = True
+        comment = CommentFactory(status='accepted')
+        url = reverse('comment-list')
+        response = client.get(url)
+        assert response.data['results'][0]['interaction'] is None
+        response = client.post(reverse('comment-interaction-list'), {'comment': comment.id, 'interaction_type': 'upvote'})
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        response = client.get(url)
+        assert response.data['results'][0]['interaction']['interaction_type'] == 'upvote'
+        CommentVoteBufferService.flush()
+        response = client.get(url)
+        assert response.data['results'][0]['interaction']['interaction_type'] == 'upvote'
+        assert response.data['results'][0]['upvotes'] == 1
+
     def test_get_interactions(self, client, user):
         comment = CommentFactory()
         CommentInteractionFactory(comment=comment, user=user)
@@ -9,5 +9,7 @@ urlpatterns = [
     path('comments-interactions/', views.CommentInteractionListCreateView.as_view(), name='comment-interaction-list'),
     path('comments-interactions/<int:pk>/', views.CommentInteractionDetailView.as_view(), name='comment-interaction-detail'),
     path('comments/', views.CommentListCreateView.as_view(), name='comment-list'),
+    path('comments/async/', views.AsyncCommentListView.as_view(), name='comment-list-async'),
+    path('comments/thread/<int:post_id>/', views.CommentThreadView.as_view(), name='comment-thread'),
     path('comments/<int:pk>/', views.CommentDetailView.as_view(), name='comment-detail'),
 ]
\ No newline at end of file
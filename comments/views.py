@@ -1,42 +1,50 @@
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django.views.decorators.vary import vary_on_headers
 from rest_framework import generics, status
 from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
+from django.conf import settings
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from rest_framework.filters import OrderingFilter, SearchFilter
-from api.pagination import CustomPagination
+from api.pagination import CustomPagination, KeysetPagination
+from api.cache import CachedBodyMixin, cache_response
+from api.mixins import AsyncReadMixin
+from asgiref.sync import sync_to_async
 from .serializers import (
     CommentReadSerializer, 
     CommentWriteSerializer, 
     CommentReportReadSerializer, 
     CommentReportWriteSerializer, 
     CommentInteractionSerializer,
-    CommentUpdateSerializer
+    CommentUpdateSerializer,
+    CommentCompactSerializer,
+    CommentThreadSerializer
 )
 from django_filters.rest_framework import DjangoFilterBackend
-from .services import CommentService, CommentInteractionService, CommentReportService
+from .services import CommentService, CommentThreadService, CommentViewerStateService, CommentInteractionService, CommentReportService, CommentVoteBufferService
+from posts.services import PostService
 from .permissions import CanComment, CanInteract, IsAuthor
 from communities.permissions import CanModerate
+from .mixins import CompactCommentMixin
 
-class CommentListCreateView(generics.ListCreateAPIView):
+class CommentListCreateView(CachedBodyMixin, CompactCommentMixin, generics.ListCreateAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly & CanComment]
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     filterset_fields = ['post', 'user']
     ordering_fields = ['created_at', 'interaction_diff']
 
-    @method_decorator(cache_page(60 * 15, key_prefix="comment_list"))
-    @method_decorator(vary_on_headers('Authorization'))
+    @cache_response(60 * 15, key_prefix="comment_list", tags=['comments'])
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        response = super().list(request, *args, **kwargs)
+        if self.is_compact() and self.include_post():
+            self.add_post_header(response, self.get_post_header(post_id=request.query_params.get('post')))
+        return response
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
     def get_serializer_class(self):
         if self.request.method == 'GET':
-            return CommentReadSerializer
+            return CommentCompactSerializer if self.is_compact() else CommentReadSerializer
         return CommentWriteSerializer
 
     def get_queryset(self):
@@ -50,7 +58,16 @@ class CommentListCreateView(generics.ListCreateAPIView):
         read_serializer = CommentReadSerializer(serializer.instance, context={'request': request})
         return Response(read_serializer.data, status=status.HTTP_201_CREATED)
 
-class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AsyncCommentListView(AsyncReadMixin, CommentListCreateView):
+    @cache_response(60 * 15, key_prefix="comment_list", tags=['comments'])
+    async def get(self, request, *args, **kwargs):
+        response = await self.alist(request, *args, **kwargs)
+        if self.is_compact() and self.include_post():
+            post = await sync_to_async(self.get_post_header)(post_id=request.query_params.get('post'))
+            self.add_post_header(response, post)
+        return response
+
+class CommentDetailView(CachedBodyMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly & (IsAuthor | CanModerate)]
 
     # def get_object(self):
@@ -59,8 +76,7 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
     #         raise Http404
     #     return comment
 
-    @method_decorator(cache_page(60 * 15, key_prefix="comment_detail"))
-    @method_decorator(vary_on_headers('Authorization'))
+    @cache_response(60 * 15, key_prefix="comment_detail", tags=['comment:{pk}'])
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -73,6 +89,9 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
         if self.request.method == 'PATCH':
             return CommentUpdateSerializer
         return CommentWriteSerializer
+
+    def perform_update(self, serializer):
+        serializer.instance = CommentService.update_comment(serializer.instance, **serializer.validated_data)
     
     def update(self, request, *args, **kwargs):
         serializer = self.get_serializer(instance=self.get_object(), data=request.data)
@@ -86,16 +105,61 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
         self.perform_update(serializer)
         return Response(CommentReadSerializer(serializer.instance, context={'request': request}).data)
 
+class CommentThreadView(CachedBodyMixin, CompactCommentMixin, generics.GenericAPIView):
+    serializer_class = CommentThreadSerializer
+
+    def get(self, request, post_id, *args, **kwargs):
+        post = PostService.get_post(post_id, request.user)
+        if not post:
+            raise NotFound()
+        try:
+            cursor = request.query_params.get('cursor')
+            parent_id, offset = CommentThreadService.decode_token(cursor) if cursor else (None, 0)
+        except ValueError:
+            raise NotFound('Invalid cursor')
+        depth = self._get_limit('depth', settings.COMMENT_THREAD_MAX_DEPTH)
+        breadth = self._get_limit('limit', settings.COMMENT_THREAD_MAX_BREADTH)
+        comments, more = CommentThreadService.get_thread(post_id, request.user, parent_id, offset, depth, breadth)
+        context = self.get_serializer_context()
+        context['comment_viewer_state'] = CommentViewerStateService.get_viewer_state(request.user, self._get_comment_ids(comments))
+        serializer = self.get_serializer(comments, many=True, context=context)
+        data = {'next': more, 'results': serializer.data}
+        if self.include_post():
+            data['post'] = self.get_post_header(post=post)
+        return Response(data)
+
+    def _get_limit(self, param, max_value):
+        try:
+            value = int(self.request.query_params[param])
+        except (KeyError, ValueError):
+            return None
+        return min(value, max_value) if value > 0 else None
+
+    def _get_comment_ids(self, comments):
+        comment_ids = []
+        for comment in comments:
+            comment_ids.append(comment.id)
+            comment_ids += self._get_comment_ids(comment.thread_replies)
+        return comment_ids
+
 
 class CommentInteractionListCreateView(generics.ListCreateAPIView):
     serializer_class = CommentInteractionSerializer
     permission_classes = [IsAuthenticated & CanInteract]
 
-    @method_decorator(cache_page(60 * 15, key_prefix="comment_interaction_list"))
-    @method_decorator(vary_on_headers('Authorization'))
+    @cache_response(60 * 15, key_prefix="comment_interaction_list")
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    def create(self, request, *args, **kwargs):
+        if not CommentVoteBufferService.is_enabled():
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        comment = serializer.validated_data['comment']
+        CommentVoteBufferService.record_vote(request.user.id, comment.id, serializer.validated_data['interaction_type'])
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
     def perform_create(self, serializer):
         serializer.validated_data['user'] = self.request.user
         serializer.instance = CommentInteractionService.create_comment_interaction(**serializer.validated_data)
@@ -116,8 +180,7 @@ class CommentInteractionDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = CommentInteractionSerializer
     permission_classes = [IsAuthenticated & IsAuthor]
 
-    @method_decorator(cache_page(60 * 15, key_prefix="comment_interaction_detail"))
-    @method_decorator(vary_on_headers('Authorization'))
+    @cache_response(60 * 15, key_prefix="comment_interaction_detail")
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
@@ -147,26 +210,24 @@ class CommentInteractionDetailView(generics.RetrieveUpdateDestroyAPIView):
     #         interaction.comment.user.update_comment_karma(-2)
     #     return super().partial_update(request, *args, **kwargs)
 
-class UserUpvotedCommentsView(generics.ListAPIView):
+class UserUpvotedCommentsView(CachedBodyMixin, generics.ListAPIView):
     serializer_class = CommentReadSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPagination
 
-    @method_decorator(cache_page(60 * 15, key_prefix="user_upvoted_comment_list"))
-    @method_decorator(vary_on_headers('Authorization'))
+    @cache_response(60 * 15, key_prefix="user_upvoted_comment_list", tags=['comments'])
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
     def get_queryset(self):        
         return CommentService.get_interacted_comments(self.request.user, 'upvote')
 
-class UserDownvotedCommentsView(generics.ListAPIView):
+class UserDownvotedCommentsView(CachedBodyMixin, generics.ListAPIView):
     serializer_class = CommentReadSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPagination
 
-    @method_decorator(cache_page(60 * 15, key_prefix="user_downvoted_comment_list"))
-    @method_decorator(vary_on_headers('Authorization'))
+    @cache_response(60 * 15, key_prefix="user_downvoted_comment_list", tags=['comments'])
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -179,8 +240,7 @@ class CommentReportListCreateView(generics.ListCreateAPIView):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['comment__post__community', 'status']
 
-    @method_decorator(cache_page(60 * 15, key_prefix="comment_report_list"))
-    @method_decorator(vary_on_headers('Authorization'))
+    @cache_response(60 * 15, key_prefix="comment_report_list", tags=['comment_reports'])
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
@@ -206,8 +266,7 @@ class CommentReportDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPagination
 
-    @method_decorator(cache_page(60 * 15, key_prefix="comment_report_detail"))
-    @method_decorator(vary_on_headers('Authorization'))
+    @cache_response(60 * 15, key_prefix="comment_report_detail", tags=['comment_reports'])
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
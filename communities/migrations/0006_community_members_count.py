@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:32
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_members_count(apps, schema_editor):
+    Community = apps.get_model('communities', 'Community')
+    Member = apps.get_model('communities', 'Member')
+    members = Member.objects.filter(community=OuterRef('pk'))
+    members_count = Subquery(members.values('community').annotate(count=Count('pk')).values('count'))
+    Community.objects.update(members_count=Coalesce(members_count, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0005_alter_favorite_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='community',
+            name='members_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_members_count, migrations.RunPython.noop),
+    ]
@@ -19,6 +19,7 @@ class Community(models.Model):
     banner = models.ImageField(upload_to='banners', blank=True, null=True)
     icon = models.ImageField(upload_to='icons', blank=True, null=True)
     topics = models.ManyToManyField(Topic, related_name='topics')
+    members_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -44,10 +45,6 @@ class Community(models.Model):
     @property
     def moderators(self):
         return self.members.filter(is_moderator=True)
-    
-    @property
-    def members_count(self):
-        return self.members.count()
 
 class Rule(models.Model):
     title = models.CharField(max_length=255)
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from api.cache import CachedBodySerializerMixin
 from accounts.serializers import CustomUserSerializer
 from .models import Community, Topic, Ban, Favorite, Member, Rule
-from .services import BanService
+from .services import BanService, MemberService
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 User = get_user_model()
@@ -77,12 +78,12 @@ class RuleSerializer(serializers.ModelSerializer):
         model = Rule
         fields = '__all__'
 
-class CommunityReadSerializer(serializers.ModelSerializer):
+class CommunityReadSerializer(CachedBodySerializerMixin, serializers.ModelSerializer):
     user = CustomUserSerializer()
     topics = TopicSerializer(many=True)
     moderators = MemberReadSerializer(many=True)
     rules = RuleSerializer(many=True)
-    members_count = serializers.SerializerMethodField(read_only=True)
+    members_count = serializers.IntegerField(read_only=True)
     member_id = serializers.SerializerMethodField(read_only=True)
     favorite_id = serializers.SerializerMethodField(read_only=True)
     is_moderator = serializers.SerializerMethodField(read_only=True)
@@ -92,6 +93,14 @@ class CommunityReadSerializer(serializers.ModelSerializer):
         model = Community
         fields = '__all__'
 
+    body_cache_prefix = 'community_body'
+    viewer_fields = ('member_id', 'favorite_id', 'is_moderator', 'is_creator')
+    nested_viewer_fields = {'user': ('block_id', 'follow_id', 'is_current_user')}
+    memoize_representation = True
+
+    def get_body_tags(self, instance):
+        return [*super().get_body_tags(instance), f"community:{instance.id}"]
+
     def get_is_creator(self, obj):
         request = self.context.get('request')
         if not request:
@@ -114,10 +123,7 @@ class CommunityReadSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request:
             return None
-        return obj.get_is_moderator(request.user)
-    
-    def get_members_count(self, obj):
-        return obj.members_count
+        return MemberService.is_moderator(request.user.id, obj.id)
     
     def get_member_id(self, obj):
         request = self.context.get('request')
@@ -1,7 +1,12 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Count, F, Q, Subquery, OuterRef
+from django.db.models.functions import Coalesce
 from django.db.transaction import atomic
 from .models import Ban, Member, Community, Topic, Favorite, Rule
+from api.memo import RequestMemo, request_memoized
+from api.visibility import VisibilityService
 
 class CommunityService:
 
@@ -14,12 +19,13 @@ class CommunityService:
         community.topics.set(topics)
         community.save()
         Member.objects.create(user=validated_data['user'], community=community, is_moderator=True)
+        community.refresh_from_db(fields=['members_count'])
         return community
 
     @classmethod
     def get_community(cls, community_id, user):
         communities = Community.objects.filter(id=community_id)
-        communities = cls._exclude_banned(communities, user)
+        communities = VisibilityService.exclude_banned(communities, user, community_field='id')
         communities = cls._optimize_communities_queryset(communities)
         return communities.first()
     
@@ -32,30 +38,23 @@ class CommunityService:
     @classmethod
     def get_filtered_communities(cls, user):
         communities = Community.objects.all()
-        communities = cls._exclude_banned(communities, user)
+        communities = VisibilityService.exclude_banned(communities, user, community_field='id')
         return communities
 
     @classmethod
     def get_user_communities(cls, user):
         communities = Community.objects.filter(members__user=user)
-        communities = cls._exclude_banned(communities, user)
+        communities = VisibilityService.exclude_banned(communities, user, community_field='id')
         communities = cls._optimize_communities_queryset(communities)
         return communities
     
     @classmethod
     def get_user_moderated_communities(cls, user):
         communities = Community.objects.filter(members__user=user, members__is_moderator=True)
-        communities = cls._exclude_banned(communities, user)
+        communities = VisibilityService.exclude_banned(communities, user, community_field='id')
         communities = cls._optimize_communities_queryset(communities)
         return communities
     
-    @classmethod
-    def _exclude_banned(cls, communities, user):
-        if not user.is_authenticated:
-            return communities
-        ban_query = Q(community_bans__is_permanent=True) | Q(community_bans__expires_at__gte=timezone.now())
-        return communities.exclude(ban_query, community_bans__user=user)
-
     @classmethod
     def _optimize_communities_queryset(cls, communities):
         return communities.prefetch_related('members', 'topics', 'favorites', 'rules', 'community_bans')
@@ -78,15 +77,49 @@ class MemberService:
         return members.select_related('user', 'community').prefetch_related('user__bans')
     
     @staticmethod
+    @request_memoized('is_member')
     def is_member(user_id, community_id):
         return Member.objects.filter(user__id=user_id, community__id=community_id).exists()
 
+    @classmethod
+    @request_memoized('is_moderator')
+    def is_moderator(cls, user_id, community_id):
+        if not user_id:
+            return False
+        return int(user_id) in cls.get_moderator_ids(community_id)
+
+    @classmethod
+    def get_moderator_ids(cls, community_id):
+        key = cls._get_moderators_key(community_id)
+        moderator_ids = cache.get(key)
+        if moderator_ids is None:
+            moderator_ids = set(Member.objects.filter(community__id=community_id, is_moderator=True).values_list('user_id', flat=True))
+            cache.set(key, moderator_ids, settings.MODERATORS_CACHE_TTL)
+        return moderator_ids
+
+    @classmethod
+    def invalidate_membership(cls, community_id):
+        cache.delete(cls._get_moderators_key(community_id))
+        RequestMemo.clear('is_moderator')
+        RequestMemo.clear('is_member')
+
     @staticmethod
-    def is_moderator(user_id, community_id):
-        return Member.objects.filter(user__id=user_id, community__id=community_id, is_moderator=True).exists()
+    def update_members_count(community_id, amount):
+        Community.objects.filter(pk=community_id).update(members_count=F('members_count') + amount)
+
+    @staticmethod
+    def rebuild_members_counts():
+        members = Member.objects.filter(community=OuterRef('pk'))
+        members_count = Subquery(members.values('community').annotate(count=Count('pk')).values('count'))
+        return Community.objects.update(members_count=Coalesce(members_count, 0))
+
+    @staticmethod
+    def _get_moderators_key(community_id):
+        return f"community_moderators:{community_id}"
 
 class BanService:
     @staticmethod
+    @request_memoized('is_banned')
     def is_banned(user, community_id):
         ban_query = Q(is_permanent=True) | Q(expires_at__gt=timezone.now())
         return Ban.objects.filter(ban_query, user=user, community__id=community_id).exists()
@@ -106,30 +139,16 @@ class FavoriteService:
     @classmethod
     def get_favorites(cls, user):
         favorites = Favorite.objects.filter(user=user)
-        favorites = cls._exclude_banned(favorites, user)
+        favorites = VisibilityService.exclude_banned(favorites, user)
         return favorites
     
-    @classmethod
-    def _exclude_banned(cls, favorites, user):
-        if not user.is_authenticated:
-            return favorites
-        ban_query = Q(community__community_bans__is_permanent=True) | Q(community__community_bans__expires_at__gte=timezone.now())
-        return favorites.exclude(ban_query, community__community_bans__user=user)
-
 class RuleService:
     @classmethod
     def get_rules(cls, user):
         rules = Rule.objects.all()
-        rules = cls._exclude_banned(rules, user)
+        rules = VisibilityService.exclude_banned(rules, user)
         rules = cls._optimize_rules_queryset(rules)
         return rules
-
-    @classmethod
-    def _exclude_banned(cls, rules, user):
-        if not user.is_authenticated:
-            return rules
-        ban_query = Q(community__community_bans__is_permanent=True) | Q(community__community_bans__expires_at__gte=timezone.now())
-        return rules.exclude(ban_query, community__community_bans__user=user)
     
     @classmethod
     def _optimize_rules_queryset(cls, rules):
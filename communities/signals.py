@@ -0,0 +1,52 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from api.cache import TaggedCacheService
+from api.visibility import VisibilityService
+from .services import MemberService
+from .models import Ban, Community, Member, Rule, Topic
+
+@receiver([post_save, post_delete], sender=Ban)
+def invalidate_ban_visibility(sender, instance, **kwargs):
+    VisibilityService.invalidate_banned(instance.user_id)
+
+@receiver([post_save, post_delete], sender=Community)
+def invalidate_community_cache(sender, instance, **kwargs):
+    TaggedCacheService.invalidate(f"community:{instance.id}")
+    MemberService.invalidate_membership(instance.id)
+
+@receiver([post_save, post_delete], sender=Member)
+@receiver([post_save, post_delete], sender=Rule)
+def invalidate_community_related_cache(sender, instance, **kwargs):
+    TaggedCacheService.invalidate(f"community:{instance.community_id}")
+
+@receiver(post_save, sender=Member)
+def increment_members_count(sender, instance, created, **kwargs):
+    if created:
+        MemberService.update_members_count(instance.community_id, 1)
+    MemberService.invalidate_membership(instance.community_id)
+
+@receiver(post_delete, sender=Member)
+def decrement_members_count(sender, instance, **kwargs):
+    MemberService.update_members_count(instance.community_id, -1)
+    MemberService.invalidate_membership(instance.community_id)
+
+@receiver([post_save, pre_delete], sender=Topic)
+def invalidate_topic_communities_cache(sender, instance, **kwargs):
+    community_ids = Community.objects.filter(topics=instance).values_list('id', flat=True)
+    TaggedCacheService.invalidate(*[f"community:{community_id}" for community_id in community_ids])
+
+@receiver(m2m_changed, sender=Community.topics.through)
+def invalidate_community_topics_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear', 'post_clear'):
+        return
+    if not reverse:
+        if action == 'pre_clear':
+            return
+        community_ids = [instance.id]
+    elif action == 'pre_clear':
+        community_ids = Community.objects.filter(topics=instance).values_list('id', flat=True)
+    elif action == 'post_clear':
+        return
+    else:
+        community_ids = pk_set
+    TaggedCacheService.invalidate(*[f"community:{community_id}" for community_id in community_ids])
@@ -61,11 +61,15 @@ class TestCommunityModel:
         MemberFactory(user=user2, community=community, is_moderator=False)
         assert len(community.moderators.all()) == 1
     
-    def test_members_count_property(self):
+    def test_members_count(self):
         user = UserFactory()
         community = CommunityFactory()
-        MemberFactory(user=user, community=community)
+        member = MemberFactory(user=user, community=community)
+        community.refresh_from_db()
         assert community.members_count == 1
+        member.delete()
+        community.refresh_from_db()
+        assert community.members_count == 0
 
 @pytest.mark.django_db
 class TestTopicModel:
@@ -90,6 +90,7 @@ class TestCommunityReadSerializer:
         rule = RuleFactory(community=community)
         favorite = FavoriteFactory(user=user, community=community)
         member = MemberFactory(user=user, community=community, is_moderator=True)
+        community.refresh_from_db()
         serializer = CommunityReadSerializer(community, context=serializer_context)
         assert serializer.data['id'] == community.id
         assert serializer.data['user']['id'] == user.id
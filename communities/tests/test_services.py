@@ -0,0 +1,41 @@
+import pytest
+from django.core.cache import cache
+from .factories import UserFactory, CommunityFactory, MemberFactory, BanFactory
+from api.memo import RequestMemo
+from communities.services import MemberService, BanService
+
+@pytest.fixture(autouse=True)
+def request_memo():
+    cache.clear()
+    token = RequestMemo.start()
+    yield RequestMemo.current()
+    RequestMemo.finish(token)
+
+@pytest.mark.django_db
+class TestMemberService:
+    def test_is_moderator_is_memoized(self, request_memo):
+        user = UserFactory()
+        community = CommunityFactory()
+        MemberFactory(user=user, community=community, is_moderator=True)
+        assert MemberService.is_moderator(user.id, community.id)
+        assert MemberService.is_moderator(user.id, community.id)
+        assert request_memo.get_stats()['is_moderator'] == {'hits': 1, 'misses': 1}
+
+    def test_is_moderator_after_member_update(self, request_memo):
+        user = UserFactory()
+        community = CommunityFactory()
+        member = MemberFactory(user=user, community=community, is_moderator=False)
+        assert not MemberService.is_moderator(user.id, community.id)
+        member.is_moderator = True
+        member.save()
+        assert MemberService.is_moderator(user.id, community.id)
+
+@pytest.mark.django_db
+class TestBanService:
+    def test_is_banned_after_ban(self, request_memo):
+        user = UserFactory()
+        community = CommunityFactory()
+        assert not BanService.is_banned(user, community.id)
+        BanFactory(user=user, community=community, is_permanent=True)
+        assert BanService.is_banned(user, community.id)
+        assert request_memo.get_stats()['is_banned'] == {'hits': 0, 'misses': 2}
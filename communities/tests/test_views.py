@@ -4,6 +4,7 @@ from rest_framework import status
 from .utils import create_temp_image_file
 from django.urls import reverse
 from django.utils import timezone
+from django.core.cache import cache
 from .factories import (
     UserFactory,
     CommunityFactory, 
@@ -14,6 +15,10 @@ from .factories import (
     BanFactory
 )
 
+@pytest.fixture(autouse=True)
+def disable_cache():
+    cache.clear()
+
 @pytest.fixture
 def user():
     return UserFactory()
@@ -77,12 +82,40 @@ class TestCommunityDetailView:
         assert response.status_code == status.HTTP_200_OK
         assert response.data['name'] == community.name
 
+    def test_get_community_after_related_updates(self, client, user):
+        community = CommunityFactory()
+        url = reverse('community-detail', args=[community.id])
+        response = client.get(url)
+        assert response.data['members_count'] == 0
+        assert response.data['member_id'] is None
+        member = MemberFactory(user=user, community=community, is_moderator=True)
+        rule = RuleFactory(community=community)
+        topic = TopicFactory()
+        community.topics.add(topic)
+        response = client.get(url)
+        assert response.data['members_count'] == 1
+        assert response.data['member_id'] == member.id
+        assert response.data['is_moderator'] is True
+        assert [moderator['id'] for moderator in response.data['moderators']] == [member.id]
+        assert rule.id in [item['id'] for item in response.data['rules']]
+        assert topic.id in [item['id'] for item in response.data['topics']]
+
     def test_get_community_if_user_is_banned(self, client, user):
         community = CommunityFactory()
         BanFactory(user=user, community=community)
         url = reverse('community-detail', args=[community.id])
         response = client.get(url)
         assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_get_community_after_ban_is_lifted(self, client, user):
+        community = CommunityFactory()
+        ban = BanFactory(user=user, community=community)
+        url = reverse('community-detail', args=[community.id])
+        response = client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        ban.delete()
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
     
     def test_update_community(self, client, user):
         community = CommunityFactory(user=user)
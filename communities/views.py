@@ -14,6 +14,7 @@ from .serializers import (
 from rest_framework.filters import OrderingFilter, SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from api.pagination import CustomPagination
+from api.cache import CachedBodyMixin
 from .services import (
     CommunityService, 
     TopicService, 
@@ -24,7 +25,7 @@ from .services import (
 )
 from .permissions import IsNotBanned, IsOwner, CanModerate, CanBan
 
-class CommunityListCreateView(generics.ListCreateAPIView):
+class CommunityListCreateView(CachedBodyMixin, generics.ListCreateAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = CustomPagination
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
@@ -48,7 +49,7 @@ class CommunityListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         return CommunityService.get_communities(self.request.user)
 
-class CommunityDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CommunityDetailView(CachedBodyMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly & CanModerate]
     
     def get_serializer_class(self):
@@ -59,14 +60,14 @@ class CommunityDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         return CommunityService.get_communities(self.request.user)
 
-class UserCommunitiesView(generics.ListAPIView):
+class UserCommunitiesView(CachedBodyMixin, generics.ListAPIView):
     serializer_class = CommunityReadSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         return CommunityService.get_user_communities(self.request.user)
 
-class UserModeratedCommunitiesView(generics.ListAPIView):
+class UserModeratedCommunitiesView(CachedBodyMixin, generics.ListAPIView):
     serializer_class = CommunityReadSerializer
     permission_classes = [IsAuthenticated]
 
@@ -0,0 +1,32 @@
+from accounts.services import UserViewerStateService
+from comments.models import Comment
+from comments.services import CommentViewerStateService
+from posts.models import Post
+from posts.services import PostViewerStateService
+from .services import NotificationService
+
+class NotificationContentMixin:
+    def is_expanded(self):
+        return self.request.query_params.get('expand') == 'true'
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.is_expanded()
+        return context
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and args:
+            notifications = list(args[0])
+            args = (notifications, *args[1:])
+            context = kwargs.setdefault('context', self.get_serializer_context())
+            content_objects = NotificationService.get_content_objects(notifications, context['expand'])
+            context['content_objects'] = content_objects
+            user_ids = {notification.user_id for notification in notifications}
+            if context['expand']:
+                posts = [content_object for content_object in content_objects.values() if isinstance(content_object, Post)]
+                comment_ids = [content_object.id for content_object in content_objects.values() if isinstance(content_object, Comment)]
+                context['viewer_state'] = PostViewerStateService.get_posts_viewer_state(self.request.user, posts)
+                context['comment_viewer_state'] = CommentViewerStateService.get_viewer_state(self.request.user, comment_ids)
+                user_ids.update(content_object.user_id for content_object in content_objects.values() if isinstance(content_object, (Post, Comment)))
+            context['user_viewer_state'] = UserViewerStateService.get_viewer_state(self.request.user, user_ids)
+        return super().get_serializer(*args, **kwargs)
@@ -13,6 +13,19 @@ class Notification(models.Model):
     content_object = GenericForeignKey('content_type', 'object_id')
     created_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
+    group_key = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    actors_count = models.PositiveIntegerField(default=1)
 
     def __str__(self):
-        return f"Notification {self.message}"
\ No newline at end of file
+        return f"Notification {self.message}"
+
+class NotificationActor(models.Model):
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='actors')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    object_id = models.PositiveIntegerField(db_index=True)
+
+    class Meta:
+        unique_together = ('notification', 'user')
+
+    def __str__(self):
+        return f"NotificationActor {self.notification_id} {self.user_id}"
@@ -0,0 +1,5 @@
+from django.conf import settings
+from api.pagination import KeysetPagination
+
+class NotificationPagination(KeysetPagination):
+    page_size = settings.NOTIFICATIONS_PAGE_SIZE
@@ -1,19 +1,38 @@
 from rest_framework import serializers
+from django.contrib.contenttypes.models import ContentType
 from .models import Notification
 from accounts.serializers import CustomUserSerializer
 from django.contrib.auth import get_user_model
 from comments.serializers import CommentReadSerializer
 from posts.serializers import PostReadSerializer
 from accounts.serializers import FollowSerializer
+from comments.models import Comment
+from posts.models import Post
 
 User = get_user_model()
 
+class PostSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Post
+        fields = ['id', 'title', 'type', 'community']
+
+class CommentSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Comment
+        fields = ['id', 'post', 'parent', 'content']
+
 SERIALIZERS_MAPPING = {
     'post': PostReadSerializer,
     'follow': FollowSerializer,
     'comment': CommentReadSerializer
 }
 
+SUMMARY_SERIALIZERS_MAPPING = {
+    'post': PostSummarySerializer,
+    'follow': FollowSerializer,
+    'comment': CommentSummarySerializer
+}
+
 class NotificationSerializer(serializers.ModelSerializer):
     user = CustomUserSerializer(read_only=True)
     content_object = serializers.SerializerMethodField(read_only=True)
@@ -23,8 +42,16 @@ class NotificationSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
     def get_content_object(self, obj):
-        serializer_class = SERIALIZERS_MAPPING.get(obj.content_type.model)
-        return serializer_class(obj.content_object, context=self.context).data
+        content_objects = self.context.get('content_objects')
+        if content_objects is None:
+            content_object = obj.content_object
+        else:
+            content_object = content_objects.get((obj.content_type_id, obj.object_id))
+        if content_object is None:
+            return None
+        mapping = SERIALIZERS_MAPPING if self.context.get('expand') else SUMMARY_SERIALIZERS_MAPPING
+        serializer_class = mapping.get(self.get_content_type(obj))
+        return serializer_class(content_object, context=self.context).data
     
     def get_content_type(self, obj):
-        return obj.content_type.model
\ No newline at end of file
+        return ContentType.objects.get_for_id(obj.content_type_id).model
\ No newline at end of file
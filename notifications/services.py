@@ -0,0 +1,111 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Notification, NotificationActor
+
+class NotificationService:
+    MESSAGES = {
+        'comment_reply': ('u/{username} replied to your comment.', '{count} people replied to your comment.'),
+        'post_comment': ('u/{username} commented on your post.', '{count} people commented on your post.'),
+        'follow': ('u/{username} followed you.', '{count} people followed you.'),
+    }
+    CONTENT_RELATIONS = {
+        'post': ['user', 'community'],
+        'comment': ['user', 'post__user', 'post__community'],
+        'follow': ['follower', 'followed'],
+    }
+
+    @staticmethod
+    def get_notifications(user):
+        return user.notifications.select_related('user').order_by('-created_at')
+
+    @classmethod
+    def get_content_objects(cls, notifications, expand=False):
+        object_ids = defaultdict(set)
+        for notification in notifications:
+            object_ids[notification.content_type_id].add(notification.object_id)
+        content_objects = {}
+        for content_type_id, ids in object_ids.items():
+            content_type = ContentType.objects.get_for_id(content_type_id)
+            for content_object in cls._get_content_queryset(content_type, expand).filter(id__in=ids):
+                content_objects[(content_type_id, content_object.id)] = content_object
+        return content_objects
+
+    @classmethod
+    def _get_content_queryset(cls, content_type, expand):
+        queryset = content_type.model_class()._default_manager.all()
+        if content_type.model == 'comment':
+            queryset = queryset.annotate(interaction_diff=F('score'))
+        if expand:
+            queryset = queryset.select_related(*cls.CONTENT_RELATIONS.get(content_type.model, []))
+            if content_type.model == 'post':
+                queryset = queryset.prefetch_related('attachments')
+        return queryset
+
+    @classmethod
+    def notify(cls, kind, user_id, content_type_id, object_id, group_id, actor_id, username):
+        message, coalesced_message = cls.MESSAGES[kind]
+        group_key = f"{kind}:{group_id}"
+        since = timezone.now() - timedelta(seconds=settings.NOTIFICATIONS_COALESCE_WINDOW)
+        with transaction.atomic():
+            notification = Notification.objects.select_for_update().filter(
+                user_id=user_id,
+                group_key=group_key,
+                is_read=False,
+                created_at__gte=since
+            ).order_by('-created_at').first()
+            if notification is None:
+                notification = Notification.objects.create(
+                    user_id=user_id,
+                    content_type_id=content_type_id,
+                    object_id=object_id,
+                    group_key=group_key,
+                    message=message.format(username=username)
+                )
+                NotificationActor.objects.create(notification=notification, user_id=actor_id, object_id=object_id)
+                return notification
+            _, created = NotificationActor.objects.get_or_create(
+                notification=notification,
+                user_id=actor_id,
+                defaults={'object_id': object_id}
+            )
+            if not created:
+                return notification
+            notification.actors_count += 1
+            notification.message = coalesced_message.format(count=notification.actors_count)
+            notification.save(update_fields=['actors_count', 'message'])
+            return notification
+
+    @classmethod
+    def remove_content_object(cls, content_type, object_id):
+        actors = NotificationActor.objects.filter(notification__content_type=content_type, object_id=object_id)
+        notification_ids = set(actors.values_list('notification_id', flat=True))
+        actors.delete()
+        Notification.objects.filter(content_type=content_type, object_id=object_id).exclude(id__in=notification_ids).delete()
+        for notification in Notification.objects.filter(id__in=notification_ids).prefetch_related('actors__user'):
+            cls._refresh_actors(notification)
+
+    @classmethod
+    def _refresh_actors(cls, notification):
+        actors = list(notification.actors.all())
+        if not actors:
+            notification.delete()
+            return
+        message, coalesced_message = cls.MESSAGES[notification.group_key.split(':')[0]]
+        notification.actors_count = len(actors)
+        if len(actors) == 1:
+            notification.message = message.format(username=actors[0].user.username)
+        else:
+            notification.message = coalesced_message.format(count=len(actors))
+        if notification.object_id not in {actor.object_id for actor in actors}:
+            notification.object_id = actors[0].object_id
+        Notification.objects.filter(pk=notification.pk).update(
+            actors_count=notification.actors_count,
+            message=notification.message,
+            object_id=notification.object_id
+        )
+
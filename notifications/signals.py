@@ -1,30 +1,19 @@
 from django.db.models.signals import post_save, post_delete
 from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from django.dispatch import receiver
 from .models import Notification
-from .serializers import NotificationSerializer
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from .services import NotificationService
+from .tasks import send_notifications_task
 
 @receiver(post_save, sender=Notification)
-def send_notification(sender, instance, created, **kwargs):
-    if not created:
+def send_notification(sender, instance, created, update_fields=None, **kwargs):
+    if not created and 'actors_count' not in (update_fields or ()):
         return
-    channel_layer = get_channel_layer()
-    serializer = NotificationSerializer(instance)
-    async_to_sync(channel_layer.group_send)(
-        f"user_notifications_{instance.user.id}",
-        {
-            'type': 'send_notification',
-            'notification': serializer.data
-        }
-    )
+    transaction.on_commit(lambda: send_notifications_task.delay([instance.id]))
 
-@receiver(post_delete)
+@receiver(post_delete, sender='comments.Comment')
+@receiver(post_delete, sender='accounts.Follow')
 def cascade_generic_relation(sender, instance, **kwargs):
-    if hasattr(instance, 'id'):
-        content_type = ContentType.objects.get_for_model(sender)
-        Notification.objects.filter(
-            content_type=content_type,
-            object_id=instance.id
-        ).delete()
+    content_type = ContentType.objects.get_for_model(sender)
+    NotificationService.remove_content_object(content_type, instance.id)
@@ -0,0 +1,29 @@
+from celery import shared_task
+from channels.layers import get_channel_layer
+from asgiref.sync import async_to_sync
+
+from .models import Notification
+from .serializers import NotificationSerializer
+from .services import NotificationService
+
+
+@shared_task
+def create_notification_task(kind, user_id, content_type_id, object_id, group_id, actor_id, username):
+    NotificationService.notify(kind, user_id, content_type_id, object_id, group_id, actor_id, username)
+
+@shared_task
+def send_notifications_task(notification_ids):
+    notifications = list(Notification.objects.filter(id__in=notification_ids).select_related('user'))
+    context = {
+        'expand': True,
+        'content_objects': NotificationService.get_content_objects(notifications, expand=True)
+    }
+    channel_layer = get_channel_layer()
+    for notification_data in NotificationSerializer(notifications, many=True, context=context).data:
+        async_to_sync(channel_layer.group_send)(
+            f"user_notifications_{notification_data['user']['id']}",
+            {
+                "type": "send_notification",
+                "notification": notification_data
+            }
+        )
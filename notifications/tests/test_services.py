@@ -0,0 +1,99 @@
+import pytest
+from datetime import timedelta
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_save
+from django.utils import timezone
+from posts.tests.factories import UserFactory, PostFactory, CommentFactory, SavedPostFactory
+from accounts.models import Follow
+from comments.models import Comment
+from notifications.models import Notification
+from notifications.services import NotificationService
+from notifications import signals
+from notifications.signals import send_notification
+
+@pytest.fixture(autouse=True)
+def notifications_setup():
+    post_save.disconnect(send_notification, sender=Notification)
+    yield
+    post_save.connect(send_notification, sender=Notification)
+
+@pytest.fixture
+def user():
+    return UserFactory()
+
+@pytest.fixture
+def comment(user):
+    return CommentFactory(user=user, post=PostFactory(type='text'), status='accepted')
+
+@pytest.mark.django_db
+class TestNotificationService:
+    def test_notify_coalesces_replies(self, user, comment):
+        content_type = ContentType.objects.get_for_model(comment)
+        for actor in [UserFactory(), UserFactory(), UserFactory()]:
+            NotificationService.notify('comment_reply', user.id, content_type.id, comment.id, comment.id, actor.id, actor.username)
+        notifications = Notification.objects.filter(user=user, group_key=f"comment_reply:{comment.id}")
+        assert notifications.count() == 1
+        assert notifications[0].actors_count == 3
+        assert notifications[0].message == '3 people replied to your comment.'
+
+    def test_notify_after_coalesce_window(self, user, comment, settings):
+        content_type = ContentType.objects.get_for_model(comment)
+        actor = UserFactory()
+        notification = NotificationService.notify('comment_reply', user.id, content_type.id, comment.id, comment.id, actor.id, actor.username)
+        Notification.objects.filter(id=notification.id).update(
+            created_at=timezone.now() - timedelta(seconds=settings.NOTIFICATIONS_COALESCE_WINDOW + 1)
+        )
+        NotificationService.notify('comment_reply', user.id, content_type.id, comment.id, comment.id, actor.id, actor.username)
+        assert Notification.objects.filter(user=user, group_key=f"comment_reply:{comment.id}").count() == 2
+
+    def test_notify_after_read(self, user, comment):
+        content_type = ContentType.objects.get_for_model(comment)
+        actor = UserFactory()
+        notification = NotificationService.notify('comment_reply', user.id, content_type.id, comment.id, comment.id, actor.id, actor.username)
+        notification.is_read = True
+        notification.save()
+        notification = NotificationService.notify('comment_reply', user.id, content_type.id, comment.id, comment.id, actor.id, actor.username)
+        assert notification.message == f"u/{actor.username} replied to your comment."
+
+    def test_notify_counts_distinct_actors(self, user):
+        post = PostFactory(user=user, type='text')
+        actor = UserFactory()
+        content_type = ContentType.objects.get_for_model(Comment)
+        for _ in range(2):
+            comment = CommentFactory(user=actor, post=post, status='accepted')
+            notification = NotificationService.notify('post_comment', user.id, content_type.id, comment.id, post.id, actor.id, actor.username)
+        assert notification.actors_count == 1
+        assert notification.message == f"u/{actor.username} commented on your post."
+
+    def test_remove_actor_object_keeps_group(self, user):
+        content_type = ContentType.objects.get_for_model(Follow)
+        first_follower, second_follower = UserFactory(), UserFactory()
+        for follower in [first_follower, second_follower]:
+            follow = Follow.objects.create(follower=follower, followed=user)
+            notification = NotificationService.notify('follow', user.id, content_type.id, follow.id, user.id, follower.id, follower.username)
+        assert notification.message == '2 people followed you.'
+        follow.delete()
+        notification.refresh_from_db()
+        assert notification.actors_count == 1
+        assert notification.message == f"u/{first_follower.username} followed you."
+        Follow.objects.get(follower=first_follower).delete()
+        assert not Notification.objects.filter(id=notification.id).exists()
+
+    def test_remove_actor_object_does_not_resend(self, user, monkeypatch, django_capture_on_commit_callbacks):
+        content_type = ContentType.objects.get_for_model(Follow)
+        for follower in [UserFactory(), UserFactory()]:
+            follow = Follow.objects.create(follower=follower, followed=user)
+            NotificationService.notify('follow', user.id, content_type.id, follow.id, user.id, follower.id, follower.username)
+        sent = []
+        monkeypatch.setattr(signals.send_notifications_task, 'delay', sent.append)
+        post_save.connect(send_notification, sender=Notification)
+        with django_capture_on_commit_callbacks(execute=True):
+            follow.delete()
+        assert sent == []
+
+    def test_cascade_only_for_notification_targets(self, comment, monkeypatch):
+        removed = []
+        monkeypatch.setattr(NotificationService, 'remove_content_object', lambda content_type, object_id: removed.append(content_type.model))
+        SavedPostFactory(post=comment.post).delete()
+        comment.delete()
+        assert removed == ['comment']
@@ -1,6 +1,88 @@
 import pytest
-# from rest_framework.test
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_save
+from rest_framework.test import APIClient
+from rest_framework import status
+from posts.tests.factories import UserFactory, PostFactory, CommentFactory
+from notifications.models import Notification
+from notifications.signals import send_notification
+
+@pytest.fixture(autouse=True)
+def notifications_setup():
+    cache.clear()
+    post_save.disconnect(send_notification, sender=Notification)
+    yield
+    post_save.connect(send_notification, sender=Notification)
+
+@pytest.fixture
+def user():
+    return UserFactory()
 
 @pytest.fixture
-def client_setup():
-    pass
\ No newline at end of file
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+def create_notification(user, content_object):
+    return Notification.objects.create(
+        user=user,
+        message='test_message',
+        content_type=ContentType.objects.get_for_model(content_object),
+        object_id=content_object.pk
+    )
+
+@pytest.mark.django_db
+class TestNotificationsListView:
+    def test_get_notifications(self, client, user):
+        post = PostFactory(type='text', title='test_title')
+        comment = CommentFactory(post=post, status='accepted', content='test_content')
+        create_notification(user, post)
+        create_notification(user, comment)
+        url = reverse('notifications-list')
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        content_objects = {notification['content_type']: notification['content_object'] for notification in response.data['results']}
+        assert content_objects['post']['title'] == 'test_title'
+        assert 'interaction' not in content_objects['post']
+        assert content_objects['comment']['content'] == 'test_content'
+        assert 'interaction' not in content_objects['comment']
+
+    def test_get_notifications_expanded(self, client, user):
+        post = PostFactory(type='text', title='test_title')
+        comment = CommentFactory(post=post, status='accepted')
+        create_notification(user, post)
+        create_notification(user, comment)
+        url = reverse('notifications-list')
+        response = client.get(url, {'expand': 'true'})
+        assert response.status_code == status.HTTP_200_OK
+        for notification in response.data['results']:
+            assert notification['content_object']['interaction'] is None
+            assert notification['content_object']['user']['id'] is not None
+
+    def test_get_notifications_query_count(self, client, user, django_assert_max_num_queries):
+        for _ in range(3):
+            create_notification(user, PostFactory(type='text'))
+            create_notification(user, CommentFactory(post=PostFactory(type='text'), status='accepted'))
+        url = reverse('notifications-list')
+        with django_assert_max_num_queries(6):
+            response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == Notification.objects.filter(user=user).count()
+        assert response.data['results'][0]['user']['id'] == user.id
+        assert response.data['results'][0]['user']['is_current_user']
+
+    def test_get_notifications_with_cursor(self, client, user):
+        posts = [PostFactory(type='text') for _ in range(3)]
+        for post in posts:
+            create_notification(user, post)
+        count = Notification.objects.filter(user=user).count()
+        url = reverse('notifications-list')
+        response = client.get(url, {'per_page': count - 1})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == count - 1
+        response = client.get(response.data['next'])
+        assert len(response.data['results']) == 1
+        assert response.data['next'] is None
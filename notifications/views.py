@@ -3,15 +3,19 @@ from rest_framework import generics
 from .models import Notification
 from rest_framework.permissions import IsAuthenticated
 from .serializers import NotificationSerializer
+from .mixins import NotificationContentMixin
+from .pagination import NotificationPagination
+from .services import NotificationService
 
-class NotificationsListView(generics.ListAPIView):
+class NotificationsListView(NotificationContentMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = NotificationSerializer
+    pagination_class = NotificationPagination
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+        return NotificationService.get_notifications(self.request.user)
 
-class NotificationsDetailView(generics.RetrieveUpdateAPIView):
+class NotificationsDetailView(NotificationContentMixin, generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = NotificationSerializer
 
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from posts.services import PostInteractionService
+from comments.services import CommentService
+
+class Command(BaseCommand):
+    help = 'Rebuilds the denormalized vote and comment counters of posts'
+
+    def handle(self, *args, **options):
+        updated = PostInteractionService.rebuild_vote_counts()
+        CommentService.rebuild_comments_counts()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {updated} posts"))
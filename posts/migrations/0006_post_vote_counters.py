@@ -0,0 +1,43 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:01
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_vote_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostInteraction = apps.get_model('posts', 'PostInteraction')
+
+    def count_subquery(interaction_type):
+        interactions = PostInteraction.objects.filter(post=OuterRef('pk'), interaction_type=interaction_type)
+        return Coalesce(Subquery(interactions.values('post').annotate(count=Count('pk')).values('count')), 0)
+
+    Post.objects.update(upvotes=count_subquery('upvote'), downvotes=count_subquery('downvote'))
+    Post.objects.update(score=F('upvotes') - F('downvotes'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_alter_post_community_alter_post_original_post_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='downvotes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='score',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='upvotes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_vote_counters, migrations.RunPython.noop),
+    ]
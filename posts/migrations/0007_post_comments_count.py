@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:03
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comments_count(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('comments', 'Comment')
+    comments = Comment.objects.filter(post=OuterRef('pk')).exclude(status='removed')
+    comments_count = Subquery(comments.values('post').annotate(count=Count('pk')).values('count'))
+    Post.objects.update(comments_count=Coalesce(comments_count, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0002_commentreport_status_commentreport_violated_rule_and_more'),
+        ('posts', '0006_post_vote_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_comments_count, migrations.RunPython.noop),
+    ]
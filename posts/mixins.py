@@ -0,0 +1,10 @@
+from .services import PostViewerStateService
+
+class PostViewerStateMixin:
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and args:
+            posts = list(args[0])
+            args = (posts, *args[1:])
+            context = kwargs.setdefault('context', self.get_serializer_context())
+            context['viewer_state'] = PostViewerStateService.get_posts_viewer_state(self.request.user, posts)
+        return super().get_serializer(*args, **kwargs)
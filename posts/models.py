@@ -31,6 +31,13 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     is_spoiler = models.BooleanField(default=False)
     is_nsfw = models.BooleanField(default=False)
+    upvotes = models.IntegerField(default=0)
+    downvotes = models.IntegerField(default=0)
+    score = models.IntegerField(default=0, db_index=True)
+    comments_count = models.IntegerField(default=0)
+    hot_score = models.FloatField(default=0, db_index=True)
+    rising_score = models.FloatField(default=0, db_index=True)
+    score_snapshot = models.IntegerField(default=0)
 
     def __str__(self):
         return self.title
@@ -53,10 +60,6 @@ class Post(models.Model):
         self.full_clean()
         return super().save(*args, **kwargs)
     
-    @property
-    def comments_count(self):
-        return self.comments.count()
-    
     def get_user_interaction(self, user):
         if user.is_authenticated:
             return self.post_interactions.filter(user=user).first()
@@ -1,9 +1,11 @@
 from rest_framework import serializers
+from api.cache import CachedBodySerializerMixin
 from .models import Post, SavedPost, Attachment, PostInteraction, PostReport
 from communities.models import Community, Rule
 from communities.serializers import RuleSerializer
 from accounts.serializers import CustomUserSerializer
 from communities.serializers import CommunityReadSerializer
+from communities.services import MemberService
 from django.contrib.auth import get_user_model
 from .services import PostService, PostReportService
 User = get_user_model()
@@ -90,7 +92,7 @@ class PostUpdateSerializer(PostWriteSerializer):
         attrs = super().validate(attrs)
         user = self.context.get('request').user
         community = self.instance.community
-        if user != self.instance.user and community.members.filter(user=user, is_moderator=True).exists():
+        if user != self.instance.user and community and MemberService.is_moderator(user.id, community.id):
             if 'status' not in attrs or len(attrs) > 1:
                 raise serializers.ValidationError("Moderators can only change the status of posts")
         return attrs
@@ -98,16 +100,16 @@ class PostUpdateSerializer(PostWriteSerializer):
     def validate_status(self, value):
         user = self.context.get('request').user
         community = self.instance.community
-        if community and not community.members.filter(user=user, is_moderator=True).exists():
+        if community and not MemberService.is_moderator(user.id, community.id):
             raise serializers.ValidationError("You are not a moderator of this community")
         return value
 
-class PostReadSerializer(serializers.ModelSerializer):
+class PostReadSerializer(CachedBodySerializerMixin, serializers.ModelSerializer):
     user = CustomUserSerializer()
     community = CommunityReadSerializer()
     attachments = AttachmentSerializer(many=True)
     comments_count = serializers.IntegerField()
-    interaction_diff = serializers.IntegerField(required=False)
+    interaction_diff = serializers.IntegerField(source='score', read_only=True)
     interaction = serializers.SerializerMethodField()
     original_post = serializers.SerializerMethodField()
     saved_post_id = serializers.SerializerMethodField()
@@ -119,17 +121,31 @@ class PostReadSerializer(serializers.ModelSerializer):
         fields = '__all__'
         # fields = ['id', 'user', 'title', 'type', 'is_nsfw', 'is_spoiler', 'content', 'link', 'attachments']
 
+    body_cache_prefix = 'post_body'
+    viewer_fields = ('interaction', 'original_post', 'saved_post_id', 'is_author', 'is_reported')
+    nested_viewer_fields = {'user': ('block_id', 'follow_id', 'is_current_user')}
+
     def get_is_author(self, obj):
         request = self.context.get('request')
         if not request:
             return False
         return obj.user == request.user
     
+    def _get_viewer_state(self, obj):
+        viewer_state = self.context.get('viewer_state')
+        if viewer_state and viewer_state.covers(obj.id):
+            return viewer_state
+        return None
+
     def get_interaction(self, obj):
         request = self.context.get('request')
         if not request:
             return None
-        interaction = obj.get_user_interaction(request.user)
+        viewer_state = self._get_viewer_state(obj)
+        if viewer_state:
+            interaction = viewer_state.get_interaction(obj.id)
+        else:
+            interaction = obj.get_user_interaction(request.user)
         if not interaction:
             return None
         return PostInteractionSerializer(interaction).data
@@ -138,12 +154,18 @@ class PostReadSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request:
             return None
+        viewer_state = self._get_viewer_state(obj)
+        if viewer_state:
+            return viewer_state.get_saved_post_id(obj.id)
         return obj.get_saved_post_id(request.user)
     
     def get_is_reported(self, obj):
         request = self.context.get('request')
         if not request:
             return False
+        viewer_state = self._get_viewer_state(obj)
+        if viewer_state:
+            return viewer_state.get_is_reported(obj.id)
         return obj.get_is_reported(request.user)
     
     def get_original_post(self, obj):
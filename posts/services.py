@@ -1,17 +1,34 @@
 from .models import Post, Attachment, PostReport, PostInteraction, SavedPost
 from django.db.transaction import atomic
-from django.db.models import Count, F, Q
+from django.db.models import Count, F, Q, OuterRef, Subquery
 from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from redis.exceptions import WatchError
+from asgiref.sync import sync_to_async
+from api.cache import TaggedCacheService
+from api.visibility import VisibilityService
+from api.vote_buffer import VoteBufferService
+from hashlib import md5
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from uuid import uuid4
+import asyncio
+import codecs
+import math
 import random
+import requests
+import time
 
 class PostService:
 
     @classmethod
     def get_post(cls, post_id, user):
         posts = Post.objects.filter(pk=post_id)
-        posts = cls._exclude_blocked(posts, user)
-        posts = cls._exclude_banned(posts, user)
+        posts = VisibilityService.exclude_blocked(posts, user)
+        posts = VisibilityService.exclude_banned(posts, user, user_field='user')
         posts = cls._prefetch_posts(posts)
         posts = cls._annotate_posts(posts)
         return posts.first()
@@ -26,8 +43,8 @@ class PostService:
     def get_filtered_posts(cls, user):
         posts = Post.objects.all()
         if user.is_authenticated:
-            posts = cls._exclude_blocked(posts, user)
-            posts = cls._exclude_banned(posts, user)
+            posts = VisibilityService.exclude_blocked(posts, user)
+            posts = VisibilityService.exclude_banned(posts, user, user_field='user')
         return posts
     
     @staticmethod
@@ -44,13 +61,15 @@ class PostService:
                 for attachment in attachments
             ]
             Attachment.objects.bulk_create(attachments)
+        TaggedCacheService.invalidate(f"post_body:{post_id}")
         return post
     
     @staticmethod
     def create_post(**validated_data):
         status = 'accepted' if validated_data.get('community') is None else 'pending'
         files = validated_data.pop('attachments', [])
-        post = Post.objects.create(**validated_data, status=status)
+        hot_score = PostRankingService.get_hot_score(0, timezone.now())
+        post = Post.objects.create(**validated_data, status=status, hot_score=hot_score)
         attachments = [
             Attachment(file=file['file'], file_type=file['file_type'], post=post)
             for file in files
@@ -60,59 +79,17 @@ class PostService:
 
     @classmethod
     def _prefetch_posts(cls, posts):
-        return posts.select_related('user', 'community').prefetch_related('attachments', 'post_interactions', 'comments', 'post_reports', 'community__community_bans')
+        return posts.select_related('user', 'community').prefetch_related('attachments', 'post_reports', 'community__community_bans')
 
     @classmethod
-    def _annotate_posts(cls, posts):        
-        return posts.annotate(
-            upvotes=Coalesce(Count('post_interactions', filter=Q(post_interactions__interaction_type='upvote'), distinct=True), 0),
-            downvotes=Coalesce(Count('post_interactions', filter=Q(post_interactions__interaction_type='downvote'), distinct=True), 0),
-            interaction_diff=F('upvotes') - F('downvotes'),
-        )
+    def _annotate_posts(cls, posts):
+        return posts.annotate(interaction_diff=F('score'))
     
-    @classmethod
-    def _exclude_blocked(cls, posts, user):
-        if not user.is_authenticated:
-            return posts
-        return posts.exclude(user__blocked_by__blocked_by=user).exclude(user__blocks__blocked_user=user)
-
-    @classmethod
-    def _exclude_banned(cls, posts, user):
-        if not user.is_authenticated:
-            return posts
-        ban_query = Q(community__community_bans__is_permanent=True) | Q(community__community_bans__expires_at__gte=timezone.now())
-        return posts.exclude(
-            ban_query &
-            ~Q(user=user) &
-            Q(community__community_bans__user=user)
-        )
-
-    @classmethod
-    def get_feed(cls, user):
-        if user.is_authenticated:
-            communities_posts = Post.objects.filter(community__members__user=user, created_at__gte=timezone.now() - timezone.timedelta(days=3))
-            communities_posts = communities_posts.exclude(user=user)
-            communities_posts = cls._exclude_blocked(communities_posts, user)
-            communities_posts = cls._exclude_banned(communities_posts, user)
-            communities_posts = cls._prefetch_posts(communities_posts)
-            communities_posts = list(cls._annotate_posts(communities_posts).order_by('?', '-created_at'))
-            recommended_posts = Post.objects.filter(created_at__gte=timezone.now() - timezone.timedelta(days=3)).exclude(community__members__user=user)
-            recommended_posts = recommended_posts.exclude(user=user)
-            recommended_posts = cls._exclude_blocked(recommended_posts, user)
-            recommended_posts = cls._exclude_banned(recommended_posts, user)
-            recommended_posts = cls._prefetch_posts(recommended_posts)
-            recommended_posts = list(cls._annotate_posts(recommended_posts).order_by('?', '-created_at'))
-            posts = recommended_posts + communities_posts
-            random.shuffle(posts)
-            return posts
-        else:
-            return cls._annotate_posts((cls._prefetch_posts(Post.objects)).filter(created_at__gte=timezone.now() - timezone.timedelta(days=3)).order_by('?', '-created_at'))
-
     @classmethod
     def get_interacted_posts(cls, user, interaction_type):
         posts = Post.objects.filter(post_interactions__user=user, post_interactions__interaction_type=interaction_type)
-        posts = cls._exclude_blocked(posts, user)
-        posts = cls._exclude_banned(posts, user)
+        posts = VisibilityService.exclude_blocked(posts, user)
+        posts = VisibilityService.exclude_banned(posts, user, user_field='user')
         posts = cls._prefetch_posts(posts)
         posts = cls._annotate_posts(posts)
         return posts
@@ -120,12 +97,197 @@ class PostService:
     @classmethod
     def get_saved_posts(cls, user):
         posts = Post.objects.filter(id__in=SavedPostService.get_saved_posts(user).values_list('post'))
-        posts = cls._exclude_blocked(posts, user)
-        posts = cls._exclude_banned(posts, user)
+        posts = VisibilityService.exclude_blocked(posts, user)
+        posts = VisibilityService.exclude_banned(posts, user, user_field='user')
         posts = cls._prefetch_posts(posts)
         posts = cls._annotate_posts(posts)
         return posts
 
+class FeedService:
+
+    @classmethod
+    def get_feed_page(cls, user, seed=None, offset=0, page_size=None):
+        post_ids, seed, has_next = cls.get_feed_post_ids(user, seed, offset, page_size)
+        posts = PostService.get_posts(user).filter(id__in=post_ids)
+        posts_by_id = {post.id: post for post in posts}
+        posts = [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
+        return posts, seed, has_next
+
+    @classmethod
+    async def aget_feed_page(cls, user, seed=None, offset=0, page_size=None):
+        post_ids, seed, has_next = await sync_to_async(cls.get_feed_post_ids)(user, seed, offset, page_size)
+        posts = await sync_to_async(lambda: PostService.get_posts(user).filter(id__in=post_ids))()
+        posts_by_id = {post.id: post async for post in posts.aiterator(chunk_size=len(post_ids) or 1)}
+        posts = [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
+        return posts, seed, has_next
+
+    @classmethod
+    def get_feed_post_ids(cls, user, seed=None, offset=0, page_size=None):
+        page_size = page_size or settings.FEED_PAGE_SIZE
+        redis = get_redis_connection('default')
+        current_seed = redis.get(cls._get_seed_key(user))
+        current_seed = current_seed.decode() if current_seed else None
+        if seed is None or (seed != current_seed and not redis.exists(cls._get_feed_key(user, seed))):
+            seed = current_seed or cls.build_feed(user)
+            offset = 0
+        feed_key = cls._get_feed_key(user, seed)
+        post_ids = [int(post_id) for post_id in redis.zrevrange(feed_key, offset, offset + page_size - 1)]
+        has_next = offset + page_size < redis.zcard(feed_key)
+        return post_ids, seed, has_next
+
+    @classmethod
+    def build_feed(cls, user):
+        seed = str(random.getrandbits(32))
+        ranks = {}
+        for post_ids, weight in cls._get_candidates(user):
+            for post_id in post_ids:
+                ranks[post_id] = cls._rank(seed, post_id, weight)
+        redis = get_redis_connection('default')
+        feed_key = cls._get_feed_key(user, seed)
+        pipeline = redis.pipeline()
+        if ranks:
+            pipeline.zadd(feed_key, ranks)
+            pipeline.expire(feed_key, settings.FEED_TTL)
+        pipeline.set(cls._get_seed_key(user), seed, ex=settings.FEED_TTL)
+        pipeline.execute()
+        return seed
+
+    @classmethod
+    def _get_candidates(cls, user):
+        since = timezone.now() - timezone.timedelta(days=settings.FEED_WINDOW_DAYS)
+        posts = Post.objects.filter(created_at__gte=since).order_by('-created_at')
+        limit = settings.FEED_MAX_CANDIDATES
+        if not user.is_authenticated:
+            return [(posts.values_list('id', flat=True)[:limit], 1)]
+        posts = VisibilityService.exclude_blocked(posts.exclude(user=user), user)
+        posts = VisibilityService.exclude_banned(posts, user)
+        community_posts = posts.filter(community__members__user=user)
+        recommended_posts = posts.exclude(community__members__user=user)
+        return [
+            (community_posts.values_list('id', flat=True)[:limit], settings.FEED_COMMUNITY_WEIGHT),
+            (recommended_posts.values_list('id', flat=True)[:limit], settings.FEED_RECOMMENDED_WEIGHT),
+        ]
+
+    @staticmethod
+    def _rank(seed, post_id, weight):
+        return random.Random(f"{seed}:{post_id}").random() ** (1 / weight)
+
+    @staticmethod
+    def _get_seed_key(user):
+        return f"feed:{user.id if user.is_authenticated else 'anonymous'}:seed"
+
+    @staticmethod
+    def _get_feed_key(user, seed):
+        return f"feed:{user.id if user.is_authenticated else 'anonymous'}:{seed}"
+
+class PostRankingService:
+    HOT_EPOCH = 1134028003
+    SORTS = ['hot', 'top', 'rising', 'new']
+    TIME_FILTERS = {'day': 1, 'week': 7, 'month': 30, 'all': None}
+
+    @classmethod
+    def get_ranked_posts(cls, user, sort='hot', time_filter='day'):
+        posts = PostService.get_posts(user)
+        if sort == 'hot':
+            return posts.order_by('-hot_score', '-created_at')
+        if sort == 'rising':
+            since = timezone.now() - timezone.timedelta(hours=settings.RANKING_RISING_HOURS)
+            return posts.filter(created_at__gte=since, rising_score__gt=0).order_by('-rising_score', '-created_at')
+        if sort == 'new':
+            return posts.order_by('-created_at')
+        days = cls.TIME_FILTERS[time_filter]
+        if days is not None:
+            posts = posts.filter(created_at__gte=timezone.now() - timezone.timedelta(days=days))
+        return posts.order_by('-score', '-created_at')
+
+    @classmethod
+    def get_hot_score(cls, score, created_at):
+        order = math.log10(max(abs(score), 1))
+        sign = (score > 0) - (score < 0)
+        return round(sign * order + (created_at.timestamp() - cls.HOT_EPOCH) / 45000, 7)
+
+    @classmethod
+    def update_rankings(cls):
+        cls.update_hot_scores()
+        cls.update_rising_scores()
+
+    @classmethod
+    def update_hot_scores(cls):
+        posts = Post.objects.filter(~Q(score=F('score_snapshot')) | Q(hot_score=0)).only('id', 'score', 'created_at')
+        batch = []
+        for post in posts.iterator(chunk_size=settings.RANKING_BATCH_SIZE):
+            post.hot_score = cls.get_hot_score(post.score, post.created_at)
+            batch.append(post)
+            if len(batch) >= settings.RANKING_BATCH_SIZE:
+                Post.objects.bulk_update(batch, ['hot_score'])
+                batch = []
+        if batch:
+            Post.objects.bulk_update(batch, ['hot_score'])
+
+    @staticmethod
+    def update_rising_scores():
+        since = timezone.now() - timezone.timedelta(hours=settings.RANKING_RISING_HOURS)
+        posts = Post.objects.filter(~Q(score=F('score_snapshot')) | ~Q(rising_score=0))
+        posts.filter(created_at__gte=since).update(rising_score=F('score') - F('score_snapshot'), score_snapshot=F('score'))
+        posts.filter(created_at__lt=since).update(rising_score=0, score_snapshot=F('score'))
+
+class PostViewerState:
+    def __init__(self, post_ids=(), interactions=None, saved_post_ids=None, reported_post_ids=None):
+        self.post_ids = set(post_ids)
+        self.interactions = interactions or {}
+        self.saved_post_ids = saved_post_ids or {}
+        self.reported_post_ids = reported_post_ids or set()
+
+    def covers(self, post_id):
+        return post_id in self.post_ids
+
+    def get_interaction(self, post_id):
+        return self.interactions.get(post_id)
+
+    def get_saved_post_id(self, post_id):
+        return self.saved_post_ids.get(post_id)
+
+    def get_is_reported(self, post_id):
+        return post_id in self.reported_post_ids
+
+class PostViewerStateService:
+    @staticmethod
+    def get_viewer_state(user, post_ids):
+        post_ids = set(post_ids)
+        if not user.is_authenticated or not post_ids:
+            return PostViewerState(post_ids)
+        interactions = PostInteraction.objects.filter(user=user, post_id__in=post_ids)
+        interactions = {interaction.post_id: interaction for interaction in interactions}
+        saved_posts = SavedPost.objects.filter(user=user, post_id__in=post_ids)
+        reports = PostReport.objects.filter(user=user, post_id__in=post_ids, status='pending')
+        if PostVoteBufferService.is_enabled():
+            for post_id, interaction_type in PostVoteBufferService.get_pending_votes(user.id, post_ids).items():
+                if interaction_type is None:
+                    interactions.pop(post_id, None)
+                elif post_id in interactions:
+                    interactions[post_id].interaction_type = interaction_type
+                else:
+                    interactions[post_id] = PostInteraction(user=user, post_id=post_id, interaction_type=interaction_type)
+        return PostViewerState(
+            post_ids,
+            interactions=interactions,
+            saved_post_ids=dict(saved_posts.values_list('post_id', 'id')),
+            reported_post_ids=set(reports.values_list('post_id', flat=True)),
+        )
+
+    @classmethod
+    def get_posts_viewer_state(cls, user, posts):
+        post_ids = [post.id for post in posts]
+        post_ids += [post.original_post_id for post in posts if post.original_post_id]
+        return cls.get_viewer_state(user, post_ids)
+
+class PostVoteBufferService(VoteBufferService):
+    kind = 'post'
+    object_model = Post
+    interaction_model = PostInteraction
+    object_field = 'post'
+    karma_field = 'post_karma'
+
 class SavedPostService:
     @staticmethod
     def get_saved_posts(user):
@@ -159,26 +321,39 @@ class PostInteractionService:
     def _optimize_post_interactions_queryset(cls, posts):
         return posts.select_related('user', 'post')
 
+    @staticmethod
+    def _update_vote_counts(post_id, upvotes=0, downvotes=0):
+        Post.objects.filter(pk=post_id).update(
+            upvotes=F('upvotes') + upvotes,
+            downvotes=F('downvotes') + downvotes,
+            score=F('score') + upvotes - downvotes,
+        )
+
     @atomic
     @staticmethod
     def create_post_interaction(**validated_data):
-        user = validated_data.get('post').user
+        post = validated_data.get('post')
         interaction_type = validated_data.get('interaction_type')
         post_interaction = PostInteraction.objects.create(**validated_data)
-        user.update_post_karma(1 if interaction_type == 'upvote' else -1)
+        post.user.update_post_karma(1 if interaction_type == 'upvote' else -1)
+        if interaction_type == 'upvote':
+            PostInteractionService._update_vote_counts(post.id, upvotes=1)
+        else:
+            PostInteractionService._update_vote_counts(post.id, downvotes=1)
         return post_interaction
     
     @atomic
     @staticmethod
     def update_post_interaction(interaction, **validated_data):
         interaction_type = validated_data.get('interaction_type')
-        print(validated_data)
         if not interaction_type or interaction_type == interaction.interaction_type:
             return interaction
         if interaction_type == 'upvote':
             interaction.post.user.update_post_karma(2)
+            PostInteractionService._update_vote_counts(interaction.post_id, upvotes=1, downvotes=-1)
         elif interaction_type == 'downvote':
             interaction.post.user.update_post_karma(-2)
+            PostInteractionService._update_vote_counts(interaction.post_id, upvotes=-1, downvotes=1)
         interaction.interaction_type = interaction_type
         interaction.save(update_fields=['interaction_type'])
         return interaction
@@ -187,5 +362,184 @@ class PostInteractionService:
     @staticmethod
     def delete_post_interaction(interaction):
         interaction_type = interaction.interaction_type
-        interaction.post.user.update_post_karma(1 if interaction_type == 'upvote' else -1)
-        interaction.delete()
\ No newline at end of file
+        interaction.post.user.update_post_karma(-1 if interaction_type == 'upvote' else 1)
+        if interaction_type == 'upvote':
+            PostInteractionService._update_vote_counts(interaction.post_id, upvotes=-1)
+        else:
+            PostInteractionService._update_vote_counts(interaction.post_id, downvotes=-1)
+        interaction.delete()
+
+    @staticmethod
+    @atomic
+    def rebuild_vote_counts():
+        def count_subquery(interaction_type):
+            interactions = PostInteraction.objects.filter(post=OuterRef('pk'), interaction_type=interaction_type)
+            return Coalesce(Subquery(interactions.values('post').annotate(count=Count('pk')).values('count')), 0)
+
+        updated = Post.objects.update(
+            upvotes=count_subquery('upvote'),
+            downvotes=count_subquery('downvote'),
+        )
+        Post.objects.update(score=F('upvotes') - F('downvotes'))
+        return updated
+
+class LinkPreviewParser(HTMLParser):
+    META_PROPERTIES = {'og:title': 'title', 'og:description': 'description', 'og:image': 'image'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.title = ''
+        self.in_title = False
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body':
+            self.done = True
+        elif tag == 'title':
+            self.in_title = True
+        elif tag == 'meta':
+            attrs = dict(attrs)
+            field = self.META_PROPERTIES.get(attrs.get('property'))
+            if field and attrs.get('content') and field not in self.meta:
+                self.meta[field] = attrs['content'].strip()
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self.in_title = False
+        elif tag == 'head':
+            self.done = True
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title += data
+
+class LinkPreviewService:
+    FAILED = 'failed'
+    DEFAULT_PORTS = {'http': 80, 'https': 443}
+    HEADERS = {'User-Agent': 'ThredditLinkPreview/1.0', 'Accept': 'text/html,application/xhtml+xml'}
+    LOCK_POLL_INTERVAL = 0.1
+
+    @classmethod
+    def get_preview(cls, url):
+        url = cls.normalize_url(url)
+        key = cls._get_preview_key(url)
+        preview = cache.get(key)
+        if preview is None:
+            preview = cls._fetch_preview(url, key)
+        return None if preview == cls.FAILED else preview
+
+    @classmethod
+    async def aget_preview(cls, url):
+        url = cls.normalize_url(url)
+        key = cls._get_preview_key(url)
+        preview = await cache.aget(key)
+        if preview is None:
+            preview = await cls._afetch_preview(url, key)
+        return None if preview == cls.FAILED else preview
+
+    @classmethod
+    def normalize_url(cls, url):
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        if scheme not in cls.DEFAULT_PORTS or not parts.hostname:
+            raise ValueError("Invalid URL")
+        netloc = f"[{parts.hostname}]" if ':' in parts.hostname else parts.hostname
+        if parts.port and parts.port != cls.DEFAULT_PORTS[scheme]:
+            netloc = f"{netloc}:{parts.port}"
+        return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+    @classmethod
+    def fetch_preview(cls, url):
+        deadline = time.monotonic() + settings.LINK_PREVIEW_TIMEOUT
+        parser = LinkPreviewParser()
+        try:
+            with requests.get(url, headers=cls.HEADERS, stream=True, timeout=settings.LINK_PREVIEW_TIMEOUT) as response:
+                response.raise_for_status()
+                if 'html' in response.headers.get('Content-Type', 'text/html'):
+                    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+                    received = 0
+                    for chunk in response.iter_content(chunk_size=8192):
+                        received += len(chunk)
+                        parser.feed(decoder.decode(chunk))
+                        if parser.done or received >= settings.LINK_PREVIEW_MAX_BYTES or time.monotonic() > deadline:
+                            break
+                final_url = response.url
+        except (requests.RequestException, LookupError):
+            return None
+        image = parser.meta.get('image', '')
+        return {
+            'title': parser.meta.get('title') or parser.title.strip() or "No title available",
+            'description': parser.meta.get('description', ''),
+            'image': urljoin(final_url, image) if image else '',
+            'url': url,
+        }
+
+    @classmethod
+    def _fetch_preview(cls, url, key):
+        lock_key = cls._get_lock_key(key)
+        token = uuid4().hex
+        deadline = time.monotonic() + settings.LINK_PREVIEW_TIMEOUT * 2
+        while not cache.add(lock_key, token, settings.LINK_PREVIEW_TIMEOUT * 2):
+            if time.monotonic() > deadline:
+                return cls.FAILED
+            time.sleep(cls.LOCK_POLL_INTERVAL)
+            preview = cache.get(key)
+            if preview is not None:
+                return preview
+        try:
+            preview = cache.get(key)
+            if preview is None:
+                preview, timeout = cls._get_cache_entry(cls.fetch_preview(url))
+                cache.set(key, preview, timeout)
+            return preview
+        finally:
+            cls._release_lock(lock_key, token)
+
+    @classmethod
+    async def _afetch_preview(cls, url, key):
+        lock_key = cls._get_lock_key(key)
+        token = uuid4().hex
+        deadline = time.monotonic() + settings.LINK_PREVIEW_TIMEOUT * 2
+        while not await cache.aadd(lock_key, token, settings.LINK_PREVIEW_TIMEOUT * 2):
+            if time.monotonic() > deadline:
+                return cls.FAILED
+            await asyncio.sleep(cls.LOCK_POLL_INTERVAL)
+            preview = await cache.aget(key)
+            if preview is not None:
+                return preview
+        try:
+            preview = await cache.aget(key)
+            if preview is None:
+                preview, timeout = cls._get_cache_entry(await sync_to_async(cls.fetch_preview, thread_sensitive=False)(url))
+                await cache.aset(key, preview, timeout)
+            return preview
+        finally:
+            await sync_to_async(cls._release_lock)(lock_key, token)
+
+    @classmethod
+    def _get_cache_entry(cls, preview):
+        if preview is None:
+            return cls.FAILED, settings.LINK_PREVIEW_FAILURE_TTL
+        return preview, settings.LINK_PREVIEW_TTL
+
+    @staticmethod
+    def _release_lock(lock_key, token):
+        redis_key = cache.make_key(lock_key)
+        with get_redis_connection('default').pipeline() as pipeline:
+            try:
+                pipeline.watch(redis_key)
+                if cache.get(lock_key) == token:
+                    pipeline.multi()
+                    pipeline.delete(redis_key)
+                    pipeline.execute()
+            except WatchError:
+                pass
+
+    @staticmethod
+    def _get_lock_key(key):
+        return f"{key}:lock"
+
+    @staticmethod
+    def _get_preview_key(url):
+        return f"link_preview:{md5(url.encode()).hexdigest()}"
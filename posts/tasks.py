@@ -10,7 +10,7 @@ from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.db import IntegrityError
 from .models import Post
-from .services import PostService
+from .services import PostService, PostRankingService, PostVoteBufferService
 from .serializers import PostWriteSerializer
 from communities.models import Community
 User = get_user_model()
@@ -118,3 +118,11 @@ def generate_posts():
         except (ValueError, IntegrityError) as e:
             logger.error(f"Error creating post: {e}")
             continue
+
+@shared_task
+def update_post_rankings():
+    PostRankingService.update_rankings()
+
+@shared_task
+def flush_post_votes():
+    PostVoteBufferService.flush()
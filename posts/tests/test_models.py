@@ -1,4 +1,6 @@
 import pytest
+from django.core.cache import cache
+from api.cache import TaggedCacheService
 from .factories import (
     PostFactory, 
     UserFactory,
@@ -55,9 +57,19 @@ class TestPostModel:
     def test_comments_count(self):
         user = UserFactory()
         post = PostFactory(user=user, type='text')
-        CommentFactory(post=post, user=user)
+        CommentFactory(post=post, user=user, status='accepted')
+        post.refresh_from_db()
         assert post.comments_count == 1
 
+    def test_comments_count_ignores_removed_comments(self):
+        user = UserFactory()
+        post = PostFactory(user=user, type='text')
+        CommentFactory(post=post, user=user, status='removed')
+        comment = CommentFactory(post=post, user=user, status='accepted')
+        comment.delete()
+        post.refresh_from_db()
+        assert post.comments_count == 0
+
     def test_text_post_must_have_content(self):
         with pytest.raises(ValidationError, match="Text posts must have content"):
             PostFactory(type='text', content="")
@@ -101,6 +113,22 @@ class TestPostModel:
         crosspost.full_clean()
         assert crosspost.original_post == post
 
+    def test_delete_invalidates_cached_body(self):
+        cache.clear()
+        post = PostFactory(type='text')
+        TaggedCacheService.set('post_body_entry', 1, 60, [f"post_body:{post.id}"])
+        post.delete()
+        assert cache.get('post_body_entry') is None
+
+    def test_nsfw_update_does_not_requeue_check(self, django_capture_on_commit_callbacks):
+        post = PostFactory(type='text')
+        with django_capture_on_commit_callbacks() as callbacks:
+            post.save(update_fields=['is_nsfw'])
+        assert callbacks == []
+        with django_capture_on_commit_callbacks() as callbacks:
+            post.save()
+        assert len(callbacks) == 1
+
 @pytest.mark.django_db
 class TestPostInteractionModel:
     def test_post_interaction_creation(self):
@@ -124,6 +152,13 @@ class TestPostInteractionModel:
         with pytest.raises(IntegrityError):
             PostInteractionFactory(user=user, post=post)
 
+    def test_save_invalidates_cached_post(self):
+        cache.clear()
+        post = PostFactory(type='text')
+        TaggedCacheService.set('post_entry', 1, 60, [f"post:{post.id}"])
+        PostInteractionFactory(post=post, interaction_type='upvote')
+        assert cache.get('post_entry') is None
+
 @pytest.mark.django_db
 class TestSavedPostModel:
     def test_saved_post_creation(self):
@@ -0,0 +1,279 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from api.cache import TaggedCacheService
+from django.core.management import call_command
+from .factories import PostFactory, UserFactory, PostInteractionFactory, SavedPostFactory, PostReportFactory
+from posts.models import Post, PostInteraction
+import requests
+from posts.services import PostService, PostInteractionService, PostViewerStateService, PostRankingService, PostVoteBufferService, LinkPreviewService
+
+@pytest.mark.django_db
+class TestPostInteractionService:
+    def test_create_post_interaction_updates_counters(self):
+        post = PostFactory(type='text')
+        PostInteractionService.create_post_interaction(post=post, user=UserFactory(), interaction_type='upvote')
+        PostInteractionService.create_post_interaction(post=post, user=UserFactory(), interaction_type='upvote')
+        PostInteractionService.create_post_interaction(post=post, user=UserFactory(), interaction_type='downvote')
+        post.refresh_from_db()
+        assert post.upvotes == 2
+        assert post.downvotes == 1
+        assert post.score == 1
+
+    def test_update_post_interaction_updates_counters(self):
+        post = PostFactory(type='text')
+        interaction = PostInteractionService.create_post_interaction(post=post, user=UserFactory(), interaction_type='upvote')
+        PostInteractionService.update_post_interaction(interaction, interaction_type='downvote')
+        post.refresh_from_db()
+        assert post.upvotes == 0
+        assert post.downvotes == 1
+        assert post.score == -1
+
+    def test_delete_post_interaction_updates_counters(self):
+        post = PostFactory(type='text')
+        interaction = PostInteractionService.create_post_interaction(post=post, user=UserFactory(), interaction_type='downvote')
+        PostInteractionService.delete_post_interaction(interaction)
+        post.refresh_from_db()
+        assert post.downvotes == 0
+        assert post.score == 0
+
+    @pytest.mark.parametrize('interaction_type', ['upvote', 'downvote'])
+    def test_delete_post_interaction_reverts_karma(self, interaction_type):
+        post = PostFactory(type='text')
+        interaction = PostInteractionService.create_post_interaction(post=post, user=UserFactory(), interaction_type=interaction_type)
+        PostInteractionService.delete_post_interaction(interaction)
+        post.user.refresh_from_db()
+        assert post.user.post_karma == 0
+
+    def test_rebuild_post_counters_command(self):
+        post = PostFactory(type='text')
+        PostInteractionFactory(post=post, interaction_type='upvote')
+        PostInteractionFactory(post=post, interaction_type='upvote')
+        call_command('rebuild_post_counters', stdout=None)
+        post.refresh_from_db()
+        assert post.upvotes == 2
+        assert post.score == 2
+
+    def test_posts_ordered_by_interaction_diff(self):
+        user = UserFactory()
+        low = PostFactory(type='text')
+        high = PostFactory(type='text')
+        PostInteractionService.create_post_interaction(post=high, user=UserFactory(), interaction_type='upvote')
+        posts = list(PostService.get_posts(user).order_by('-interaction_diff'))
+        assert posts[0] == high
+        assert posts[1] == low
+
+@pytest.mark.django_db
+class TestPostRankingService:
+    def test_update_rankings_computes_hot_scores(self):
+        post = PostFactory(type='text')
+        other_post = PostFactory(type='text')
+        Post.objects.filter(id=post.id).update(score=10)
+        PostRankingService.update_rankings()
+        post.refresh_from_db()
+        other_post.refresh_from_db()
+        assert post.hot_score == PostRankingService.get_hot_score(10, post.created_at)
+        assert post.hot_score > other_post.hot_score
+
+    def test_update_rankings_computes_rising_scores(self):
+        post = PostFactory(type='text')
+        PostRankingService.update_rankings()
+        Post.objects.filter(id=post.id).update(score=5)
+        PostRankingService.update_rankings()
+        post.refresh_from_db()
+        assert post.rising_score == 5
+        assert post.score_snapshot == 5
+        PostRankingService.update_rankings()
+        post.refresh_from_db()
+        assert post.rising_score == 0
+
+    def test_get_ranked_posts_top(self):
+        post = PostFactory(type='text')
+        other_post = PostFactory(type='text')
+        Post.objects.filter(id=post.id).update(score=3)
+        Post.objects.filter(id=other_post.id).update(score=7)
+        posts = PostRankingService.get_ranked_posts(UserFactory(), 'top', 'week')
+        assert list(posts) == [other_post, post]
+
+@pytest.fixture
+def vote_buffer(settings):
+    cache.clear()
+    settings.VOTE_BUFFER_ENABLED = True
+
+@pytest.mark.django_db
+class TestPostVoteBufferService:
+    def test_flush_applies_buffered_votes(self, vote_buffer):
+        post = PostFactory(type='text')
+        user = UserFactory()
+        other_user = UserFactory()
+        PostVoteBufferService.record_vote(user.id, post.id, 'downvote')
+        PostVoteBufferService.record_vote(user.id, post.id, 'upvote')
+        PostVoteBufferService.record_vote(other_user.id, post.id, 'upvote')
+        assert PostVoteBufferService.flush() == 2
+        post.refresh_from_db()
+        post.user.refresh_from_db()
+        assert post.upvotes == 2
+        assert post.score == 2
+        assert post.user.post_karma == 2
+        assert PostInteraction.objects.get(post=post, user=user).interaction_type == 'upvote'
+        assert PostVoteBufferService.flush() == 0
+
+    def test_flush_updates_and_removes_existing_interactions(self, vote_buffer):
+        post = PostFactory(type='text')
+        interaction = PostInteractionService.create_post_interaction(post=post, user=UserFactory(), interaction_type='upvote')
+        other_interaction = PostInteractionService.create_post_interaction(post=post, user=UserFactory(), interaction_type='upvote')
+        PostVoteBufferService.record_vote(interaction.user_id, post.id, 'downvote')
+        PostVoteBufferService.record_vote(other_interaction.user_id, post.id)
+        PostVoteBufferService.flush()
+        post.refresh_from_db()
+        assert post.upvotes == 0
+        assert post.downvotes == 1
+        assert post.score == -1
+        assert not PostInteraction.objects.filter(id=other_interaction.id).exists()
+
+    def test_flush_skipped_while_locked(self, vote_buffer):
+        post = PostFactory(type='text')
+        PostVoteBufferService.record_vote(UserFactory().id, post.id, 'upvote')
+        cache.add(PostVoteBufferService._get_lock_key(), 1)
+        assert PostVoteBufferService.flush() == 0
+        cache.delete(PostVoteBufferService._get_lock_key())
+        assert PostVoteBufferService.flush() == 1
+        post.refresh_from_db()
+        assert post.upvotes == 1
+
+    def test_viewer_state_includes_pending_votes(self, vote_buffer):
+        post = PostFactory(type='text')
+        user = UserFactory()
+        PostVoteBufferService.record_vote(user.id, post.id, 'upvote')
+        viewer_state = PostViewerStateService.get_viewer_state(user, [post.id])
+        assert viewer_state.get_interaction(post.id).interaction_type == 'upvote'
+
+@pytest.mark.django_db
+class TestPostViewerStateService:
+    def test_get_viewer_state(self, django_assert_num_queries):
+        user = UserFactory()
+        posts = [PostFactory(type='text') for _ in range(3)]
+        interaction = PostInteractionFactory(user=user, post=posts[0], interaction_type='upvote')
+        saved_post = SavedPostFactory(user=user, post=posts[1])
+        PostReportFactory(user=user, post=posts[2], status='pending')
+        PostReportFactory(user=user, post=posts[1], status='dismissed')
+        with django_assert_num_queries(3):
+            viewer_state = PostViewerStateService.get_viewer_state(user, [post.id for post in posts])
+        assert viewer_state.get_interaction(posts[0].id) == interaction
+        assert viewer_state.get_interaction(posts[1].id) is None
+        assert viewer_state.get_saved_post_id(posts[1].id) == saved_post.id
+        assert viewer_state.get_saved_post_id(posts[0].id) is None
+        assert viewer_state.get_is_reported(posts[2].id)
+        assert not viewer_state.get_is_reported(posts[1].id)
+
+    def test_get_viewer_state_for_anonymous_user(self, django_assert_num_queries):
+        from django.contrib.auth.models import AnonymousUser
+        post = PostFactory(type='text')
+        with django_assert_num_queries(0):
+            viewer_state = PostViewerStateService.get_viewer_state(AnonymousUser(), [post.id])
+        assert viewer_state.covers(post.id)
+        assert viewer_state.get_interaction(post.id) is None
+
+class FakeResponse:
+    def __init__(self, url, body, content_type='text/html; charset=utf-8', status_code=200):
+        self.url = url
+        self.body = body.encode()
+        self.headers = {'Content-Type': content_type}
+        self.encoding = 'utf-8'
+        self.status_code = status_code
+        self.chunks_read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(self.status_code)
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            self.chunks_read += 1
+            yield self.body[start:start + chunk_size]
+
+@pytest.fixture
+def fetched_urls(monkeypatch):
+    cache.clear()
+    fetched_urls = []
+    def fake_get(url, **kwargs):
+        fetched_urls.append(url)
+        if 'broken' in url:
+            return FakeResponse(url, '', status_code=500)
+        body = (
+            '<html><head><title>Fallback title</title>'
+            '<meta property="og:title" content="Test title">'
+            '<meta property="og:image" content="/image.png"></head>'
+            '<body>' + 'x' * 100000 + '</body></html>'
+        )
+        return FakeResponse(url, body)
+    monkeypatch.setattr(requests, 'get', fake_get)
+    return fetched_urls
+
+class TestLinkPreviewService:
+    def test_normalize_url(self):
+        assert LinkPreviewService.normalize_url('HTTPS://Example.com:443#section') == 'https://example.com/'
+        assert LinkPreviewService.normalize_url('http://example.com:8000/page?q=1') == 'http://example.com:8000/page?q=1'
+        with pytest.raises(ValueError):
+            LinkPreviewService.normalize_url('ftp://example.com/')
+
+    def test_get_preview(self, fetched_urls):
+        preview = LinkPreviewService.get_preview('https://Example.com/page#top')
+        assert preview == {
+            'title': 'Test title',
+            'description': '',
+            'image': 'https://example.com/image.png',
+            'url': 'https://example.com/page',
+        }
+        assert LinkPreviewService.get_preview('https://example.com/page') == preview
+        assert fetched_urls == ['https://example.com/page']
+
+    def test_get_preview_caches_failures(self, fetched_urls):
+        assert LinkPreviewService.get_preview('https://example.com/broken') is None
+        assert LinkPreviewService.get_preview('https://example.com/broken') is None
+        assert fetched_urls == ['https://example.com/broken']
+
+    def test_aget_preview(self, fetched_urls):
+        preview = async_to_sync(LinkPreviewService.aget_preview)('https://example.com/page')
+        assert preview['title'] == 'Test title'
+        assert async_to_sync(LinkPreviewService.aget_preview)('https://example.com/page') == preview
+        assert async_to_sync(LinkPreviewService.aget_preview)('https://example.com/broken') is None
+        assert fetched_urls == ['https://example.com/page', 'https://example.com/broken']
+
+    def test_aget_preview_waits_for_other_fetcher(self, fetched_urls, settings):
+        settings.LINK_PREVIEW_TIMEOUT = 0.1
+        key = LinkPreviewService._get_preview_key('https://example.com/page')
+        cache.add(LinkPreviewService._get_lock_key(key), 'other', 60)
+        assert async_to_sync(LinkPreviewService.aget_preview)('https://example.com/page') is None
+        assert fetched_urls == []
+
+    def test_release_lock_keeps_lock_taken_by_other_fetcher(self):
+        cache.clear()
+        cache.set('link_preview:lock', 'other', 60)
+        LinkPreviewService._release_lock('link_preview:lock', 'expired')
+        assert cache.get('link_preview:lock') == 'other'
+        LinkPreviewService._release_lock('link_preview:lock', 'other')
+        assert cache.get('link_preview:lock') is None
+
+    def test_fetch_preview_stops_after_head(self, monkeypatch):
+        response = FakeResponse('https://example.com/', '<head><title>Title</title></head><body>' + 'x' * 100000 + '</body>')
+        monkeypatch.setattr(requests, 'get', lambda url, **kwargs: response)
+        preview = LinkPreviewService.fetch_preview('https://example.com/')
+        assert preview['title'] == 'Title'
+        assert response.chunks_read == 1
+
+class TestTaggedCacheService:
+    def test_set_keeps_longest_tag_ttl(self):
+        cache.clear()
+        TaggedCacheService.set('long_entry', 1, 900, ['user:1'])
+        TaggedCacheService.set('short_entry', 1, 300, ['user:1'])
+        assert get_redis_connection('default').ttl(TaggedCacheService._get_tag_key('user:1')) > 300
+        TaggedCacheService.invalidate('user:1')
+        assert cache.get('long_entry') is None
@@ -1,8 +1,11 @@
+import json
 import pytest
+from base64 import urlsafe_b64encode
 from django.urls import reverse
 from django.core.cache import cache
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
 from .factories import (
     UserFactory,
     PostFactory,
@@ -14,6 +17,10 @@ from .factories import (
     CommunityFactory,
     SavedPostFactory
 )
+from api.pagination import KeysetPagination
+from posts.models import Post, PostInteraction
+from posts.services import PostInteractionService
+from posts.views import LinkPreviewView
 
 @pytest.fixture(autouse=True)
 def disable_cache():
@@ -36,7 +43,81 @@ class TestPostListCreateView:
         url = reverse('post-list')
         response = client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
+        assert len(response.data['results']) == 1
+    
+    def test_get_posts_async(self, client, user):
+        post = PostFactory(type='text', content='test_content')
+        PostFactory(type='text', content='test_content', user=user)
+        interaction = PostInteractionFactory(post=post, user=user, interaction_type='upvote')
+        response = client.get(reverse('post-list'), {'ordering': 'created_at'})
+        async_response = client.get(reverse('post-list-async'), {'ordering': 'created_at'})
+        assert async_response.status_code == status.HTTP_200_OK
+        assert async_response.data == response.data
+        assert async_response.data['results'][0]['interaction']['id'] == interaction.id
+
+    def test_get_posts_async_with_cursor(self, client):
+        PostFactory.create_batch(3, type='text')
+        response = client.get(reverse('post-list'), {'per_page': 2, 'count': 'estimate'})
+        async_response = client.get(reverse('post-list-async'), {'per_page': 2, 'count': 'estimate'})
+        assert async_response.status_code == status.HTTP_200_OK
+        assert async_response.data['count'] == 3
+        assert async_response.data['results'] == response.data['results']
+        assert async_response.data['next'].replace('/async', '') == response.data['next']
+        async_response = client.get(async_response.data['next'])
+        assert len(async_response.data['results']) == 1
+        assert async_response.data['next'] is None
+
+    def test_create_post_async_not_allowed(self, client):
+        response = client.post(reverse('post-list-async'), data={'type': 'text', 'title': 'test_title'})
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    @pytest.mark.parametrize('ordering', ['-created_at', 'interaction_diff'])
+    def test_get_posts_with_cursor(self, client, ordering):
+        posts = PostFactory.create_batch(5, type='text')
+        Post.objects.filter(id__in=[posts[0].id, posts[1].id]).update(score=1)
+        url = reverse('post-list')
+        response = client.get(url, {'per_page': 2, 'ordering': ordering, 'count': 'estimate'})
+        assert response.data['count'] == 5
+        post_ids = [post['id'] for post in response.data['results']]
+        while response.data['next']:
+            response = client.get(response.data['next'])
+            assert response.status_code == status.HTTP_200_OK
+            post_ids += [post['id'] for post in response.data['results']]
+        expected = Post.objects.order_by(ordering.replace('interaction_diff', 'score'), '-id' if ordering.startswith('-') else 'id')
+        assert post_ids == [post.id for post in expected]
+
+    def test_get_posts_uses_default_page_size(self, client, monkeypatch):
+        monkeypatch.setattr(KeysetPagination, 'page_size', 2)
+        PostFactory.create_batch(3, type='text')
+        response = client.get(reverse('post-list'))
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 2
+        assert response.data['next'] is not None
+
+    def test_get_posts_with_invalid_cursor(self, client):
+        response = client.get(reverse('post-list'), {'cursor': 'invalid'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.parametrize('position', [['garbage', 1], ['2024-01-01T00:00:00+00:00', 'garbage'], [None, 1], [[1], 1]])
+    def test_get_posts_with_tampered_cursor(self, client, position):
+        PostFactory(type='text')
+        cursor = urlsafe_b64encode(json.dumps(position).encode()).decode('ascii')
+        response = client.get(reverse('post-list'), {'per_page': 5, 'cursor': cursor})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_get_posts_viewer_state(self, client, user):
+        post = PostFactory(type='text', content='test_content')
+        PostFactory(type='text', content='test_content')
+        interaction = PostInteractionFactory(post=post, user=user, interaction_type='upvote')
+        saved_post = SavedPostFactory(post=post, user=user)
+        url = reverse('post-list')
+        response = client.get(url, {'ordering': 'created_at'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0]['interaction']['id'] == interaction.id
+        assert response.data['results'][0]['saved_post_id'] == saved_post.id
+        assert response.data['results'][0]['is_reported'] is False
+        assert response.data['results'][1]['interaction'] is None
+        assert response.data['results'][1]['saved_post_id'] is None
     
     def test_get_posts_from_blocked_user(self, client, user):
         user2 = UserFactory()
@@ -45,7 +126,18 @@ class TestPostListCreateView:
         url = reverse('post-list')
         response = client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 0
+        assert len(response.data['results']) == 0
+
+    def test_get_posts_after_blocking_user(self, client, user):
+        user2 = UserFactory()
+        PostFactory(type='text', content='test_content', user=user2)
+        url = reverse('post-list')
+        response = client.get(url)
+        assert len(response.data['results']) == 1
+        BlockFactory(blocked_by=user2, blocked_user=user)
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 0
 
     def test_get_posts_with_banned_user(self, client, user):
         community = CommunityFactory()
@@ -54,7 +146,7 @@ class TestPostListCreateView:
         url = reverse('post-list')
         response = client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 0
+        assert len(response.data['results']) == 0
 
     def test_create_post(self, client, user):
         url = reverse('post-list')
@@ -138,8 +230,8 @@ class TestPostDetailView:
 
     def test_get_post(self, client):
         post = PostFactory()
-        PostInteractionFactory(post=post, interaction_type='upvote')
-        CommentFactory(post=post)
+        PostInteractionService.create_post_interaction(post=post, user=UserFactory(), interaction_type='upvote')
+        CommentFactory(post=post, status='accepted')
         url = reverse('post-detail', args=[post.id])
         response = client.get(url)
         assert response.status_code == status.HTTP_200_OK
@@ -156,6 +248,47 @@ class TestPostDetailView:
         assert response.data['interaction_diff'] == 1
         assert response.data['comments_count'] == 1
 
+    def test_get_post_viewer_fields(self, client, user):
+        post = PostFactory(type='text', user=user)
+        user2 = UserFactory()
+        PostInteractionFactory(post=post, user=user2, interaction_type='upvote')
+        client2 = APIClient()
+        client2.force_authenticate(user=user2)
+        url = reverse('post-detail', args=[post.id])
+        response = client.get(url)
+        response2 = client2.get(url)
+        assert response.data['is_author'] is True
+        assert response.data['user']['is_current_user'] is True
+        assert response.data['interaction'] is None
+        assert response2.data['is_author'] is False
+        assert response2.data['user']['is_current_user'] is False
+        assert response2.data['interaction']['interaction_type'] == 'upvote'
+
+    def test_get_post_after_update(self, client, user):
+        post = PostFactory(type='text', user=user)
+        url = reverse('post-detail', args=[post.id])
+        client.get(url)
+        client.patch(url, data={'content': 'test_content_updated'})
+        user.username = 'updated_username'
+        user.save()
+        response = client.get(url)
+        assert response.data['content'] == 'test_content_updated'
+        assert response.data['user']['username'] == 'updated_username'
+
+    def test_get_post_async(self, client, user):
+        post = PostFactory(type='text', user=user)
+        response = client.get(reverse('post-detail-async', args=[post.id]))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['id'] == post.id
+        assert response.data['is_author'] is True
+
+    def test_get_post_async_with_blocked_user(self, client, user):
+        user2 = UserFactory()
+        BlockFactory(blocked_by=user, blocked_user=user2)
+        post = PostFactory(type='text', user=user2)
+        response = client.get(reverse('post-detail-async', args=[post.id]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
     def test_get_post_with_invalid_id(self, client):
         url = reverse('post-detail', args=[999])
         response = client.get(url)
@@ -373,6 +506,9 @@ class TestPostInteractionListCreateView:
         assert response.status_code == status.HTTP_201_CREATED
         assert response.data['interaction_type'] == 'upvote'
         assert response.data['post'] == post.id
+        post.refresh_from_db()
+        assert post.upvotes == 1
+        assert post.score == 1
 
     def test_create_post_interaction_with_blocked_user(self, client, user):
         url = reverse('post-interaction-list')
@@ -392,6 +528,17 @@ class TestPostInteractionListCreateView:
         response = client.post(url, data=data)
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
+
+    def test_create_post_interaction_with_vote_buffer(self, client, user, settings):
+        settings.VOTE_BUFFER_ENABLED = True
+        post = PostFactory(type='text')
+        url = reverse('post-interaction-list')
+        response = client.post(url, {'post': post.id, 'interaction_type': 'upvote'})
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert not PostInteraction.objects.filter(post=post).exists()
+        response = client.get(reverse('post-list'))
+        assert response.data['results'][0]['interaction']['interaction_type'] == 'upvote'
+
 @pytest.mark.django_db
 class TestPostInteractionDetailView:
     def test_get_post_interaction(self, client, user):
@@ -455,11 +602,73 @@ class TestPostInteractionDetailView:
 
 @pytest.mark.django_db
 class TestFeedView:
-    pass
+    def test_get_feed(self, client, user):
+        community = CommunityFactory()
+        MemberFactory(community=community, user=user)
+        PostFactory(type='text', community=community)
+        PostFactory(type='text')
+        PostFactory(type='text', user=user)
+        url = reverse('feed')
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 2
+        assert response.data['next'] is None
+
+    def test_get_feed_async(self, client, user):
+        community = CommunityFactory()
+        MemberFactory(community=community, user=user)
+        PostFactory(type='text', community=community)
+        PostFactory(type='text')
+        PostFactory(type='text', user=user)
+        response = client.get(reverse('feed-async'), {'per_page': 1})
+        assert response.status_code == status.HTTP_200_OK
+        post_ids = [post['id'] for post in response.data['results']]
+        response = client.get(response.data['next'])
+        post_ids += [post['id'] for post in response.data['results']]
+        assert len(set(post_ids)) == 2
+        assert response.data['next'] is None
+
+    def test_get_feed_pages_with_cursor(self, client):
+        PostFactory.create_batch(5, type='text')
+        url = reverse('feed')
+        response = client.get(url, {'per_page': 2})
+        post_ids = [post['id'] for post in response.data['results']]
+        while response.data['next']:
+            response = client.get(response.data['next'])
+            assert response.status_code == status.HTTP_200_OK
+            post_ids += [post['id'] for post in response.data['results']]
+        assert len(post_ids) == 5
+        assert len(set(post_ids)) == 5
+
+    def test_get_feed_excludes_blocked_users_posts(self, client, user):
+        user2 = UserFactory()
+        BlockFactory(blocked_by=user, blocked_user=user2)
+        PostFactory(type='text', user=user2)
+        url = reverse('feed')
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 0
+
+    def test_get_feed_with_invalid_cursor(self, client):
+        url = reverse('feed')
+        response = client.get(url, {'cursor': 'invalid'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
 
 @pytest.mark.django_db
 class TestPopularView:
-    pass
+    def test_get_popular_posts(self, client):
+        post = PostFactory(type='text')
+        other_post = PostFactory(type='text')
+        Post.objects.filter(id=other_post.id).update(hot_score=post.hot_score + 1)
+        url = reverse('popular-list')
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data] == [other_post.id, post.id]
+
+    def test_get_popular_posts_with_invalid_sort(self, client):
+        url = reverse('popular-list')
+        response = client.get(url, {'sort': 'invalid'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 @pytest.mark.django_db
 class TestUserUpvotedPostsView:
@@ -497,4 +706,22 @@ class TestUserDownvotedPostsView:
         url = reverse('user-downvoted-posts')
         response = client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 0
\ No newline at end of file
+        assert len(response.data) == 0
+
+@pytest.mark.django_db
+class TestLinkPreviewView:
+    @pytest.mark.parametrize('name', ['link-preview', 'link-preview-async'])
+    def test_get_link_preview_without_url(self, client, name):
+        response = client.get(reverse(name))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('name', ['link-preview', 'link-preview-async'])
+    def test_get_link_preview_with_invalid_url(self, client, name):
+        response = client.get(reverse(name), {'url': 'javascript:alert(1)'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('name', ['link-preview', 'link-preview-async'])
+    def test_get_link_preview_applies_view_permissions(self, monkeypatch, name):
+        monkeypatch.setattr(LinkPreviewView, 'permission_classes', [IsAuthenticated])
+        response = APIClient().get(reverse(name), {'url': 'https://example.com/'})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
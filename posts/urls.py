@@ -4,13 +4,17 @@ from . import views
 urlpatterns = [
     path('posts/', views.PostListCreateView.as_view(), name='post-list'),
     path('posts/<int:pk>/', views.PostDetailView.as_view(), name='post-detail'),
+    path('posts/async/', views.AsyncPostListView.as_view(), name='post-list-async'),
+    path('posts/<int:pk>/async/', views.AsyncPostDetailView.as_view(), name='post-detail-async'),
     path('post-reports/', views.PostReportListCreateView.as_view(), name='post-report-list'),
     path('post-reports/<int:pk>/', views.PostReportDetailView.as_view(), name='post-report-detail'),
     path('user/upvoted-posts/', views.UserUpvotedPostsView.as_view(), name='user-upvoted-posts'),
     path('user/downvoted-posts/', views.UserDownvotedPostsView.as_view(), name='user-downvoted-posts'),
     path('feed/', views.FeedView.as_view(), name='feed'),
+    path('feed/async/', views.AsyncFeedView.as_view(), name='feed-async'),
     path('popular/', views.PopularView.as_view(), name='popular-list'),
     path('link-preview/', views.LinkPreviewView.as_view(), name='link-preview'),
+    path('link-preview/async/', views.AsyncLinkPreviewView.as_view(), name='link-preview-async'),
     path('saved-posts/', views.SavedPostListCreateView.as_view(), name='saved-post-list'),
     path('saved-posts/<int:pk>/', views.SavedPostDetailView.as_view(), name='saved-post-detail'),
     path('user/saved-posts/', views.UserSavedPostsView.as_view(), name='user-saved-posts'),
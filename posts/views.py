@@ -2,7 +2,10 @@ from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
-from api.pagination import CustomPagination
+from rest_framework.exceptions import ValidationError
+from api.pagination import CustomPagination, FeedPagination, KeysetPagination
+from api.cache import CachedBodyMixin
+from api.mixins import AsyncReadMixin
 from django.core.cache import cache
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
@@ -19,17 +22,16 @@ from .serializers import (
     PostReportWriteSerializer, 
     LinkPreviewSerializer
 )
-from bs4 import BeautifulSoup
-import requests
-from .services import PostService, SavedPostService, PostInteractionService, PostReportService
+from .services import PostService, FeedService, PostRankingService, SavedPostService, PostInteractionService, PostReportService, PostVoteBufferService, LinkPreviewService
 from .permissions import IsAuthor, CanPost, CanInteract, CanCrossPost, CanModerate
+from .mixins import PostViewerStateMixin
 
-class PostListCreateView(generics.ListCreateAPIView):
+class PostListCreateView(CachedBodyMixin, PostViewerStateMixin, generics.ListCreateAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly & CanPost & CanCrossPost]
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
     filterset_fields = ['community', 'user', 'status']
-    ordering_fields = ['created_at', 'interaction_diff']
+    ordering_fields = ['created_at', 'interaction_diff', 'hot_score', 'rising_score']
     search_fields = ['title', 'content', 'community__name', 'user__username']
 
     def create(self, request, *args, **kwargs):
@@ -54,8 +56,12 @@ class PostListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         return PostService.get_posts(self.request.user)
 
+class AsyncPostListView(AsyncReadMixin, PostListCreateView):
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
 
-class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PostDetailView(CachedBodyMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly & (IsAuthor | CanModerate)]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ['community', 'user']
@@ -91,6 +97,10 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         return PostService.get_posts(self.request.user)
 
+class AsyncPostDetailView(AsyncReadMixin, PostDetailView):
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve(request, *args, **kwargs)
+
 class SavedPostListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated & CanInteract]
     serializer_class = SavedPostSerializer
@@ -119,7 +129,7 @@ class SavedPostDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):                
         return SavedPostService.get_saved_posts(self.request.user)
 
-class UserSavedPostsView(generics.ListAPIView):
+class UserSavedPostsView(CachedBodyMixin, PostViewerStateMixin, generics.ListAPIView):
     serializer_class = PostReadSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPagination
@@ -149,6 +159,15 @@ class PostInteractionListCreateView(generics.ListCreateAPIView):
     #     user.update_post_karma(1 if interaction_type == 'upvote' else -1)
     #     return super().create(request, *args, **kwargs)
 
+    def create(self, request, *args, **kwargs):
+        if not PostVoteBufferService.is_enabled():
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        post = serializer.validated_data['post']
+        PostVoteBufferService.record_vote(request.user.id, post.id, serializer.validated_data['interaction_type'])
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
     def perform_create(self, serializer):
         # serializer.save(user=self.request.user)
         # post_id = serializer.validated_data.get('post')
@@ -186,21 +205,25 @@ class PostInteractionDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         return PostInteractionService.get_post_interactions(self.request.user)
 
-class FeedView(generics.ListAPIView):
+class FeedView(CachedBodyMixin, PostViewerStateMixin, generics.ListAPIView):
     serializer_class = PostReadSerializer
-    pagination_class = CustomPagination
+    pagination_class = FeedPagination
 
-    # @method_decorator(vary_on_headers('Authorization'))
-    # @method_decorator(cache_page(60 * 15, key_prefix=lambda req: f"feed_list_{req.user.id}"))
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        page = self.paginator.paginate_feed(request, lambda **kwargs: FeedService.get_feed_page(request.user, **kwargs))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
-    def get_queryset(self):
-        return PostService.get_feed(self.request.user)
+class AsyncFeedView(AsyncReadMixin, FeedView):
+    async def get(self, request, *args, **kwargs):
+        page = await self.paginator.apaginate_feed(request, lambda **kwargs: FeedService.aget_feed_page(request.user, **kwargs))
+        return self.get_paginated_response(await self.aserialize(page, many=True))
 
-class PopularView(generics.ListAPIView):
+class PopularView(CachedBodyMixin, PostViewerStateMixin, generics.ListAPIView):
     serializer_class = PostReadSerializer
     pagination_class = CustomPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['community']
 
     # @method_decorator(vary_on_headers('Authorization'))
     # @method_decorator(cache_page(60 * 15, key_prefix=lambda req: f"popular_list_{req.user.id}"))
@@ -208,12 +231,13 @@ class PopularView(generics.ListAPIView):
         return super().list(request, *args, **kwargs)
 
     def get_queryset(self):
-        return PostService.get_feed(self.request.user)
-        # return Post.objects.filter(created_at__gte=timezone.now() - timezone.timedelta(days=1)).annotate(
-        #     upvotes=Coalesce(Count('post_interactions', filter=Q(post_interactions__interaction_type='upvote')), 0),
-        #     downvotes=Coalesce(Count('post_interactions', filter=Q(post_interactions__interaction_type='downvote')), 0),
-        #     interaction_diff=F('upvotes') - F('downvotes')
-        # ).order_by('-interaction_diff', '-created_at')
+        sort = self.request.query_params.get('sort', 'hot')
+        time_filter = self.request.query_params.get('t', 'day')
+        if sort not in PostRankingService.SORTS:
+            raise ValidationError({'sort': f"Must be one of: {', '.join(PostRankingService.SORTS)}."})
+        if time_filter not in PostRankingService.TIME_FILTERS:
+            raise ValidationError({'t': f"Must be one of: {', '.join(PostRankingService.TIME_FILTERS)}."})
+        return PostRankingService.get_ranked_posts(self.request.user, sort, time_filter)
 
 class PostReportListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated & CanInteract]
@@ -274,7 +298,7 @@ class PostReportDetailView(generics.RetrieveUpdateDestroyAPIView):
             return PostReportReadSerializer
         return PostReportWriteSerializer
 
-class UserUpvotedPostsView(generics.ListAPIView):
+class UserUpvotedPostsView(CachedBodyMixin, PostViewerStateMixin, generics.ListAPIView):
     serializer_class = PostReadSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPagination
@@ -287,7 +311,7 @@ class UserUpvotedPostsView(generics.ListAPIView):
     def get_queryset(self):
         return PostService.get_interacted_posts(self.request.user, 'upvote')
 
-class UserDownvotedPostsView(generics.ListAPIView):
+class UserDownvotedPostsView(CachedBodyMixin, PostViewerStateMixin, generics.ListAPIView):
     serializer_class = PostReadSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPagination
@@ -310,27 +334,26 @@ class LinkPreviewView(APIView):
         if not url:
             return Response({"error": "URL is required"}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-        except requests.RequestException as e:
+            preview_data = LinkPreviewService.get_preview(url)
+        except ValueError:
+            return Response({"error": "Invalid URL"}, status=status.HTTP_400_BAD_REQUEST)
+        return self.get_preview_response(preview_data)
+
+    def get_preview_response(self, preview_data):
+        if preview_data is None:
             return Response({"error": "Failed to fetch URL"}, status=status.HTTP_400_BAD_REQUEST)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        og_title = soup.find("meta", property="og:title")
-        og_description = soup.find("meta", property="og:description")
-        og_image = soup.find("meta", property="og:image")
-        
-        title = og_title["content"] if og_title else soup.title.string if soup.title else "No title available"
-        description = og_description["content"] if og_description else ""
-        image = og_image["content"] if og_image else ""
-        
-        preview_data = {
-            "title": title,
-            "description": description,
-            "image": image,
-            "url": url,
-        }
         serializer = LinkPreviewSerializer(data=preview_data)
         if serializer.is_valid():
             return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class AsyncLinkPreviewView(AsyncReadMixin, LinkPreviewView):
+    async def get(self, request, *args, **kwargs):
+        url = request.query_params.get('url')
+        if not url:
+            return Response({"error": "URL is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            preview_data = await LinkPreviewService.aget_preview(url)
+        except ValueError:
+            return Response({"error": "Invalid URL"}, status=status.HTTP_400_BAD_REQUEST)
+        return self.get_preview_response(preview_data)
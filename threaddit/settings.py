@@ -84,6 +84,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    'api.middleware.RequestMemoMiddleware',
 ]
 
 ROOT_URLCONF = 'threaddit.urls'
@@ -274,7 +275,64 @@ CELERY_BEAT_SCHEDULE = {
     'generate_posts': {
         'task': 'posts.tasks.generate_posts',
         'schedule': crontab(hour="*/8")
+    },
+    'update_post_rankings': {
+        'task': 'posts.tasks.update_post_rankings',
+        'schedule': crontab(minute="*/5")
+    },
+    'flush_post_votes': {
+        'task': 'posts.tasks.flush_post_votes',
+        'schedule': timedelta(seconds=5)
+    },
+    'flush_comment_votes': {
+        'task': 'comments.tasks.flush_comment_votes',
+        'schedule': timedelta(seconds=5)
+    },
+    'redeliver_messages': {
+        'task': 'chats.tasks.redeliver_messages_task',
+        'schedule': timedelta(seconds=30)
     }
 }
 
-NUDENET_API_URL = env('NUDENET_API_URL')
\ No newline at end of file
+NUDENET_API_URL = env('NUDENET_API_URL')
+
+FEED_WINDOW_DAYS = 3
+FEED_TTL = 60 * 30
+FEED_PAGE_SIZE = 20
+FEED_MAX_CANDIDATES = 1000
+FEED_COMMUNITY_WEIGHT = 3
+FEED_RECOMMENDED_WEIGHT = 1
+
+RANKING_RISING_HOURS = 24
+RANKING_BATCH_SIZE = 1000
+
+VISIBILITY_CACHE_TTL = 60 * 15
+
+BODY_CACHE_TTL = 60 * 5
+MODERATORS_CACHE_TTL = 60 * 15
+
+KEYSET_PAGE_SIZE = 20
+KEYSET_COUNT_CACHE_TTL = 60
+
+NOTIFICATIONS_PAGE_SIZE = 20
+NOTIFICATIONS_COALESCE_WINDOW = 60 * 10
+
+MESSAGES_PAGE_SIZE = 50
+MESSAGE_DELIVERY_MODE = env('MESSAGE_DELIVERY_MODE', default='direct')
+MESSAGE_DELIVERY_LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+MESSAGE_DELIVERY_STATS_TTL = 60 * 60 * 24
+MESSAGE_REDELIVERY_DELAY = 60
+MESSAGE_REDELIVERY_BATCH_SIZE = 500
+
+LINK_PREVIEW_TTL = 60 * 60 * 24
+LINK_PREVIEW_FAILURE_TTL = 60 * 5
+LINK_PREVIEW_TIMEOUT = 5
+LINK_PREVIEW_MAX_BYTES = 256 * 1024
+
+COMMENT_THREAD_DEPTH = 5
+COMMENT_THREAD_MAX_DEPTH = 10
+COMMENT_THREAD_BREADTH = 20
+COMMENT_THREAD_MAX_BREADTH = 100
+
+VOTE_BUFFER_ENABLED = env.bool('VOTE_BUFFER_ENABLED', default=False)
+VOTE_BUFFER_FLUSH_LOCK_TIMEOUT = 60 * 5